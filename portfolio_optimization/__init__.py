@@ -3,6 +3,9 @@ from .assets import Assets
 from .portfolio import Portfolio, MultiPeriodPortfolio
 from .population import Population
 from .loader import load_assets, load_train_test_assets
+from .rolling import RollingStatistics
+from .store import PriceStore, AssetsView
+from .backtest import walk_forward_backtest
 from .utils import walk_forward
 from .optimization import *
 from .bloomberg import *
@@ -17,6 +20,10 @@ __all__ = ['Assets',
            'Population',
            'load_assets',
            'load_train_test_assets',
+           'RollingStatistics',
+           'PriceStore',
+           'AssetsView',
+           'walk_forward_backtest',
            'walk_forward']
 
 __all__ += paths.__all__
@@ -1,9 +1,13 @@
 import logging
+import time
 from typing import Optional
 import datetime as dt
 import pandas as pd
 import numpy as np
 
+from portfolio_optimization.utils.correlation import *
+from portfolio_optimization.utils.linalg import *
+
 pd.options.plotting.backend = "plotly"
 
 __all__ = ['Assets']
@@ -45,6 +49,9 @@ class Assets:
         self._corr = None
         self._custom_expected_returns = None
         self._custom_expected_cov = None
+        self._expected_cov_cholesky = None
+        self._expected_cov_eigen = None
+        self._expected_cov_pinv = None
 
         self.verbose = verbose
         self.name = name
@@ -117,13 +124,16 @@ class Assets:
             raise ValueError(f'nan found in prices')
 
     def _remove_highly_correlated_assets(self,
-                                         correlation_threshold: Optional[float]):
+                                         correlation_threshold: Optional[float],
+                                         block_size: Optional[int] = None):
         """
         When two assets have a correlation above correlation_threshold, we keep the asset with higher returns.
         Highly correlated assets increase calculus overhead and can cause matrix calculus errors without adding
         significant information.
+        The correlation matrix is computed by blocks of rows so the full matrix is never stored in memory.
 
         :param correlation_threshold: correlation threshold
+        :param block_size: number of rows of the correlation matrix computed at once
         """
         if correlation_threshold is None:
             return
@@ -131,18 +141,15 @@ class Assets:
         if not -1 <= correlation_threshold <= 1:
             raise ValueError(f'correlation_threshold has to be between -1 and 1')
 
-        n = self.asset_nb
-        to_remove = set()
-        for i in range(n - 1):
-            for j in range(i + 1, n):
-                if self.corr[i, j] > correlation_threshold:
-                    if i not in to_remove and j not in to_remove:
-                        if self.mu[i] < self.mu[j]:
-                            to_remove.add(i)
-                        else:
-                            to_remove.add(j)
-        self._info(f'{len(to_remove)} assets removed with a correlation above {correlation_threshold}')
-        self.remove_assets(assets_to_remove=list(np.take(self.names, list(to_remove))))
+        start = time.perf_counter()
+        to_remove, peak_memory = highly_correlated_to_remove(returns=self.returns,
+                                                             mu=self.mu,
+                                                             correlation_threshold=correlation_threshold,
+                                                             block_size=block_size)
+        duration = time.perf_counter() - start
+        self._info(f'{len(to_remove)} assets removed with a correlation above {correlation_threshold} '
+                   f'in {duration:.2f}s (peak memory {peak_memory / 2 ** 20:.1f} MB)')
+        self.remove_assets(assets_to_remove=list(np.take(self.names, to_remove)))
 
     def remove_assets(self, assets_to_remove: list[str]):
         self.prices.drop(assets_to_remove, axis=1, inplace=True)
@@ -177,6 +184,12 @@ class Assets:
             raise ValueError(f'expected_returns must be of shape {(self.asset_nb, self.asset_nb)}. '
                              f'But received {expected_cov.shape}')
         self._custom_expected_cov = expected_cov
+        self._reset_expected_cov_factorizations()
+
+    def _reset_expected_cov_factorizations(self):
+        self._expected_cov_cholesky = None
+        self._expected_cov_eigen = None
+        self._expected_cov_pinv = None
 
     @property
     def returns(self):
@@ -230,6 +243,34 @@ class Assets:
             return self._custom_expected_cov
         return self.cov
 
+    @property
+    def expected_cov_eigen(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Eigenvalues (ascending) and eigenvectors of the expected covariance, computed once and shared by the other
+        factorizations
+        """
+        if self._expected_cov_eigen is None:
+            self._expected_cov_eigen = np.linalg.eigh(self.expected_cov)
+        return self._expected_cov_eigen
+
+    @property
+    def expected_cov_cholesky(self) -> np.ndarray:
+        """
+        Lower Cholesky factor L of the expected covariance (expected_cov = L @ L.T). When the expected covariance
+        is not positive definite, it is the Cholesky factor of the covariance repaired from its eigendecomposition
+        (see cholesky_factor).
+        """
+        if self._expected_cov_cholesky is None:
+            self._expected_cov_cholesky = cholesky_factor(self.expected_cov, eigen=self._expected_cov_eigen)
+        return self._expected_cov_cholesky
+
+    @property
+    def expected_cov_pinv(self) -> np.ndarray:
+        """Pseudo-inverse of the expected covariance from its eigendecomposition"""
+        if self._expected_cov_pinv is None:
+            self._expected_cov_pinv = pseudo_inverse(self.expected_cov_eigen)
+        return self._expected_cov_pinv
+
     @property
     def corr(self):
         if self._corr is None:
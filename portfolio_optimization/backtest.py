@@ -0,0 +1,136 @@
+import logging
+import time
+from typing import Optional, Callable
+from concurrent.futures import ProcessPoolExecutor
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.assets import *
+from portfolio_optimization.portfolio import *
+from portfolio_optimization.loader import *
+from portfolio_optimization.exception import *
+from portfolio_optimization.utils.tools import *
+
+__all__ = ['walk_forward_backtest']
+
+logger = logging.getLogger('portfolio_optimization.backtest')
+
+# Prices shared by the worker processes, set once per worker by _init_worker
+_worker_prices = None
+
+
+def _init_worker(prices: pd.DataFrame):
+    global _worker_prices
+    _worker_prices = prices
+
+
+def _run_window(index: int,
+                train_period: tuple[dt.date, dt.date],
+                test_period: tuple[dt.date, dt.date],
+                optimizer: Callable[[Assets], np.ndarray],
+                loader_kwargs: dict,
+                prices: Optional[pd.DataFrame] = None) -> tuple[int, Optional[Portfolio], float, str]:
+    """
+    Load the train and test Assets of one window, optimize on the train Assets and return the test Portfolio.
+    """
+    if prices is None:
+        prices = _worker_prices
+    start = time.perf_counter()
+    train, test = load_train_test_assets(prices=prices,
+                                         train_period=train_period,
+                                         test_period=test_period,
+                                         **loader_kwargs)
+    try:
+        weights = optimizer(train)
+    except OptimizationError as e:
+        return index, None, time.perf_counter() - start, f'OptimizationError: {e}'
+    portfolio = Portfolio(weights=weights,
+                          assets=test,
+                          name=f'portfolio_{test.name}',
+                          tag='test')
+    return index, portfolio, time.perf_counter() - start, 'ok'
+
+
+def walk_forward_backtest(prices: pd.DataFrame,
+                          optimizer: Callable[[Assets], np.ndarray],
+                          start_date: dt.date,
+                          end_date: dt.date,
+                          train_duration: int,
+                          test_duration: int,
+                          full_period: bool = True,
+                          loader_kwargs: Optional[dict] = None,
+                          n_jobs: Optional[int] = None,
+                          name: Optional[str] = 'backtest',
+                          tag: str = 'backtest') -> tuple[MultiPeriodPortfolio, pd.DataFrame]:
+    """
+    Walk forward backtest: for each window of walk_forward(), the weights are optimized on the train Assets and
+    the test Portfolio is built on the test Assets. The windows are independent and are run on a process pool.
+    The test Portfolios are gathered in date order into a MultiPeriodPortfolio.
+
+    :param prices: DataFrame of asset prices. Index has to be DateTime and columns names are the assets names
+    :param optimizer: function taking the train Assets and returning the portfolio weights. It should be
+                      defined at the top level of a module so that it can be sent to the worker processes.
+                      Windows raising an OptimizationError are skipped.
+    :param start_date: starting date of the walk forward
+    :param end_date: ending date of the walk forward
+    :param train_duration: train duration in days
+    :param test_duration: test duration in days
+    :param full_period: see walk_forward()
+    :param loader_kwargs: additional keyword arguments of load_train_test_assets()
+    :param n_jobs: number of worker processes. None to use all the CPUs and 1 to run in the current process.
+    :param name: name of the MultiPeriodPortfolio
+    :param tag: tag of the MultiPeriodPortfolio
+    :return: a tuple of the MultiPeriodPortfolio and a DataFrame reporting the wall time and status of each window
+    """
+    if loader_kwargs is None:
+        loader_kwargs = {}
+    loader_kwargs = {'verbose': False, **loader_kwargs}
+
+    periods = list(walk_forward(start_date=start_date,
+                                end_date=end_date,
+                                train_duration=train_duration,
+                                test_duration=test_duration,
+                                full_period=full_period))
+    start = time.perf_counter()
+    if n_jobs == 1:
+        results = [_run_window(index=i,
+                               train_period=train_period,
+                               test_period=test_period,
+                               optimizer=optimizer,
+                               loader_kwargs=loader_kwargs,
+                               prices=prices)
+                   for i, (train_period, test_period) in enumerate(periods)]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs,
+                                 initializer=_init_worker,
+                                 initargs=(prices,)) as executor:
+            futures = [executor.submit(_run_window,
+                                       index=i,
+                                       train_period=train_period,
+                                       test_period=test_period,
+                                       optimizer=optimizer,
+                                       loader_kwargs=loader_kwargs)
+                       for i, (train_period, test_period) in enumerate(periods)]
+            results = [future.result() for future in futures]
+    duration = time.perf_counter() - start
+
+    results = sorted(results, key=lambda x: x[0])
+    mpp = MultiPeriodPortfolio(name=name, tag=tag)
+    report = []
+    for (index, portfolio, window_duration, status), (train_period, test_period) in zip(results, periods):
+        if portfolio is not None:
+            mpp.add(portfolio)
+        else:
+            logger.warning(f'Window {test_period} skipped: {status}')
+        report.append({'train_start': train_period[0],
+                       'train_end': train_period[1],
+                       'test_start': test_period[0],
+                       'test_end': test_period[1],
+                       'duration': window_duration,
+                       'status': status})
+    report = pd.DataFrame(report)
+    if len(report) > 0:
+        logger.info(f'{len(periods)} windows run in {duration:.2f}s '
+                    f'(total windows time {report["duration"].sum():.2f}s)')
+    return mpp, report
@@ -0,0 +1,45 @@
+import time
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.assets import *
+from portfolio_optimization.optimization import *
+
+if __name__ == '__main__':
+
+    """
+    Compare the closed-form mean-variance frontier against the ECOS frontier on bound-free problems of
+    synthetic universes (one factor model)
+    """
+    population_size = 50
+    date_nb = 1500
+    rng = np.random.default_rng(42)
+
+    for asset_nb in [100, 500, 1000]:
+        market = rng.normal(0.0003, 0.01, size=(date_nb, 1))
+        returns = market * rng.uniform(0.5, 1.5, size=asset_nb) + rng.normal(0.0002, 0.01, size=(date_nb, asset_nb))
+        prices = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0),
+                              index=pd.bdate_range('2015-01-01', periods=date_nb),
+                              columns=[f'asset_{i}' for i in range(asset_nb)])
+        assets = Assets(prices=prices, verbose=False)
+        target_volatility = np.linspace(0.05, 0.3, population_size) / np.sqrt(AVG_TRADING_DAYS_PER_YEAR)
+
+        for investment_type in [InvestmentType.FULLY_INVESTED, InvestmentType.MARKET_NEUTRAL]:
+            model = Optimization(assets=assets,
+                                 investment_type=investment_type,
+                                 weight_bounds=(-100, 100))
+            start = time.perf_counter()
+            analytical_weights = model.mean_variance(target_volatility=target_volatility)
+            analytical_time = time.perf_counter() - start
+            assert np.all(model.result.telemetry['solver'] == 'ANALYTICAL')
+
+            start = time.perf_counter()
+            ecos_weights = model.mean_variance(target_volatility=target_volatility, analytical=False)
+            ecos_time = time.perf_counter() - start
+
+            error = max(abs(assets.expected_returns @ (w - ref)) / abs(assets.expected_returns @ ref)
+                        for w, ref in zip(analytical_weights, ecos_weights))
+            print(f'{asset_nb} assets - {investment_type.value} - {population_size} targets: '
+                  f'ECOS {ecos_time:.3f}s - analytical {analytical_time:.4f}s (x{ecos_time / analytical_time:.0f}) '
+                  f'- max relative return difference {error:.1e}')
@@ -0,0 +1,47 @@
+import time
+import numpy as np
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.optimization import *
+
+if __name__ == '__main__':
+
+    """
+    Compare one batch_mean_variance call against a loop of FirstOrderMeanVariance solves on bootstrapped
+    mean-variance problems of synthetic universes (one factor model)
+    """
+    date_nb = 2000
+    rng = np.random.default_rng(42)
+
+    for asset_nb, batch_size in [(20, 1000), (50, 500), (100, 200)]:
+        market = rng.normal(0.0003, 0.01, size=(date_nb, 1))
+        returns = market * rng.uniform(0.5, 1.5, size=asset_nb) + rng.normal(0.0002, 0.01, size=(date_nb, asset_nb))
+        samples = [returns[rng.integers(date_nb, size=date_nb)] for _ in range(batch_size)]
+        expected_returns = np.array([s.mean(axis=0) for s in samples])
+        expected_covs = np.array([np.cov(s, rowvar=False) for s in samples])
+        target_variances = (rng.uniform(0.08, 0.2, size=batch_size) / np.sqrt(AVG_TRADING_DAYS_PER_YEAR)) ** 2
+        upper_bounds = 10 / asset_nb
+
+        start = time.perf_counter()
+        loop_weights = []
+        for i in range(batch_size):
+            model = FirstOrderMeanVariance(values={'expected_returns': expected_returns[i],
+                                                   'lower_bounds': np.zeros(asset_nb),
+                                                   'upper_bounds': np.full(asset_nb, upper_bounds)},
+                                           expected_cov=expected_covs[i],
+                                           investment_target=1)
+            w, _ = model.solve(target=target_variances[i])
+            loop_weights.append(np.full(asset_nb, np.nan) if w is None else w)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_weights, status = batch_mean_variance(expected_returns=expected_returns,
+                                                    expected_covs=expected_covs,
+                                                    target_variances=target_variances,
+                                                    lower_bounds=0,
+                                                    upper_bounds=upper_bounds)
+        batch_time = time.perf_counter() - start
+        error = np.nanmax(np.abs(np.array(loop_weights) - batch_weights))
+        print(f'{asset_nb} assets - {batch_size} problems: loop {loop_time:.3f}s - batch {batch_time:.3f}s '
+              f'(x{loop_time / batch_time:.1f}) - {np.mean(status == "optimal"):.0%} optimal '
+              f'- max weight difference {error:.1e}')
@@ -0,0 +1,44 @@
+import time
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.assets import *
+from portfolio_optimization.optimization import *
+
+if __name__ == '__main__':
+
+    """
+    Compare the Critical Line Algorithm against the ECOS frontier on long-only fully invested problems of
+    synthetic universes (one factor model)
+    """
+    population_size = 30
+    date_nb = 3000
+    rng = np.random.default_rng(42)
+
+    for asset_nb in [100, 500, 2000]:
+        market = rng.normal(0.0003, 0.01, size=(date_nb, 1))
+        returns = market * rng.uniform(0.5, 1.5, size=asset_nb) + rng.normal(0.0002, 0.01, size=(date_nb, asset_nb))
+        prices = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0),
+                              index=pd.bdate_range('2010-01-01', periods=date_nb),
+                              columns=[f'asset_{i}' for i in range(asset_nb)])
+        assets = Assets(prices=prices, verbose=False)
+        target_volatility = np.linspace(0.08, 0.3, population_size) / np.sqrt(AVG_TRADING_DAYS_PER_YEAR)
+
+        model = Optimization(assets=assets,
+                             investment_type=InvestmentType.FULLY_INVESTED,
+                             weight_bounds=(0, None))
+        start = time.perf_counter()
+        cla_weights = model.mean_variance_cla(target_volatility=target_volatility)
+        cla_time = time.perf_counter() - start
+        corner_nb = len(model.mean_variance_cla())
+
+        start = time.perf_counter()
+        ecos_weights = model.mean_variance(target_volatility=target_volatility)
+        ecos_time = time.perf_counter() - start
+
+        error = max((assets.expected_returns @ (ref - w)) / abs(assets.expected_returns @ ref)
+                    for w, ref in zip(cla_weights, ecos_weights))
+        print(f'{asset_nb} assets - {corner_nb} corner portfolios - {population_size} targets: '
+              f'ECOS {ecos_time:.3f}s - CLA {cla_time:.3f}s (x{ecos_time / cla_time:.0f}) '
+              f'- max relative return shortfall of CLA vs ECOS {error:.1e}')
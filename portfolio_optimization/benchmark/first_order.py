@@ -0,0 +1,52 @@
+import time
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.assets import *
+from portfolio_optimization.optimization import *
+
+if __name__ == '__main__':
+
+    """
+    Compare the first-order engine (ADMM without solver) against ECOS on mean-variance frontiers of synthetic
+    universes (one factor model), with weight bounds and with transaction costs
+    """
+    population_size = 10
+    date_nb = 3000
+    rng = np.random.default_rng(42)
+
+    for asset_nb in [20, 50, 100, 200, 500]:
+        market = rng.normal(0.0003, 0.01, size=(date_nb, 1))
+        returns = market * rng.uniform(0.5, 1.5, size=asset_nb) + rng.normal(0.0002, 0.01, size=(date_nb, asset_nb))
+        prices = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0),
+                              index=pd.bdate_range('2010-01-01', periods=date_nb),
+                              columns=[f'asset_{i}' for i in range(asset_nb)])
+        assets = Assets(prices=prices, verbose=False)
+        # Eigendecomposition of the covariance cached on the Assets
+        assets.expected_cov_eigen
+        target_volatility = np.linspace(0.08, 0.2, population_size) / np.sqrt(AVG_TRADING_DAYS_PER_YEAR)
+
+        for costs in [None, 0.01]:
+            model = Optimization(assets=assets,
+                                 investment_type=InvestmentType.FULLY_INVESTED,
+                                 weight_bounds=(0, 10 / asset_nb),
+                                 costs=costs,
+                                 investment_duration_in_days=255,
+                                 prev_w=np.ones(asset_nb) / asset_nb)
+            start = time.perf_counter()
+            ecos_weights = model.mean_variance(target_volatility=target_volatility, analytical=False,
+                                               ignore_none=False)
+            ecos_time = time.perf_counter() - start
+            ecos_objectives = model.result.telemetry['objective'].to_numpy()
+
+            start = time.perf_counter()
+            first_order_weights = model.mean_variance(target_volatility=target_volatility, analytical=False,
+                                                      engine='first_order', ignore_none=False)
+            first_order_time = time.perf_counter() - start
+            telemetry = model.result.telemetry
+            error = np.nanmax(np.abs(ecos_objectives - telemetry['objective'].to_numpy()) / np.abs(ecos_objectives))
+            print(f'{asset_nb} assets - costs {costs} - {population_size} targets: '
+                  f'ECOS {ecos_time:.3f}s - ADMM {first_order_time:.3f}s (x{ecos_time / first_order_time:.1f}) '
+                  f'- {telemetry["iterations"].mean():.0f} iterations per target '
+                  f'- max relative objective difference {error:.1e}')
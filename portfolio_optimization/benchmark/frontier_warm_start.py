@@ -0,0 +1,42 @@
+import time
+import numpy as np
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.paths import *
+from portfolio_optimization.bloomberg import *
+from portfolio_optimization.loader import *
+from portfolio_optimization.optimization import *
+from portfolio_optimization.optimization.optimization import WARM_START_SOLVER
+
+if __name__ == '__main__':
+
+    """
+    Compare the efficient frontier sweep of mean_variance solved cold with ECOS for each target against the
+    warm-started sweep with WARM_START_SOLVER
+    """
+    population_size = 50
+    prices = load_prices(file=EXAMPLE_PRICES_PATH)
+    assets = load_assets(prices=prices,
+                         asset_missing_threshold=0.1,
+                         dates_missing_threshold=0.1,
+                         verbose=False)
+
+    def frontier(warm_start: bool) -> tuple[float, np.ndarray]:
+        model = Optimization(assets=assets,
+                             investment_type=InvestmentType.FULLY_INVESTED,
+                             weight_bounds=(0, None),
+                             warm_start=warm_start)
+        start = time.perf_counter()
+        weights = model.mean_variance(population_size=population_size, ignore_none=False)
+        return time.perf_counter() - start, weights
+
+    def max_error(weights: list, reference: list) -> float:
+        return max(abs(w - ref).sum() for w, ref in zip(weights, reference) if w is not None and ref is not None)
+
+    ecos_time, ecos_weights = frontier(warm_start=False)
+    warm_time, warm_weights = frontier(warm_start=True)
+
+    print(f'Assets: {assets.asset_nb} assets x {assets.date_nb} dates - {population_size} targets')
+    print(f'ECOS cold:         {ecos_time:.3f}s')
+    print(f'{WARM_START_SOLVER} warm-started: {warm_time:.3f}s  (x{ecos_time / warm_time:.1f} vs ECOS)')
+    print(f'Max L1 weights difference vs ECOS: {max_error(warm_weights, ecos_weights):.2e}')
@@ -0,0 +1,44 @@
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.assets import *
+from portfolio_optimization.optimization import *
+
+if __name__ == '__main__':
+
+    """
+    Compare the sparse linear programs solved with HiGHS against the CVXPY problems solved with ECOS for mean_cvar and
+    mean_cdar on a synthetic 10-year daily history
+    """
+    asset_nb = 100
+    date_nb = 2520
+    rng = np.random.default_rng(42)
+    market = rng.normal(0.0003, 0.01, size=(date_nb, 1))
+    returns = market * rng.uniform(0.5, 1.5, size=asset_nb) + rng.normal(0.0002, 0.01, size=(date_nb, asset_nb))
+    prices = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0),
+                          index=pd.bdate_range('2010-01-01', periods=date_nb),
+                          columns=[f'asset_{i}' for i in range(asset_nb)])
+    assets = Assets(prices=prices, verbose=False)
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None))
+
+    for method_name, target_name, target in [('mean_cvar', 'target_cvar', [0.01, 0.015, 0.02]),
+                                             ('mean_cdar', 'target_cdar', [0.05, 0.1, 0.15])]:
+        func = getattr(model, method_name)
+        timings = {}
+        weights = {}
+        for engine in ['cvxpy', 'highs']:
+            tracemalloc.start()
+            start = time.perf_counter()
+            weights[engine] = func(**{target_name: target}, engine=engine)
+            timings[engine] = (time.perf_counter() - start, tracemalloc.get_traced_memory()[1] / 2 ** 20)
+            tracemalloc.stop()
+        difference = max(abs(w - highs_w).sum() for w, highs_w in zip(weights['cvxpy'], weights['highs']))
+        print(f'{method_name} - {asset_nb} assets - {date_nb} dates - {len(target)} targets: '
+              f'ECOS {timings["cvxpy"][0]:.2f}s {timings["cvxpy"][1]:.0f}MB - '
+              f'HiGHS {timings["highs"][0]:.2f}s {timings["highs"][1]:.0f}MB - '
+              f'max L1 weights difference {difference:.1e}')
@@ -0,0 +1,53 @@
+import time
+import tempfile
+import numpy as np
+
+from portfolio_optimization.paths import *
+from portfolio_optimization.bloomberg import *
+
+if __name__ == '__main__':
+
+    """
+    Compare the load time of the prices csv file against the cold (cache build) and warm (memory-mapped)
+    load time of the columnar cache
+    """
+    repeat = 5
+
+    def timing(func) -> float:
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - start)
+        return float(np.median(durations))
+
+    # Cache in a temporary folder, leaving any cache next to the example prices untouched
+    with tempfile.TemporaryDirectory() as cache_folder:
+        csv_time = timing(lambda: load_prices(file=EXAMPLE_PRICES_PATH))
+
+        start = time.perf_counter()
+        prices = load_prices(file=EXAMPLE_PRICES_PATH, cache=True, cache_folder=cache_folder)
+        cold_time = time.perf_counter() - start
+
+        warm_time = timing(lambda: load_prices(file=EXAMPLE_PRICES_PATH, cache=True, cache_folder=cache_folder))
+
+        start_date = prices.index[len(prices) // 2].date()
+        end_date = prices.index[-1].date()
+        tickers = list(prices.columns[:len(prices.columns) // 10])
+        csv_subset_time = timing(lambda: load_prices(file=EXAMPLE_PRICES_PATH,
+                                                     start_date=start_date,
+                                                     end_date=end_date,
+                                                     tickers=tickers))
+        warm_subset_time = timing(lambda: load_prices(file=EXAMPLE_PRICES_PATH,
+                                                      start_date=start_date,
+                                                      end_date=end_date,
+                                                      tickers=tickers,
+                                                      cache=True,
+                                                      cache_folder=cache_folder))
+
+        print(f'Prices: {prices.shape[0]} dates x {prices.shape[1]} tickers')
+        print(f'csv:                    {csv_time:.4f}s')
+        print(f'cache cold (build):     {cold_time:.4f}s')
+        print(f'cache warm:             {warm_time:.4f}s  (x{csv_time / warm_time:.1f})')
+        print(f'csv subset:             {csv_subset_time:.4f}s')
+        print(f'cache warm subset:      {warm_subset_time:.4f}s  (x{csv_subset_time / warm_subset_time:.1f})')
@@ -0,0 +1,49 @@
+import time
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.assets import *
+from portfolio_optimization.optimization import *
+
+if __name__ == '__main__':
+
+    """
+    Compare the Dinkelbach maximum sharpe against the best portfolio of a 30 targets mean-variance frontier on
+    long-only fully invested rebalancing problems with transaction costs of synthetic universes (one factor model)
+    """
+    population_size = 30
+    date_nb = 3000
+    rng = np.random.default_rng(42)
+
+    for asset_nb in [20, 50, 100, 200]:
+        market = rng.normal(0.0003, 0.01, size=(date_nb, 1))
+        returns = market * rng.uniform(0.5, 1.5, size=asset_nb) + rng.normal(0.0002, 0.01, size=(date_nb, asset_nb))
+        prices = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0),
+                              index=pd.bdate_range('2010-01-01', periods=date_nb),
+                              columns=[f'asset_{i}' for i in range(asset_nb)])
+        assets = Assets(prices=prices, verbose=False)
+        model = Optimization(assets=assets,
+                             investment_type=InvestmentType.FULLY_INVESTED,
+                             weight_bounds=(0, 10 / asset_nb),
+                             costs=0.01,
+                             investment_duration_in_days=255,
+                             prev_w=np.ones(asset_nb) / asset_nb)
+        values = model._problem_values()
+
+        def sharpe_ratio(weights: np.ndarray) -> float:
+            return model._objective_value(weights=weights, values=values) / np.sqrt(
+                weights @ assets.expected_cov @ weights)
+
+        start = time.perf_counter()
+        frontier_weights = model.mean_variance(population_size=population_size, analytical=False)
+        frontier_sharpe = max(sharpe_ratio(weights) for weights in frontier_weights)
+        frontier_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        dinkelbach_sharpe = sharpe_ratio(model.maximum_sharpe(engine='dinkelbach'))
+        dinkelbach_time = time.perf_counter() - start
+        print(f'{asset_nb} assets: frontier of {population_size} targets {frontier_time:.3f}s '
+              f'- Dinkelbach {dinkelbach_time:.3f}s in {len(model.result.records)} solves '
+              f'(x{frontier_time / dinkelbach_time:.0f}) '
+              f'- sharpe improvement vs frontier {dinkelbach_sharpe / frontier_sharpe - 1:.1e}')
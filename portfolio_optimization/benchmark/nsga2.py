@@ -0,0 +1,54 @@
+import time
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.assets import *
+from portfolio_optimization.portfolio import *
+from portfolio_optimization.population import *
+from portfolio_optimization.utils.tools import *
+from portfolio_optimization.optimization import *
+
+if __name__ == '__main__':
+
+    """
+    Compare one generation evaluation of NSGA-II (batched fitness of the weight matrix and vectorized
+    non-dominated sorting) against Portfolio objects sorted by Population, then time full NSGA-II runs on
+    synthetic universes (one factor model)
+    """
+    date_nb = 2000
+    rng = np.random.default_rng(42)
+
+    for asset_nb, population_size in [(50, 200), (100, 500), (200, 1000)]:
+        market = rng.normal(0.0003, 0.01, size=(date_nb, 1))
+        returns = market * rng.uniform(0.5, 1.5, size=asset_nb) + rng.normal(0.0002, 0.01, size=(date_nb, asset_nb))
+        prices = pd.DataFrame(100 * np.cumprod(1 + returns, axis=0),
+                              index=pd.bdate_range('2010-01-01', periods=date_nb),
+                              columns=[f'asset_{i}' for i in range(asset_nb)])
+        assets = Assets(prices=prices, verbose=False)
+        weights = rng.dirichlet(np.ones(asset_nb), size=population_size)
+
+        start = time.perf_counter()
+        population = Population([Portfolio(weights=w, assets=assets, fitness_type=FitnessType.MEAN_DOWNSIDE_STD)
+                                 for w in weights])
+        population_fronts = population.non_denominated_sort()
+        population_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fitnesses = population_fitness(weights=weights,
+                                       returns=assets.returns,
+                                       fitness_type=FitnessType.MEAN_DOWNSIDE_STD)
+        fronts = non_dominated_sorting(fitnesses)
+        vectorized_time = time.perf_counter() - start
+        assert len(fronts) == len(population_fronts)
+
+        model = Optimization(assets=assets,
+                             investment_type=InvestmentType.FULLY_INVESTED,
+                             weight_bounds=(0, 10 / asset_nb))
+        start = time.perf_counter()
+        front = model.nsga2(population_size=population_size, generations=100, cardinality=asset_nb // 5, seed=0)
+        nsga2_time = time.perf_counter() - start
+        print(f'{asset_nb} assets - {population_size} portfolios: '
+              f'Population {population_time:.3f}s - vectorized {vectorized_time:.3f}s '
+              f'(x{population_time / vectorized_time:.0f}) '
+              f'- 100 generations with cardinality {asset_nb // 5} {nsga2_time:.3f}s ({len(front)} on the front)')
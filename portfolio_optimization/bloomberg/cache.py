@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+from typing import Union, Optional
+from pathlib import Path
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger('portfolio_optimization.cache')
+
+__all__ = ['PricesCache']
+
+CACHE_VERSION = 1
+
+
+class PricesCache:
+    def __init__(self,
+                 file: Union[Path, str],
+                 cache_folder: Optional[Union[Path, str]] = None):
+        """
+        On-disk columnar cache of a prices csv file.
+        The prices are saved in a column-major (Fortran order) .npy file, memory-mapped when read, with the dates
+        and tickers saved in separate .npy files. The prices of one ticker are contiguous on disk, so a read of a
+        date range and a subset of tickers only touches the pages of these tickers over that date range.
+        The cache is rebuilt from the csv file only when the csv file size or modification time changes.
+
+        :param file: the path of the prices csv file
+        :param cache_folder: the folder of the cache files. Default is a folder named {file name}_cache next to
+                             the csv file.
+        """
+        self.file = Path(file)
+        if cache_folder is None:
+            cache_folder = Path(self.file.parent, f'{self.file.stem}_cache')
+        self.cache_folder = Path(cache_folder)
+        self.prices_path = Path(self.cache_folder, 'prices.npy')
+        self.dates_path = Path(self.cache_folder, 'dates.npy')
+        self.tickers_path = Path(self.cache_folder, 'tickers.npy')
+        self.meta_path = Path(self.cache_folder, 'meta.json')
+        self._prices = None
+        self._dates = None
+        self._tickers = None
+        self._meta = None
+
+    def _source_signature(self) -> dict:
+        stat = os.stat(self.file)
+        return {'version': CACHE_VERSION,
+                'source': str(self.file.resolve()),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns}
+
+    def is_valid(self) -> bool:
+        """True if the cache exists and was built from the current csv file"""
+        if not self.meta_path.exists():
+            return False
+        with open(self.meta_path, 'r') as f:
+            meta = json.load(f)
+        return all(meta.get(k) == v for k, v in self._source_signature().items())
+
+    def build(self):
+        """Parse the csv file and write the cache files"""
+        df = pd.read_csv(self.file, sep=',', index_col=0)
+        df.index = pd.to_datetime(df.index, format='%Y-%m-%d')
+        self.cache_folder.mkdir(parents=True, exist_ok=True)
+        # The meta file is removed first and written last so that an interrupted build is never considered valid
+        if self.meta_path.exists():
+            self.meta_path.unlink()
+        np.save(self.prices_path, np.asfortranarray(df.to_numpy(dtype=np.float64)), allow_pickle=False)
+        np.save(self.dates_path, df.index.values.astype('datetime64[D]'), allow_pickle=False)
+        np.save(self.tickers_path, np.array(df.columns, dtype=str), allow_pickle=False)
+        meta = self._source_signature()
+        meta['index_name'] = df.index.name
+        with open(self.meta_path, 'w') as f:
+            json.dump(meta, f)
+        self._prices = None
+        self._dates = None
+        self._tickers = None
+        self._meta = None
+        logger.info(f'Prices cache built in {self.cache_folder}')
+
+    def _load(self):
+        if not self.is_valid():
+            self.build()
+        if self._prices is None:
+            self._prices = np.load(self.prices_path, mmap_mode='r', allow_pickle=False)
+            self._dates = np.load(self.dates_path, allow_pickle=False)
+            self._tickers = np.load(self.tickers_path, allow_pickle=False)
+            with open(self.meta_path, 'r') as f:
+                self._meta = json.load(f)
+
+    @property
+    def prices(self) -> np.memmap:
+        """Memory-mapped prices of shape (Number of Dates, Number of Tickers)"""
+        self._load()
+        return self._prices
+
+    @property
+    def dates(self) -> np.ndarray:
+        self._load()
+        return self._dates
+
+    @property
+    def tickers(self) -> np.ndarray:
+        self._load()
+        return self._tickers
+
+    def read(self,
+             start_date: Optional[dt.date] = None,
+             end_date: Optional[dt.date] = None,
+             tickers: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Read the prices from start_date to end_date (included) of the selected tickers.
+        Only the requested slices of the memory-mapped file are read from disk.
+
+        :param start_date: starting date
+        :param end_date: ending date
+        :param tickers: list of tickers. Default is all tickers.
+        """
+        self._load()
+        start = 0
+        end = len(self._dates)
+        if start_date is not None:
+            start = int(np.searchsorted(self._dates, np.datetime64(start_date, 'D'), side='left'))
+        if end_date is not None:
+            end = int(np.searchsorted(self._dates, np.datetime64(end_date, 'D'), side='right'))
+
+        if tickers is None:
+            columns = np.arange(len(self._tickers))
+        else:
+            index = pd.Index(self._tickers).get_indexer(tickers)
+            if np.any(index < 0):
+                raise KeyError(f'{list(np.asarray(tickers)[index < 0])} not in {self.file}')
+            columns = index
+
+        if tickers is None:
+            values = np.array(self._prices[start:end])
+        else:
+            # Column by column so that each read is a contiguous segment of the file
+            values = np.empty((end - start, len(columns)), dtype=np.float64, order='F')
+            for k, j in enumerate(columns):
+                values[:, k] = self._prices[start:end, j]
+
+        index = pd.DatetimeIndex(self._dates[start:end], name=self._meta.get('index_name'))
+        return pd.DataFrame(values, index=index, columns=self._tickers[columns])
+
+    def __str__(self):
+        return f'PricesCache <{self.file}>'
+
+    def __repr__(self):
+        return str(self)
@@ -1,14 +1,17 @@
 import logging
-from typing import Union
+from typing import Union, Optional
 from pathlib import Path
 import datetime as dt
 import pandas as pd
 from xbbg import blp
 
+from portfolio_optimization.bloomberg.cache import *
+
 logger = logging.getLogger('portfolio_optimization.loader')
 
 __all__ = ['save_bloomberg_prices',
-           'load_prices']
+           'load_prices',
+           'PricesCache']
 
 
 def save_bloomberg_prices(file: Union[Path, str],
@@ -28,13 +31,33 @@ def save_bloomberg_prices(file: Union[Path, str],
     logger.info(f'Bloomberg prices saved in {file}')
 
 
-def load_prices(file: Union[Path, str]) -> pd.DataFrame:
+def load_prices(file: Union[Path, str],
+                start_date: Optional[dt.date] = None,
+                end_date: Optional[dt.date] = None,
+                tickers: Optional[list[str]] = None,
+                cache: bool = False,
+                cache_folder: Optional[Union[Path, str]] = None) -> pd.DataFrame:
     """
     Read bloomberg prices saved in prices.csv and return a DataFrame
     :param file: the path of the prices csv file
+    :param start_date: starting date
+    :param end_date: ending date
+    :param tickers: list of tickers to load. Default is all tickers.
+    :param cache: if True, the prices are read from a memory-mapped columnar cache of the csv file (see PricesCache)
+                  instead of parsing the csv file. The cache is rebuilt only when the csv file changes.
+    :param cache_folder: the folder of the cache files. Default is a folder named {file name}_cache next to the
+                         csv file.
     """
+    if cache:
+        return PricesCache(file=file, cache_folder=cache_folder).read(start_date=start_date,
+                                                                      end_date=end_date,
+                                                                      tickers=tickers)
     df = pd.read_csv(file, sep=',', index_col=0)
     df.index = pd.to_datetime(df.index, format='%Y-%m-%d')
+    if start_date is not None or end_date is not None:
+        df = df.loc[start_date:end_date]
+    if tickers is not None:
+        df = df[tickers]
     return df
 
 
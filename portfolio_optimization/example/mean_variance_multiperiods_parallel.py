@@ -0,0 +1,38 @@
+import numpy as np
+
+from portfolio_optimization import *
+
+TARGET_VOLATILITY = 0.025 / np.sqrt(255)
+
+
+def optimizer(assets: Assets) -> np.ndarray:
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None))
+    return model.mean_variance(target_volatility=TARGET_VOLATILITY)
+
+
+if __name__ == '__main__':
+
+    """
+    Same walk forward as mean_variance_multiperiods.py with the windows run on a process pool
+    """
+    prices = load_prices(file=EXAMPLE_PRICES_PATH)
+
+    start_date = prices.index[int(2 * len(prices) / 3)].date()
+    end_date = prices.index[-1].date()
+
+    mpp, report = walk_forward_backtest(prices=prices,
+                                        optimizer=optimizer,
+                                        start_date=start_date,
+                                        end_date=end_date,
+                                        train_duration=300,
+                                        test_duration=30,
+                                        loader_kwargs={'removal_correlation': 0.90,
+                                                       'pre_selection_correlation': -0.5,
+                                                       'pre_selection_number': 50},
+                                        name='mpp_test',
+                                        tag='mpp_test')
+    print(report)
+    print(mpp.sharpe_ratio)
+    mpp.plot_cumulative_returns()
@@ -6,8 +6,8 @@ import pandas as pd
 
 from portfolio_optimization.meta import *
 from portfolio_optimization.assets import *
-from portfolio_optimization.population import *
-from portfolio_optimization.portfolio import *
+from portfolio_optimization.store import *
+from portfolio_optimization.utils.tools import *
 
 __all__ = ['pre_selection',
            'load_train_test_assets',
@@ -34,6 +34,10 @@ def pre_selection(assets: Assets,
     We find the portfolio with minimum variance obtained by the pair negatively correlated assets
     and includes it in the nondomination sorting process.
 
+    The mean and standard deviation of the single assets and of the pairs are computed in closed form from
+    assets.mu and assets.cov and the whole fitness matrix is sorted with a vectorized non-dominated sorting,
+    without building the portfolios.
+
     ptf_variance = 𝜎1^2 𝑤1^2 + 𝜎2^2 𝑤2^2 + 2 𝜎12 𝑤1 𝑤2 (1)
     with 𝑤1 + 𝑤2 = 1
 
@@ -52,39 +56,41 @@ def pre_selection(assets: Assets,
     if k >= assets.asset_nb:
         return list(assets.names)
 
-    # Build a population of portfolio
-    population = Population()
+    n = assets.asset_nb
+    mu = assets.mu
+    cov = assets.cov
+    var = np.diag(cov)
 
-    # Add single assets
-    for i in range(assets.asset_nb):
-        weights = np.zeros(assets.asset_nb)
-        weights[i] = 1
-        portfolio = Portfolio(weights=weights, fitness_type=FitnessType.MEAN_STD, assets=assets)
-        population.add(portfolio)
+    # Single assets: each asset is a portfolio with a weight of 1
+    singles = np.arange(n)
 
-    # Add negatively correlated pairs with minimum variance
-    n = assets.asset_nb
-    for i in range(n - 1):
-        for j in range(i + 1, n):
-            if assets.corr[i, j] < correlation_threshold:
-                cov = assets.cov[i, j]
-                var1 = assets.cov[i, i]
-                var2 = assets.cov[j, j]
-                weights = np.zeros(assets.asset_nb)
-                weights[i] = (var2 - cov) / (var1 + var2 - 2 * cov)
-                weights[j] = 1 - weights[i]
-                portfolio = Portfolio(weights=weights, fitness_type=FitnessType.MEAN_STD, assets=assets)
-                population.add(portfolio)
-
-    new_assets_idx = set()
-    i = 0
-    while i < len(population.fronts) and len(new_assets_idx) < k:
-        front = population.fronts[i]
-        for idx in front:
-            new_assets_idx.update(population.portfolios[idx].assets_index)
-        i += 1
-
-    new_assets_names = list(assets.prices.columns[list(new_assets_idx)])
+    # Negatively correlated pairs with minimum variance
+    pair_i, pair_j = np.nonzero(np.triu(assets.corr < correlation_threshold, k=1))
+    pair_cov = cov[pair_i, pair_j]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        w1 = (var[pair_j] - pair_cov) / (var[pair_i] + var[pair_j] - 2 * pair_cov)
+    w2 = 1 - w1
+    valid = ~np.isnan(w1)
+    pair_i, pair_j, pair_cov, w1, w2 = pair_i[valid], pair_j[valid], pair_cov[valid], w1[valid], w2[valid]
+
+    # Fitness (mean, -std) of all portfolios computed in closed form
+    pair_mean = w1 * mu[pair_i] + w2 * mu[pair_j]
+    pair_var = w1 ** 2 * var[pair_i] + w2 ** 2 * var[pair_j] + 2 * w1 * w2 * pair_cov
+    fitnesses = np.column_stack((np.concatenate((mu, pair_mean)),
+                                 -np.sqrt(np.maximum(np.concatenate((var, pair_var)), 0))))
+
+    # Assets invested in each portfolio (-1 when the asset is not invested)
+    first_assets = np.concatenate((singles, np.where(np.abs(w1) > ZERO_THRESHOLD, pair_i, -1)))
+    second_assets = np.concatenate((np.full(n, -1), np.where(np.abs(w2) > ZERO_THRESHOLD, pair_j, -1)))
+
+    selected = np.zeros(n, dtype=bool)
+    for front in non_dominated_fronts(fitnesses=fitnesses):
+        if np.count_nonzero(selected) >= k:
+            break
+        for assets_idx in [first_assets[front], second_assets[front]]:
+            selected[assets_idx[assets_idx >= 0]] = True
+
+    new_assets_names = list(assets.names[selected])
     return new_assets_names
 
 
@@ -160,6 +166,7 @@ def load_train_test_assets(prices: pd.DataFrame,
                            removal_correlation: float = None,
                            pre_selection_number: Optional[int] = None,
                            pre_selection_correlation: Optional[float] = None,
+                           single_pass: bool = False,
                            verbose: bool = True) -> (Assets, Assets):
     """
     Load Assets form multiple periods
@@ -175,6 +182,10 @@ def load_train_test_assets(prices: pd.DataFrame,
     :param pre_selection_number: number of assets to pre-select using the Assets Preselection Process
     :param pre_selection_correlation: asset pair with a correlation below this threshold are included in the
            nondomination sorting of the pre selection method.
+    :param single_pass: if True, the prices of the union of the train and test periods are sliced and cleaned once
+           in a PriceStore and the train and test Assets are views on it (AssetsView) sharing the same columns.
+           The pre-selection only updates the train view assets index. The missing thresholds are applied on the
+           union period instead of on each period.
     :param verbose: True to print logging info
     :return a tuple of train Assets and test Assets
     """
@@ -188,6 +199,25 @@ def load_train_test_assets(prices: pd.DataFrame,
 
     if train_start < test_start < train_end or train_start < test_end < train_end:
         logger.warning(f'Train and Test periods are overlapping')
+
+    if pre_selection_number is not None or pre_selection_correlation is not None:
+        if pre_selection_number is None or pre_selection_correlation is None:
+            raise ValueError('pre_selection_number and pre_selection_correlation have to be both provided '
+                             'or both None')
+
+    if single_pass:
+        return _load_train_test_views(prices=prices,
+                                      train_period=train_period,
+                                      test_period=test_period,
+                                      asset_missing_threshold=asset_missing_threshold,
+                                      dates_missing_threshold=dates_missing_threshold,
+                                      names_to_keep=names_to_keep,
+                                      random_selection=random_selection,
+                                      removal_correlation=removal_correlation,
+                                      pre_selection_number=pre_selection_number,
+                                      pre_selection_correlation=pre_selection_correlation,
+                                      verbose=verbose)
+
     # Loading Train Assets from train_start to train_end
     train_assets = Assets(prices=prices,
                           start_date=train_start,
@@ -200,10 +230,7 @@ def load_train_test_assets(prices: pd.DataFrame,
                           name=train_name,
                           verbose=verbose)
 
-    if pre_selection_number is not None or pre_selection_correlation is not None:
-        if pre_selection_number is None or pre_selection_correlation is None:
-            raise ValueError('pre_selection_number and pre_selection_correlation have to be both provided '
-                             'or both None')
+    if pre_selection_number is not None:
         new_assets_names = pre_selection(assets=train_assets,
                                          k=pre_selection_number,
                                          correlation_threshold=pre_selection_correlation)
@@ -241,3 +268,52 @@ def load_train_test_assets(prices: pd.DataFrame,
         raise ValueError(f'Unable to generate train and test period with identical asset names')
 
     return train_assets, test_assets
+
+
+def _load_train_test_views(prices: pd.DataFrame,
+                           train_period: (dt.date, dt.date),
+                           test_period: (dt.date, dt.date),
+                           asset_missing_threshold: Optional[float],
+                           dates_missing_threshold: Optional[float],
+                           names_to_keep: Optional[list[str]],
+                           random_selection: Optional[int],
+                           removal_correlation: Optional[float],
+                           pre_selection_number: Optional[int],
+                           pre_selection_correlation: Optional[float],
+                           verbose: bool) -> (AssetsView, AssetsView):
+    """
+    Single pass loading of the train and test Assets: the union period is cleaned once in a PriceStore and
+    the train and test Assets are views on it.
+    """
+    train_start, train_end = train_period
+    test_start, test_end = test_period
+
+    store = PriceStore(prices=prices,
+                       name=f'store_{min(train_start, test_start)}-{max(train_end, test_end)}',
+                       start_date=min(train_start, test_start),
+                       end_date=max(train_end, test_end),
+                       asset_missing_threshold=asset_missing_threshold,
+                       dates_missing_threshold=dates_missing_threshold,
+                       names_to_keep=names_to_keep,
+                       verbose=verbose)
+
+    train_assets = store.view(name=f'train_{train_start}-{train_end}',
+                              start_date=train_start,
+                              end_date=train_end,
+                              correlation_threshold=removal_correlation,
+                              random_selection=random_selection,
+                              verbose=verbose)
+
+    if pre_selection_number is not None:
+        new_assets_names = pre_selection(assets=train_assets,
+                                         k=pre_selection_number,
+                                         correlation_threshold=pre_selection_correlation)
+        train_assets.keep_assets(assets_to_keep=new_assets_names)
+
+    test_assets = store.view(name=f'test_{test_start}-{test_end}',
+                             start_date=test_start,
+                             end_date=test_end,
+                             names_to_keep=list(train_assets.names),
+                             verbose=verbose)
+
+    return train_assets, test_assets
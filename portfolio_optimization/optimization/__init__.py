@@ -1,3 +1,40 @@
 from .optimization import Optimization
+from .problem_cache import ProblemCache
+from .solver import (FEASIBILITY_CHECK_SOLVER,
+                     TIME_LIMIT_STATUS,
+                     SOLVER_ERROR_STATUS,
+                     RETRY_STATUSES,
+                     SolverConfig,
+                     SolveRecord,
+                     OptimizationResult)
+from .analytical import AnalyticalFrontier
+from .cla import CriticalLineAlgorithm
+from .linear_program import LinearProgram, CvarCuttingPlane, cvar_linear_program, cdar_linear_program
+from .first_order import FirstOrderMeanVariance, proximal_box_budget, batch_mean_variance
+from .frontier import adaptive_frontier
+from .genetic import NSGA2, population_fitness, crowding_distance
+from .result_cache import ResultCache
 
-__all__ = ['Optimization']
+__all__ = ['Optimization',
+           'ProblemCache',
+           'FEASIBILITY_CHECK_SOLVER',
+           'TIME_LIMIT_STATUS',
+           'SOLVER_ERROR_STATUS',
+           'RETRY_STATUSES',
+           'SolverConfig',
+           'SolveRecord',
+           'OptimizationResult',
+           'AnalyticalFrontier',
+           'CriticalLineAlgorithm',
+           'LinearProgram',
+           'CvarCuttingPlane',
+           'cvar_linear_program',
+           'cdar_linear_program',
+           'FirstOrderMeanVariance',
+           'proximal_box_budget',
+           'batch_mean_variance',
+           'adaptive_frontier',
+           'NSGA2',
+           'population_fitness',
+           'crowding_distance',
+           'ResultCache']
@@ -0,0 +1,92 @@
+import logging
+from typing import Optional, Union
+import numpy as np
+import scipy.linalg as sla
+
+from portfolio_optimization.meta import *
+
+__all__ = ['AnalyticalFrontier']
+
+logger = logging.getLogger('portfolio_optimization.analytical')
+
+
+class AnalyticalFrontier:
+    def __init__(self,
+                 expected_returns: np.ndarray,
+                 expected_cov: np.ndarray,
+                 investment_type: InvestmentType = InvestmentType.FULLY_INVESTED,
+                 cholesky: Optional[np.ndarray] = None):
+        """
+        Closed-form mean-variance efficient frontier without weight bounds, costs or regularization.
+        The frontier is computed from a single Cholesky factorization of the covariance.
+
+        For a budget b (1 for fully invested and 0 for market neutral), the solution of
+            maximize mu'w  s.t.  w'Σw <= σ², 1'w = b
+        is the two-fund portfolio w = b·w_min + t·d with:
+            * w_min = Σ⁻¹1 / C the minimum variance portfolio
+            * d = Σ⁻¹(mu - A/C·1) the self-financing direction (1'd = 0)
+            * t = sqrt((σ² - b²/C) / D)
+        where C = 1'Σ⁻¹1, A = 1'Σ⁻¹mu and D = mu'Σ⁻¹mu - A²/C. Without budget (unconstrained), w = t·Σ⁻¹mu with
+        t = σ / sqrt(mu'Σ⁻¹mu).
+
+        :param expected_returns: expected returns of shape (Number of Assets)
+        :param expected_cov: expected covariance of shape (Number of Assets, Number of Assets)
+        :param investment_type: investment type (fully invested, market neutral, unconstrained)
+        :param cholesky: lower Cholesky factor of the covariance (for example Assets.expected_cov_cholesky).
+                         Computed when missing.
+        :raise np.linalg.LinAlgError: when the covariance is not positive definite
+        """
+        self.investment_type = investment_type
+        if investment_type == InvestmentType.FULLY_INVESTED:
+            self.budget = 1
+        elif investment_type == InvestmentType.MARKET_NEUTRAL:
+            self.budget = 0
+        else:
+            self.budget = None
+
+        if cholesky is None:
+            factor = sla.cho_factor(expected_cov, lower=True)
+        else:
+            factor = (cholesky, True)
+        ones = np.ones(len(expected_returns))
+        inv_ones, inv_mu = sla.cho_solve(factor, np.column_stack([ones, expected_returns])).T
+        a = ones @ inv_mu
+        b = expected_returns @ inv_mu
+        c = ones @ inv_ones
+
+        if self.budget is None:
+            self.min_variance = 0.0
+            self.base = np.zeros(len(expected_returns))
+            self.direction = inv_mu
+            self.direction_variance = b
+        else:
+            self.min_variance = self.budget ** 2 / c
+            self.base = self.budget * inv_ones / c
+            self.direction = inv_mu - a / c * inv_ones
+            self.direction_variance = b - a ** 2 / c
+
+    def weights(self, target_variance: Union[float, np.ndarray]) -> list[Optional[np.ndarray]]:
+        """
+        Efficient portfolios of the targeted variances.
+
+        :param target_variance: targeted variances
+        :return: the weights of each target variance. None when the target variance is below the minimum variance.
+        """
+        weights = []
+        for variance in np.atleast_1d(target_variance):
+            if variance < self.min_variance:
+                weights.append(None)
+                continue
+            if self.direction_variance <= 0:
+                # The expected returns are the same for all the portfolios of the budget
+                weights.append(self.base.copy())
+                continue
+            t = np.sqrt((variance - self.min_variance) / self.direction_variance)
+            weights.append(self.base + t * self.direction)
+        return weights
+
+    def __str__(self):
+        return f'AnalyticalFrontier <{self.investment_type.value}>'
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,269 @@
+import logging
+from typing import Optional, Union
+import numpy as np
+
+__all__ = ['CriticalLineAlgorithm']
+
+logger = logging.getLogger('portfolio_optimization.cla')
+
+# Tolerance of the bounds and of the null denominators of the Critical Line Algorithm
+CLA_TOLERANCE = 1e-10
+
+
+class CriticalLineAlgorithm:
+    def __init__(self,
+                 expected_returns: np.ndarray,
+                 expected_cov: np.ndarray,
+                 lower_bounds: np.ndarray,
+                 upper_bounds: np.ndarray,
+                 max_iterations: Optional[int] = None):
+        """
+        Critical Line Algorithm (Markowitz) of the fully invested mean-variance frontier with weight bounds:
+            minimize w'Σw / 2 - λ mu'w  s.t.  1'w = 1, lower_bounds <= w <= upper_bounds
+        The frontier is piecewise linear in λ between corner portfolios, where an asset enters or leaves the set of
+        free assets (assets not at their bounds). The corner portfolios are computed in one pass from the maximum
+        return portfolio (λ = ∞) to the minimum variance portfolio (λ = 0). The candidates freeing each bounded asset
+        are computed together from the inverse of the free covariance with the Schur complement of each asset.
+
+        Any portfolio of the frontier is a linear combination of its two neighbouring corner portfolios.
+
+        :param expected_returns: expected returns of shape (Number of Assets)
+        :param expected_cov: expected covariance of shape (Number of Assets, Number of Assets)
+        :param lower_bounds: lower bounds of shape (Number of Assets)
+        :param upper_bounds: upper bounds of shape (Number of Assets)
+        :param max_iterations: maximum number of corner portfolios. Default is 4 * Number of Assets + 1.
+        :raise np.linalg.LinAlgError: when the covariance of the free assets is singular
+        :raise ValueError: when the bounds cannot sum to one
+        """
+        self.expected_returns = np.asarray(expected_returns, dtype=float)
+        self.expected_cov = np.asarray(expected_cov, dtype=float)
+        self.lower_bounds = np.asarray(lower_bounds, dtype=float)
+        self.upper_bounds = np.asarray(upper_bounds, dtype=float)
+        self.asset_nb = len(self.expected_returns)
+        if max_iterations is None:
+            max_iterations = 4 * self.asset_nb + 1
+        self.max_iterations = max_iterations
+
+        if self.lower_bounds.sum() > 1 + CLA_TOLERANCE or self.upper_bounds.sum() < 1 - CLA_TOLERANCE:
+            raise ValueError(f'The weight bounds cannot sum to one')
+
+        self.corner_weights = None
+        self.lambdas = None
+        self._solve()
+
+    def _initial_weights(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Maximum return portfolio: the assets are set to their upper bound by decreasing expected returns until the
+        weights sum to one. The last asset is the only free asset.
+        """
+        weights = self.lower_bounds.copy()
+        free = np.zeros(self.asset_nb, dtype=bool)
+        for i in np.argsort(-self.expected_returns, kind='stable'):
+            weights[i] = min(self.upper_bounds[i], self.lower_bounds[i] + 1 - weights.sum())
+            if weights.sum() >= 1 - CLA_TOLERANCE:
+                free[i] = True
+                break
+        return weights, free
+
+    def _critical_line(self,
+                       weights: np.ndarray,
+                       free: np.ndarray,
+                       inv_cov_free: np.ndarray) -> tuple[np.ndarray, np.ndarray, float]:
+        """
+        Weights of the free assets along the critical line: weights[free] = alpha + λ * beta
+
+        :return: alpha, beta and the sum of the ones of the inverse free covariance
+        """
+        bounded = ~free
+        ones = np.ones(free.sum())
+        inv_ones = inv_cov_free @ ones
+        inv_mu = inv_cov_free @ self.expected_returns[free]
+        c1 = ones @ inv_ones
+        c3 = ones @ inv_mu
+        l3 = inv_cov_free @ (self.expected_cov[np.ix_(free, bounded)] @ weights[bounded])
+        beta = inv_mu - c3 / c1 * inv_ones
+        alpha = -l3 + (1 - weights[bounded].sum() + l3.sum()) / c1 * inv_ones
+        return alpha, beta, c1
+
+    def _bound_free_asset(self,
+                          free: np.ndarray,
+                          alpha: np.ndarray,
+                          beta: np.ndarray) -> tuple[Optional[float], Optional[int], Optional[float]]:
+        """
+        Largest λ at which a free asset reaches one of its bounds
+
+        :return: λ, the asset index and its bound
+        """
+        free_idx = np.flatnonzero(free)
+        if len(free_idx) < 2:
+            return None, None, None
+        valid = np.abs(beta) > CLA_TOLERANCE
+        if not np.any(valid):
+            return None, None, None
+        bounds = np.where(beta < 0, self.upper_bounds[free_idx], self.lower_bounds[free_idx])
+        lambdas = np.full(len(free_idx), -np.inf)
+        lambdas[valid] = (bounds[valid] - alpha[valid]) / beta[valid]
+        j = np.argmax(lambdas)
+        return float(lambdas[j]), int(free_idx[j]), float(bounds[j])
+
+    def _free_bounded_asset(self,
+                            weights: np.ndarray,
+                            free: np.ndarray,
+                            inv_cov_free: np.ndarray,
+                            c1: float,
+                            current_lambda: Optional[float]) -> tuple[Optional[float], Optional[int]]:
+        """
+        Largest λ below the current λ at which a bounded asset leaves its bound. The critical line of each candidate
+        free set (free assets + one bounded asset) is computed from the inverse free covariance and the Schur
+        complement of the candidate asset, for all the bounded assets at once.
+
+        :return: λ and the asset index
+        """
+        bounded_idx = np.flatnonzero(~free)
+        if len(bounded_idx) == 0:
+            return None, None
+        cov = self.expected_cov
+        mu = self.expected_returns
+        mu_free = mu[free]
+        w_bounded = weights[bounded_idx]
+
+        # Covariance between the free assets and each candidate, and Schur complement of each candidate
+        a = cov[np.ix_(free, bounded_idx)]
+        u = inv_cov_free @ a
+        s = np.diag(cov)[bounded_idx] - np.einsum('ij,ij->j', a, u)
+        # Covariance with the bounded weights, including the candidate itself
+        z = cov[:, bounded_idx] @ w_bounded
+        z_free = z[free]
+        inv_z_free = inv_cov_free @ z_free
+
+        ones_u = u.sum(axis=0) - 1
+        u_mu = u.T @ mu_free - mu[bounded_idx]
+        c3 = inv_cov_free.sum(axis=0) @ mu_free
+
+        valid = s > CLA_TOLERANCE
+        s = np.where(valid, s, 1)
+        c1_new = c1 + ones_u ** 2 / s
+        c3_new = c3 + ones_u * u_mu / s
+        c4_new = -ones_u / s
+        c2_new = -u_mu / s
+        beta = c2_new - c3_new / c1_new * c4_new
+
+        # Product of the inverse new free covariance with the covariance of the remaining bounded weights
+        u_x = u.T @ z_free - w_bounded * (np.diag(cov)[bounded_idx] - s)
+        x_new = z[bounded_idx] - np.diag(cov)[bounded_idx] * w_bounded
+        l3_new = (x_new - u_x) / s
+        ones_l3_new = inv_z_free.sum() - w_bounded * u.sum(axis=0) + ones_u * (u_x - x_new) / s
+        budget = 1 - (w_bounded.sum() - w_bounded)
+        alpha = -l3_new + (budget + ones_l3_new) / c1_new * c4_new
+
+        valid &= np.abs(beta) > CLA_TOLERANCE
+        lambdas = np.full(len(bounded_idx), -np.inf)
+        lambdas[valid] = (w_bounded[valid] - alpha[valid]) / beta[valid]
+        if current_lambda is not None:
+            lambdas[lambdas >= current_lambda * (1 - CLA_TOLERANCE)] = -np.inf
+        j = np.argmax(lambdas)
+        if not np.isfinite(lambdas[j]):
+            return None, None
+        return float(lambdas[j]), int(bounded_idx[j])
+
+    def _solve(self):
+        weights, free = self._initial_weights()
+        corner_weights = [weights.copy()]
+        lambdas = [np.inf]
+        current_lambda = None
+
+        for _ in range(self.max_iterations):
+            inv_cov_free = np.linalg.inv(self.expected_cov[np.ix_(free, free)])
+            alpha, beta, c1 = self._critical_line(weights=weights, free=free, inv_cov_free=inv_cov_free)
+            lambda_in, i_in, bound_in = self._bound_free_asset(free=free, alpha=alpha, beta=beta)
+            if lambda_in is not None and current_lambda is not None:
+                # A free asset already beyond its bound (numerical errors) is bounded at the current λ
+                lambda_in = min(lambda_in, current_lambda)
+            lambda_out, i_out = self._free_bounded_asset(weights=weights,
+                                                         free=free,
+                                                         inv_cov_free=inv_cov_free,
+                                                         c1=c1,
+                                                         current_lambda=current_lambda)
+
+            if (lambda_in is None or lambda_in <= 0) and (lambda_out is None or lambda_out <= 0):
+                # Minimum variance portfolio
+                current_lambda = 0.0
+            elif lambda_out is None or (lambda_in is not None and lambda_in > lambda_out):
+                current_lambda = lambda_in
+                free[i_in] = False
+                weights[i_in] = bound_in
+            else:
+                current_lambda = lambda_out
+                free[i_out] = True
+
+            if current_lambda != 0:
+                inv_cov_free = np.linalg.inv(self.expected_cov[np.ix_(free, free)])
+                alpha, beta, _ = self._critical_line(weights=weights, free=free, inv_cov_free=inv_cov_free)
+            weights[free] = alpha + current_lambda * beta
+            corner_weights.append(weights.copy())
+            lambdas.append(current_lambda)
+            if current_lambda == 0:
+                break
+        else:
+            logger.warning(f'The Critical Line Algorithm did not reach the minimum variance portfolio after '
+                           f'{self.max_iterations} iterations')
+
+        corner_weights = np.array(corner_weights)
+        lambdas = np.array(lambdas)
+
+        # Remove the corner portfolios breaking the bounds (numerical errors) or not decreasing the returns
+        keep = (np.all(corner_weights >= self.lower_bounds - 1e-8, axis=1)
+                & np.all(corner_weights <= self.upper_bounds + 1e-8, axis=1))
+        corner_weights, lambdas = corner_weights[keep], lambdas[keep]
+        returns = corner_weights @ self.expected_returns
+        keep = returns <= np.minimum.accumulate(returns) + CLA_TOLERANCE
+        self.corner_weights = corner_weights[keep]
+        self.lambdas = lambdas[keep]
+
+    @property
+    def corner_returns(self) -> np.ndarray:
+        """Expected returns of the corner portfolios, by decreasing order"""
+        return self.corner_weights @ self.expected_returns
+
+    @property
+    def corner_variances(self) -> np.ndarray:
+        """Variances of the corner portfolios, by decreasing order"""
+        return np.einsum('ij,jk,ik->i', self.corner_weights, self.expected_cov, self.corner_weights)
+
+    def weights(self, target_variance: Union[float, np.ndarray]) -> list[Optional[np.ndarray]]:
+        """
+        Efficient portfolios of the targeted variances, interpolated between the two neighbouring corner portfolios.
+
+        :param target_variance: targeted variances
+        :return: the weights of each target variance. None when the target variance is below the minimum variance.
+                 The maximum return portfolio when the target variance is above its variance.
+        """
+        variances = self.corner_variances
+        weights = []
+        for variance in np.atleast_1d(target_variance):
+            if variance < variances[-1] * (1 - CLA_TOLERANCE):
+                weights.append(None)
+                continue
+            if variance >= variances[0]:
+                weights.append(self.corner_weights[0].copy())
+                continue
+            # Segment between the corner portfolios k (higher variance) and k + 1
+            k = min(np.searchsorted(-variances, -variance, side='right') - 1, len(variances) - 2)
+            low = self.corner_weights[k + 1]
+            direction = self.corner_weights[k] - low
+            q = direction @ self.expected_cov @ direction
+            c = low @ self.expected_cov @ direction
+            if q <= 0:
+                weights.append(low.copy())
+                continue
+            # Largest root of q.a² + 2c.a + variance(low) - variance = 0
+            discriminant = max(c ** 2 - q * (variances[k + 1] - variance), 0)
+            a = np.clip((-c + np.sqrt(discriminant)) / q, 0, 1)
+            weights.append(low + a * direction)
+        return weights
+
+    def __str__(self):
+        return f'CriticalLineAlgorithm <{len(self.corner_weights)} corner portfolios>'
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,671 @@
+import logging
+import time
+from typing import Optional, Union
+import numpy as np
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.optimization.solver import *
+
+__all__ = ['FIRST_ORDER_SOLVER',
+           'FIRST_ORDER_TOLERANCE',
+           'proximal_box_budget',
+           'FirstOrderMeanVariance',
+           'batch_mean_variance']
+
+logger = logging.getLogger('portfolio_optimization.first_order')
+
+# Solver name of the SolveRecord of the first-order mean-variance
+FIRST_ORDER_SOLVER = 'ADMM'
+# Default absolute and relative tolerance of the primal and dual residuals of the ADMM
+FIRST_ORDER_TOLERANCE = 1e-7
+# Over-relaxation parameter of the ADMM
+RELAXATION = 1.6
+# Number of iterations between two checks of the convergence and of the step size
+CHECK_INTERVAL = 5
+# Ratio of the relative primal and dual residuals above which the step size ρ is adapted
+RHO_ADAPTATION = 5
+# Step size ρ of the proximal operator solving the maximum return linear program
+MAX_RETURN_RHO = 1e-8
+# Number of previous iterates of the Anderson acceleration
+ANDERSON_MEMORY = 10
+# Relative Tikhonov regularization of the least squares of the Anderson acceleration
+ANDERSON_REGULARIZATION = 1e-10
+# Maximum increase of the fixed-point residual of an accelerated iterate
+ANDERSON_SAFEGUARD = 10
+# Tolerance of the primal infeasibility certificate of the ADMM
+INFEASIBILITY_TOLERANCE = 1e-4
+# Absolute tolerance of the budget of the proximal operator
+BUDGET_TOLERANCE = 1e-13
+
+
+def _kinks(l1: Union[float, np.ndarray],
+           costs: Union[float, np.ndarray],
+           prev_w: Union[float, np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Kinks k1 <= k2 of l1 * |x| + costs * |x - prev_w| with the sum A and the difference D of their weights
+    """
+    l1, costs, prev_w = np.broadcast_arrays(np.asarray(l1, dtype=float),
+                                            np.asarray(costs, dtype=float),
+                                            np.asarray(prev_w, dtype=float))
+    first = prev_w >= 0
+    k1 = np.where(first, 0, prev_w)
+    k2 = np.where(first, prev_w, 0)
+    a1 = np.where(first, l1, costs)
+    a2 = np.where(first, costs, l1)
+    return k1, k2, a1 + a2, a1 - a2
+
+
+def proximal_box_budget(v: np.ndarray,
+                        lower_bounds: np.ndarray,
+                        upper_bounds: np.ndarray,
+                        budget: Optional[Union[float, np.ndarray]] = None,
+                        l1: Optional[Union[float, np.ndarray]] = None,
+                        costs: Optional[Union[float, np.ndarray]] = None,
+                        prev_w: Optional[Union[float, np.ndarray]] = None,
+                        multiplier: Optional[Union[float, np.ndarray]] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Exact proximal operator of the L1 and costs terms on the intersection of the box and the budget hyperplane:
+        minimize 1/2 ||z - v||² + l1 * ||z||_1 + ||costs * (z - prev_w)||_1
+        s.t.  lower_bounds <= z <= upper_bounds, sum(z) = budget
+    For a multiplier ν of the budget, the solution is separable: z(ν) = clip(P(v - ν), lower_bounds, upper_bounds)
+    where P is the proximal operator of the two kinks, a nondecreasing piecewise linear function. sum(z(ν)) is
+    nonincreasing and piecewise linear in ν, so the safeguarded Newton iterations on ν end in a finite number of
+    steps on the exact multiplier (up to rounding). Without L1 and costs, it is the projection onto box ∩ budget.
+
+    The last axis is the assets axis, so that a batch of problems of shape (..., Number of Assets) is solved at once
+    with one multiplier per problem.
+
+    :param v: point of shape (..., Number of Assets)
+    :param lower_bounds: lower bounds broadcastable to v
+    :param upper_bounds: upper bounds broadcastable to v
+    :param budget: sum of the weights of shape (...). None for no budget constraint.
+    :param l1: L1 coefficient broadcastable to v. None for no L1 term.
+    :param costs: costs coefficient broadcastable to v. None for no costs term.
+    :param prev_w: previous weights of the costs term broadcastable to v
+    :param multiplier: initial multiplier of the budget (for example from a previous call). Default is 0.
+    :return: the solution and the multiplier of the budget
+    """
+    kinks = None
+    if l1 is not None or costs is not None:
+        kinks = _kinks(l1=0 if l1 is None else l1,
+                       costs=0 if costs is None else costs,
+                       prev_w=0 if prev_w is None else prev_w)
+    return _proximal(v=np.asarray(v, dtype=float),
+                     lower_bounds=lower_bounds,
+                     upper_bounds=upper_bounds,
+                     budget=budget,
+                     kinks=kinks,
+                     multiplier=multiplier)
+
+
+def _proximal(v: np.ndarray,
+              lower_bounds: np.ndarray,
+              upper_bounds: np.ndarray,
+              budget: Optional[Union[float, np.ndarray]],
+              kinks: Optional[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]],
+              multiplier: Optional[Union[float, np.ndarray]]) -> tuple[np.ndarray, np.ndarray]:
+    """proximal_box_budget() from the kinks of the L1 and costs terms (see _kinks)"""
+
+    def solution(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """z = clip(P(x)) and the mask of the coordinates where z has a slope of one in x"""
+        if kinks is None:
+            p = x
+            linear = True
+        else:
+            k1, k2, a, d = kinks
+            p = np.where(x < k1 - a, x + a,
+                         np.where(x <= k1 + d, k1,
+                                  np.where(x < k2 + d, x - d,
+                                           np.where(x <= k2 + a, k2, x - a))))
+            linear = (x < k1 - a) | ((x > k1 + d) & (x < k2 + d)) | (x > k2 + a)
+        z = np.minimum(np.maximum(p, lower_bounds), upper_bounds)
+        return z, linear & (p > lower_bounds) & (p < upper_bounds)
+
+    if budget is None:
+        z, _ = solution(v)
+        return z, np.zeros(v.shape[:-1])
+
+    # Bracket of the multiplier: z is at its upper bounds at low and at its lower bounds at high
+    spread = 0 if kinks is None else kinks[2] + np.abs(kinks[0]) + np.abs(kinks[1])
+    low = np.min(v - upper_bounds - spread, axis=-1)
+    high = np.max(v - lower_bounds + spread, axis=-1)
+    if multiplier is None:
+        multiplier = 0.0
+    nu = np.minimum(np.maximum(multiplier, low), high)
+    tolerance = BUDGET_TOLERANCE * (1 + np.abs(budget))
+
+    if v.ndim == 1:
+        # Single problem: the multiplier is a float
+        nu, low, high = float(nu), float(low), float(high)
+        for _ in range(200):
+            z, linear = solution(v - nu)
+            excess = z.sum() - budget
+            if abs(excess) <= tolerance:
+                break
+            if excess > 0:
+                low = nu
+            else:
+                high = nu
+            slope = np.count_nonzero(linear)
+            newton = nu + excess / slope if slope > 0 else low
+            nu = newton if low < newton < high else (low + high) / 2
+        return z, np.array(nu)
+
+    for _ in range(200):
+        z, linear = solution(v - nu[..., np.newaxis])
+        excess = z.sum(axis=-1) - budget
+        done = np.abs(excess) <= tolerance
+        if np.all(done):
+            break
+        low = np.where(excess > 0, nu, low)
+        high = np.where(excess < 0, nu, high)
+        slope = np.sum(linear, axis=-1)
+        newton = nu + excess / np.maximum(slope, 1)
+        bisection = (low + high) / 2
+        nu = np.where(done, nu, np.where((slope > 0) & (newton > low) & (newton < high), newton, bisection))
+    return z, nu
+
+
+def _support_box_budget(d: np.ndarray,
+                        lower_bounds: np.ndarray,
+                        upper_bounds: np.ndarray,
+                        budget: Optional[np.ndarray]) -> np.ndarray:
+    """
+    Support function sup d'z of the box ∩ budget along the last axis: the weights are filled from their lower
+    bounds by decreasing d
+    """
+    lower_bounds, upper_bounds = np.broadcast_arrays(lower_bounds, upper_bounds, d)[:2]
+    if budget is None:
+        return np.sum(np.maximum(d * lower_bounds, d * upper_bounds), axis=-1)
+    order = np.argsort(-d, axis=-1)
+    capacity = np.take_along_axis(upper_bounds - lower_bounds, order, axis=-1)
+    remaining = budget - lower_bounds.sum(axis=-1)
+    fill = np.clip(remaining[..., np.newaxis] - (np.cumsum(capacity, axis=-1) - capacity), 0, capacity)
+    return np.sum(d * lower_bounds, axis=-1) + np.sum(np.take_along_axis(d, order, axis=-1) * fill, axis=-1)
+
+
+class _BatchAdmm:
+    def __init__(self,
+                 expected_returns: np.ndarray,
+                 eigen: tuple[np.ndarray, np.ndarray],
+                 lower_bounds: np.ndarray,
+                 upper_bounds: np.ndarray,
+                 budget: Optional[np.ndarray],
+                 l1: np.ndarray,
+                 l2: np.ndarray,
+                 costs: Optional[np.ndarray],
+                 prev_w: Optional[np.ndarray],
+                 tolerance: float,
+                 max_iterations: int):
+        """
+        ADMM of FirstOrderMeanVariance on a batch of B independent problems of n assets, vectorized over the batch
+        axis (the first axis of the problem data).
+
+        :param expected_returns: expected returns of shape (B, n)
+        :param eigen: eigenvalues of shape (B, n) and eigenvectors of shape (B, n, n) of the covariances
+        :param lower_bounds: lower bounds broadcastable to (B, n)
+        :param upper_bounds: upper bounds broadcastable to (B, n)
+        :param budget: sum of the weights of shape (B). None for no budget constraint.
+        :param l1: L1 coefficients of shape (B)
+        :param l2: L2 coefficients of shape (B)
+        :param costs: daily costs of shape (B, n). None for no costs.
+        :param prev_w: previous weights of the costs of shape (B, n)
+        :param tolerance: absolute and relative tolerance of the primal and dual residuals
+        :param max_iterations: maximum number of iterations
+        """
+        self.expected_returns = expected_returns
+        self.batch_size, self.asset_nb = expected_returns.shape
+        eigenvalues, self.eigenvectors = eigen
+        self.sqrt_eigenvalues = np.sqrt(np.maximum(eigenvalues, 0))
+        self.lower_bounds = np.broadcast_to(lower_bounds, expected_returns.shape)
+        self.upper_bounds = np.broadcast_to(upper_bounds, expected_returns.shape)
+        self.budget = budget
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+        # The objective of each problem is scaled by its largest absolute expected return
+        self.scale = np.maximum(np.max(np.abs(expected_returns), axis=1), np.finfo(float).tiny)
+        self.q = expected_returns / self.scale[:, np.newaxis]
+        self.l1 = l1 / self.scale
+        self.l2 = l2 / self.scale
+        self.costs = None if costs is None else costs / self.scale[:, np.newaxis]
+        self.prev_w = prev_w
+        # Kinks of the L1 and costs terms of the proximal operator, for ρ = 1
+        self.kinks = None
+        if np.any(self.l1 != 0) or self.costs is not None:
+            self.kinks = _kinks(l1=self.l1[:, np.newaxis],
+                                costs=0 if self.costs is None else self.costs,
+                                prev_w=0 if prev_w is None else prev_w)
+        self._max_return_weights = None
+
+    def objective(self, weights: np.ndarray) -> np.ndarray:
+        """Expected return net of costs and regularization of the weights of shape (B, n)"""
+        value = np.sum(self.q * weights, axis=1) - self.l1 * np.abs(weights).sum(axis=1) - self.l2 * np.sum(
+            weights ** 2, axis=1)
+        if self.costs is not None:
+            value -= np.sum(self.costs * np.abs(weights - self.prev_w), axis=1)
+        return value * self.scale
+
+    def variance(self, weights: np.ndarray) -> np.ndarray:
+        """Variance of the weights of shape (B, n)"""
+        return np.sum((self.sqrt_eigenvalues * _transposed_product(self.eigenvectors, weights)) ** 2, axis=1)
+
+    def prox(self,
+             v: np.ndarray,
+             rho: np.ndarray,
+             multiplier: Optional[np.ndarray],
+             rows: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Proximal operator of the problems of the rows of the batch (default is all the problems)"""
+        if rows is None:
+            rows = slice(None)
+        lower_bounds, upper_bounds = self.lower_bounds[rows], self.upper_bounds[rows]
+        budget = None if self.budget is None else self.budget[rows]
+        kinks = None
+        if self.kinks is not None:
+            k1, k2, a, d = (k[rows] for k in self.kinks)
+            kinks = (k1, k2, a / rho[:, np.newaxis], d / rho[:, np.newaxis])
+        if len(v) == 1:
+            # Scalar Newton iterations of a single problem
+            z, nu = _proximal(v=v[0],
+                              lower_bounds=lower_bounds[0],
+                              upper_bounds=upper_bounds[0],
+                              budget=None if budget is None else budget[0],
+                              kinks=None if kinks is None else tuple(k[0] for k in kinks),
+                              multiplier=None if multiplier is None else multiplier[0])
+            return z[np.newaxis, :], np.atleast_1d(nu)
+        return _proximal(v=v,
+                         lower_bounds=lower_bounds,
+                         upper_bounds=upper_bounds,
+                         budget=budget,
+                         kinks=kinks,
+                         multiplier=multiplier)
+
+    @property
+    def max_return_weights(self) -> np.ndarray:
+        """
+        Maximum return portfolios without variance constraint. With l2, it is the proximal operator of step
+        1 / (2 * l2) at mu / (2 * l2). Without l2, the linear program is solved as the proximal operator of a large
+        step (the minimum norm solution when several portfolios have the maximum return).
+        """
+        if self._max_return_weights is None:
+            rho = np.where(self.l2 > 0, 2 * self.l2, MAX_RETURN_RHO)
+            self._max_return_weights, _ = self.prox(v=self.q / rho[:, np.newaxis], rho=rho, multiplier=None)
+        return self._max_return_weights
+
+    def initial_state(self, target: np.ndarray, initial_weights: Optional[np.ndarray]) -> tuple:
+        """State z, y, u_z, u_y (scaled duals), ρ, budget multiplier and target of the first solve"""
+        if initial_weights is None:
+            initial_weights = np.zeros((self.batch_size, self.asset_nb))
+        z, multiplier = self.prox(v=np.asarray(initial_weights, dtype=float),
+                                  rho=np.full(self.batch_size, np.inf),
+                                  multiplier=None)
+        y = self.sqrt_eigenvalues * _transposed_product(self.eigenvectors, z) / np.sqrt(target)[:, np.newaxis]
+        y /= np.maximum(np.linalg.norm(y, axis=1), 1)[:, np.newaxis]
+        return (z, y, np.zeros_like(z), np.zeros_like(z), np.ones(self.batch_size), multiplier,
+                np.asarray(target, dtype=float))
+
+    def solve(self, target: np.ndarray, state: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray, tuple]:
+        """
+        Solve the problems for the variance targets of shape (B) from the state of a previous solve. The problems
+        that converged or were proven infeasible are removed from the iterations.
+
+        :return: the weights of shape (B, n), the status and the number of iterations of each problem and the state
+                 of the solve
+        """
+        b, n = self.batch_size, self.asset_nb
+        target = np.asarray(target, dtype=float)
+        status = np.full(b, 'user_limit', dtype=object)
+        iterations = np.full(b, self.max_iterations)
+        weights = np.full((b, n), np.nan)
+
+        # Problems whose maximum return portfolio is within the target
+        max_return_weights = self.max_return_weights
+        active = self.variance(max_return_weights) > target
+        weights[~active] = max_return_weights[~active]
+        status[~active] = 'optimal'
+        iterations[~active] = 0
+
+        z, y, u_z, u_y, rho, multiplier, previous_target = state
+        # y and its dual are scaled by 1 / sqrt(target)
+        ratio = np.sqrt(previous_target / target)[:, np.newaxis]
+        y, u_y = y * ratio, u_y * ratio
+        final_state = [z.copy(), y, u_z.copy(), u_y, rho.copy(), multiplier.copy()]
+
+        # Data of the problems still iterating
+        rows = np.flatnonzero(active)
+        rho, multiplier = rho[rows], multiplier[rows]
+        q = self.q[rows]
+        e = self.sqrt_eigenvalues[rows] / np.sqrt(target[rows])[:, np.newaxis]
+        l2 = self.l2[rows, np.newaxis]
+        eigenvectors = self.eigenvectors[rows]
+
+        # Fixed-point iterations on x = [z, y, u_z, u_y] with the Anderson memory of the differences of the
+        # iterates and of the residuals
+        x = np.concatenate([z, y, u_z, u_y], axis=1)[rows]
+        delta_x, delta_residuals = [], []
+        previous_x, previous_residual, previous_norm = None, None, None
+        accelerated = np.zeros(len(rows), dtype=bool)
+        for iteration in range(1, self.max_iterations + 1):
+            if len(rows) == 0:
+                break
+            z, y, u_z, u_y = x[:, :n], x[:, n:2 * n], x[:, 2 * n:3 * n], x[:, 3 * n:]
+            rho_column = rho[:, np.newaxis]
+            # w-update in the eigenbasis of the covariance
+            d = 1 / (2 * l2 + rho_column * (1 + e ** 2))
+            c = d * (_transposed_product(eigenvectors, q + rho_column * (z - u_z)) + rho_column * e * (y - u_y))
+            w = _product(eigenvectors, c)
+            gw = e * c
+            w_relaxed = RELAXATION * w + (1 - RELAXATION) * z
+            gw_relaxed = RELAXATION * gw + (1 - RELAXATION) * y
+            # z-update and y-update
+            z_next, multiplier = self.prox(v=w_relaxed + u_z, rho=rho, multiplier=multiplier, rows=rows)
+            y_next = gw_relaxed + u_y
+            y_next /= np.maximum(np.linalg.norm(y_next, axis=1), 1)[:, np.newaxis]
+            # Dual update
+            u_z_next = u_z + w_relaxed - z_next
+            u_y_next = u_y + gw_relaxed - y_next
+            x_next = np.concatenate([z_next, y_next, u_z_next, u_y_next], axis=1)
+            residual = x_next - x
+            residual_norm = np.linalg.norm(residual, axis=1)
+
+            # Safeguard: an accelerated point increasing the fixed-point residual is replaced by the plain iterate
+            rejected = np.zeros(len(rows), dtype=bool)
+            if previous_x is not None:
+                rejected = accelerated & (residual_norm > ANDERSON_SAFEGUARD * previous_norm)
+                x_next[rejected] = previous_x[rejected]
+                residual[rejected] = previous_residual[rejected]
+                residual_norm[rejected] = previous_norm[rejected]
+            reset = rejected.copy()
+
+            done = np.zeros(len(rows), dtype=bool)
+            if iteration % CHECK_INTERVAL == 0:
+                checked = ~rejected
+                primal_residual = np.sqrt(np.sum((w - z_next) ** 2, axis=1) + np.sum((gw - y_next) ** 2, axis=1))
+                dual_residual = rho * np.sqrt(np.sum((z_next - z) ** 2, axis=1)
+                                              + np.sum((e * (y_next - y)) ** 2, axis=1))
+                primal_scale = np.maximum(np.sqrt(np.sum(w ** 2, axis=1) + np.sum(gw ** 2, axis=1)),
+                                          np.sqrt(np.sum(z_next ** 2, axis=1) + np.sum(y_next ** 2, axis=1)))
+                dual_scale = np.maximum(rho * np.sqrt(np.sum(u_z_next ** 2, axis=1)
+                                                      + np.sum((e * u_y_next) ** 2, axis=1)),
+                                        np.linalg.norm(q, axis=1))
+                primal_tolerance = self.tolerance * (np.sqrt(2 * n) + primal_scale)
+                converged = checked & (primal_residual <= primal_tolerance) & (
+                        dual_residual <= self.tolerance * (np.sqrt(n) + dual_scale))
+
+                # Primal infeasibility certificate: δu with [I, G'] δu = 0 and a negative support function of
+                # the sets
+                delta_u_z, delta_u_y = u_z_next - u_z, u_y_next - u_y
+                delta_norm = np.sqrt(np.sum(delta_u_z ** 2, axis=1) + np.sum(delta_u_y ** 2, axis=1))
+                adjoint = np.linalg.norm(delta_u_z + _product(eigenvectors, e * delta_u_y), axis=1)
+                support = (_support_box_budget(delta_u_z,
+                                               self.lower_bounds[rows],
+                                               self.upper_bounds[rows],
+                                               None if self.budget is None else self.budget[rows])
+                           + np.linalg.norm(delta_u_y, axis=1))
+                infeasible = (checked & ~converged & (delta_norm > 0) & (primal_residual > primal_tolerance)
+                              & (adjoint <= INFEASIBILITY_TOLERANCE * delta_norm)
+                              & (support < -INFEASIBILITY_TOLERANCE * delta_norm))
+
+                done = converged | infeasible
+                if np.any(done):
+                    status[rows[converged]] = 'optimal'
+                    status[rows[infeasible]] = 'infeasible'
+                    iterations[rows[done]] = iteration
+                    weights[rows[converged]] = z_next[converged]
+                    for array, value in zip(final_state, (z_next, y_next, u_z_next, u_y_next, rho, multiplier)):
+                        array[rows[converged]] = value[converged]
+
+                # Step size balancing the relative residuals. The scaled duals and the Anderson memory are reset.
+                rho_ratio = np.sqrt((primal_residual / np.maximum(primal_scale, 1e-12))
+                                    / np.maximum(dual_residual / np.maximum(dual_scale, 1e-12), 1e-12))
+                adapted = ~done & ~rejected & ((rho_ratio > RHO_ADAPTATION) | (rho_ratio < 1 / RHO_ADAPTATION))
+                if np.any(adapted):
+                    rho_ratio = np.clip(rho_ratio[adapted], 1e-3, 1e3)
+                    rho[adapted] *= rho_ratio
+                    x_next[adapted, 2 * n:] /= rho_ratio[:, np.newaxis]
+                    reset |= adapted
+
+            # Type-II Anderson acceleration on the last iterates
+            if previous_x is not None:
+                delta_x.append(x_next - previous_x)
+                delta_residuals.append(residual - previous_residual)
+                if len(delta_x) > ANDERSON_MEMORY:
+                    delta_x.pop(0)
+                    delta_residuals.pop(0)
+            for deltas in (delta_x, delta_residuals):
+                for delta in deltas:
+                    delta[reset] = 0
+            previous_x, previous_residual, previous_norm = x_next, residual, residual_norm
+
+            if np.any(done):
+                # The finished problems are removed from the iterations
+                keep = ~done
+                rows, rho, multiplier, q, e, l2, eigenvectors = (array[keep] for array in
+                                                                 (rows, rho, multiplier, q, e, l2, eigenvectors))
+                x_next, previous_x, previous_residual, previous_norm, reset = (
+                    array[keep] for array in (x_next, previous_x, previous_residual, previous_norm, reset))
+                delta_x = [delta[keep] for delta in delta_x]
+                delta_residuals = [delta[keep] for delta in delta_residuals]
+                if len(rows) == 0:
+                    break
+
+            accelerated = np.zeros(len(rows), dtype=bool)
+            x = x_next
+            if len(delta_x) > 0:
+                delta_x_array = np.array(delta_x)
+                delta_residuals_array = np.array(delta_residuals)
+                gram = np.einsum('ibk,jbk->bij', delta_residuals_array, delta_residuals_array)
+                regularization = ANDERSON_REGULARIZATION * np.trace(gram, axis1=1, axis2=2) + np.finfo(float).tiny
+                gram += regularization[:, np.newaxis, np.newaxis] * np.eye(len(delta_x))
+                try:
+                    gamma = np.linalg.solve(gram, np.einsum('ibk,bk->bi', delta_residuals_array,
+                                                            previous_residual))
+                    x_accelerated = x_next - np.einsum('bi,ibk->bk', gamma, delta_x_array)
+                    accelerated = ~reset & np.all(np.isfinite(x_accelerated), axis=1)
+                    x = np.where(accelerated[:, np.newaxis], x_accelerated, x_next)
+                except np.linalg.LinAlgError:
+                    pass
+
+        return weights, status, iterations, (*final_state, target)
+
+
+def _transposed_product(matrices: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """matrices[b].T @ vectors[b] for each b"""
+    return np.matmul(vectors[:, np.newaxis, :], matrices)[:, 0, :]
+
+
+def _product(matrices: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """matrices[b] @ vectors[b] for each b"""
+    return np.matmul(matrices, vectors[:, :, np.newaxis])[:, :, 0]
+
+
+class FirstOrderMeanVariance:
+    def __init__(self,
+                 values: dict[str, Union[float, np.ndarray]],
+                 expected_cov: np.ndarray,
+                 investment_target: Optional[float] = None,
+                 eigen: Optional[tuple[np.ndarray, np.ndarray]] = None,
+                 tolerance: float = FIRST_ORDER_TOLERANCE,
+                 max_iterations: int = 10000):
+        """
+        Solver-free mean-variance problem of Optimization.mean_variance:
+            maximize mu'w - ||costs * (w - prev_w)||_1 - l1 * ||w||_1 - l2 * ||w||²
+            s.t.  w'Σw <= target, lower_bounds <= w <= upper_bounds, sum(w) = investment_target
+        solved with an over-relaxed ADMM on the splitting z = w, y = G @ w with G'G = Σ / target:
+            * the w-update is a linear system with the matrix (2 * l2 + ρ) * I + ρ * Σ / target, solved in
+              O(n²) for any ρ and target from the eigendecomposition of the covariance
+            * the z-update is the exact proximal operator of the L1 and costs terms on box ∩ budget
+              (see proximal_box_budget), so that the returned weights satisfy the bounds and the budget exactly
+            * the y-update is the projection onto the unit ball
+        The ADMM iterations are accelerated with type-II Anderson acceleration, safeguarded by the fixed-point
+        residual. The objective is scaled by the largest absolute expected return so that the tolerance is relative
+        to the scale of the problem. When the maximum return portfolio (solved exactly by the proximal operator)
+        is within the variance target, it is returned without iterating.
+
+        Successive solves are warm-started from the previous solution, so a frontier is solved by increasing targets.
+        Many independent problems are solved at once with batch_mean_variance().
+
+        :param values: the problem data (see Optimization._problem_values)
+        :param expected_cov: covariance of shape (Number of Assets, Number of Assets)
+        :param investment_target: sum of the weights. None for no budget constraint.
+        :param eigen: eigenvalues and eigenvectors of the covariance (see np.linalg.eigh), computed when missing
+        :param tolerance: absolute and relative tolerance of the primal and dual residuals
+        :param max_iterations: maximum number of iterations per solve
+        """
+        self.expected_cov = expected_cov
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.investment_target = investment_target
+        self.expected_returns = values['expected_returns']
+        self.asset_nb = len(self.expected_returns)
+
+        if eigen is None:
+            eigen = np.linalg.eigh(expected_cov)
+        eigenvalues, eigenvectors = eigen
+        costs, prev_w = None, None
+        if 'daily_costs' in values:
+            daily_costs = values['daily_costs']
+            costs = daily_costs[np.newaxis, :]
+            prev_w = np.divide(values['daily_costs_prev_w'], daily_costs,
+                               out=np.zeros(self.asset_nb), where=daily_costs != 0)[np.newaxis, :]
+        self._admm = _BatchAdmm(expected_returns=self.expected_returns[np.newaxis, :],
+                                eigen=(eigenvalues[np.newaxis, :], eigenvectors[np.newaxis, :, :]),
+                                lower_bounds=np.asarray(values['lower_bounds'], dtype=float),
+                                upper_bounds=np.asarray(values['upper_bounds'], dtype=float),
+                                budget=None if investment_target is None else np.array([investment_target],
+                                                                                        dtype=float),
+                                l1=np.array([values.get('l1_coef', 0)], dtype=float),
+                                l2=np.array([values.get('l2_coef', 0)], dtype=float),
+                                costs=costs,
+                                prev_w=prev_w,
+                                tolerance=tolerance,
+                                max_iterations=max_iterations)
+        # State of the last solve
+        self._state = None
+
+    def objective(self, weights: np.ndarray) -> float:
+        """Expected return net of costs and regularization of the weights"""
+        return float(self._admm.objective(weights[np.newaxis, :])[0])
+
+    @property
+    def max_return_weights(self) -> np.ndarray:
+        """Maximum return portfolio without variance constraint"""
+        return self._admm.max_return_weights[0]
+
+    def solve(self,
+              target: float,
+              initial_weights: Optional[np.ndarray] = None) -> tuple[Optional[np.ndarray], SolveRecord]:
+        """
+        Solve the problem for the variance target, warm-started from the previous solve or from initial_weights
+
+        :param target: value of the variance target
+        :param initial_weights: weights of the warm start (for example prev_w). Default is the previous solution.
+        :return: the weights (None when the optimization failed) and the SolveRecord of the solve
+        """
+        start = time.perf_counter()
+        targets = np.array([target], dtype=float)
+        if initial_weights is not None or self._state is None:
+            state = self._admm.initial_state(target=targets,
+                                             initial_weights=None if initial_weights is None
+                                             else initial_weights[np.newaxis, :])
+        else:
+            state = self._state
+        weights, status, iterations, state = self._admm.solve(target=targets, state=state)
+        status = status[0]
+        if status == 'optimal' and iterations[0] > 0:
+            self._state = state
+        record = SolveRecord(target=target,
+                             solver=FIRST_ORDER_SOLVER,
+                             status=status,
+                             iterations=int(iterations[0]),
+                             objective=self.objective(weights[0]) if status == 'optimal' else None,
+                             wall_time=time.perf_counter() - start)
+        if status != 'optimal':
+            logger.warning(f'None return for {target}: {status}')
+            return None, record
+        return weights[0], record
+
+    def __str__(self):
+        return f'FirstOrderMeanVariance <{self.asset_nb} assets>'
+
+    def __repr__(self):
+        return str(self)
+
+
+def batch_mean_variance(expected_returns: np.ndarray,
+                        expected_covs: np.ndarray,
+                        target_variances: Union[float, np.ndarray],
+                        lower_bounds: Union[float, np.ndarray] = -1,
+                        upper_bounds: Union[float, np.ndarray] = 1,
+                        investment_type: InvestmentType = InvestmentType.FULLY_INVESTED,
+                        l1_coef: Optional[Union[float, np.ndarray]] = None,
+                        l2_coef: Optional[Union[float, np.ndarray]] = None,
+                        initial_weights: Optional[np.ndarray] = None,
+                        tolerance: float = FIRST_ORDER_TOLERANCE,
+                        max_iterations: int = 10000) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Solve B independent mean-variance problems of the same number of assets at once:
+        maximize mu_b'w - l1_b * ||w||_1 - l2_b * ||w||²
+        s.t.  w'Σ_b w <= target_b, lower_bounds <= w <= upper_bounds, sum(w) = investment target
+    with the ADMM of FirstOrderMeanVariance vectorized over the batch: each iteration is a few batched
+    matrix-vector products and elementwise operations on (B, n) arrays instead of B Python-level solves. The
+    eigendecompositions of the B covariances are computed in one call. The problems stop iterating independently
+    when they converge or are proven infeasible.
+
+    For parameter studies, the same covariance is repeated along the batch axis (for example with np.broadcast_to)
+    for each combination of target and regularization.
+
+    :param expected_returns: expected returns of shape (B, n)
+    :param expected_covs: covariances of shape (B, n, n)
+    :param target_variances: variance targets of shape (B) or a single target for all the problems
+    :param lower_bounds: lower bounds, scalar or broadcastable to (B, n)
+    :param upper_bounds: upper bounds, scalar or broadcastable to (B, n)
+    :param investment_type: investment type (fully invested, market neutral, unconstrained)
+    :param l1_coef: L1 regularisation coefficients, scalar or of shape (B)
+    :param l2_coef: L2 regularisation coefficients, scalar or of shape (B)
+    :param initial_weights: warm start of shape (B, n)
+    :param tolerance: absolute and relative tolerance of the primal and dual residuals
+    :param max_iterations: maximum number of iterations
+    :return: the weights of shape (B, n), with NaN for the problems that failed, and the status of each problem
+             ('optimal', 'infeasible' or 'user_limit'). The problems converged where status == 'optimal'.
+    """
+    expected_returns = np.asarray(expected_returns, dtype=float)
+    expected_covs = np.asarray(expected_covs, dtype=float)
+    if expected_returns.ndim != 2 or expected_covs.shape != expected_returns.shape + expected_returns.shape[-1:]:
+        raise ValueError(f'expected_returns should be of shape (B, n) and expected_covs of shape (B, n, n), '
+                         f'but received {expected_returns.shape} and {expected_covs.shape}')
+    batch_size, asset_nb = expected_returns.shape
+    target_variances = np.broadcast_to(np.asarray(target_variances, dtype=float), (batch_size,))
+    if np.any(target_variances <= 0):
+        raise ValueError('All target_variances should be strictly positive')
+    lower_bounds = np.broadcast_to(np.asarray(lower_bounds, dtype=float), (batch_size, asset_nb))
+    upper_bounds = np.broadcast_to(np.asarray(upper_bounds, dtype=float), (batch_size, asset_nb))
+    if np.any(lower_bounds > upper_bounds):
+        raise ValueError('All elements of the lower bounds should be less or equal than all elements of the upper '
+                         'bound')
+
+    if investment_type == InvestmentType.FULLY_INVESTED:
+        budget = np.ones(batch_size)
+    elif investment_type == InvestmentType.MARKET_NEUTRAL:
+        budget = np.zeros(batch_size)
+    else:
+        budget = None
+    if budget is not None and (np.any(lower_bounds.sum(axis=1) > budget)
+                               or np.any(upper_bounds.sum(axis=1) < budget)):
+        raise ValueError(f'When investment_type is {investment_type.value}, the sum of the bounds should contain '
+                         f'the investment target')
+
+    admm = _BatchAdmm(expected_returns=expected_returns,
+                      eigen=np.linalg.eigh(expected_covs),
+                      lower_bounds=lower_bounds,
+                      upper_bounds=upper_bounds,
+                      budget=budget,
+                      l1=np.broadcast_to(np.asarray(0 if l1_coef is None else l1_coef, dtype=float), (batch_size,)),
+                      l2=np.broadcast_to(np.asarray(0 if l2_coef is None else l2_coef, dtype=float), (batch_size,)),
+                      costs=None,
+                      prev_w=None,
+                      tolerance=tolerance,
+                      max_iterations=max_iterations)
+    state = admm.initial_state(target=target_variances, initial_weights=initial_weights)
+    weights, status, _, _ = admm.solve(target=target_variances, state=state)
+    return weights, status.astype(str)
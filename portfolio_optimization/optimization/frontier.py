@@ -0,0 +1,181 @@
+import logging
+from typing import Optional, Callable
+import numpy as np
+
+from portfolio_optimization.optimization.solver import *
+
+__all__ = ['FRONTIER_TOLERANCE',
+           'adaptive_frontier',
+           'empirical_cvar',
+           'uncompounded_drawdowns']
+
+logger = logging.getLogger('portfolio_optimization.frontier')
+
+# Default tolerance of the adaptive frontier: maximum distance between the frontier and its piecewise linear
+# approximation, relative to the risk and return ranges of the frontier
+FRONTIER_TOLERANCE = 1e-3
+# Maximum absolute difference of the weights of two coinciding portfolios of the frontier
+FRONTIER_WEIGHT_TOLERANCE = 1e-6
+# Minimum distance of a new target to the ends of its segment, relative to the segment length
+FRONTIER_MIN_SPLIT = 0.1
+
+
+def empirical_cvar(losses: np.ndarray, beta: float) -> float:
+    """
+    CVaR of the losses as in the Rockafellar-Uryasev formulation of the optimization problems:
+        min_alpha alpha + 1 / (T * (1 - beta)) * sum(max(losses - alpha, 0))
+    The function is convex and piecewise linear in alpha with its breakpoints on the losses, so its minimum is
+    computed exactly from the sorted losses.
+
+    :param losses: losses of shape (Number of Dates)
+    :param beta: CVaR confidence level
+    """
+    losses = -np.sort(-np.asarray(losses, dtype=float))
+    coef = 1.0 / (len(losses) * (1 - beta))
+    above = np.concatenate([[0.0], np.cumsum(losses)[:-1]])
+    ranks = np.arange(len(losses))
+    return float(np.min(losses * (1 - coef * ranks) + coef * above))
+
+
+def uncompounded_drawdowns(returns: np.ndarray) -> np.ndarray:
+    """
+    Drawdowns of the uncompounded cumulative returns of the mean-CDaR problems: u_t = max(u_{t-1} - r_t, 0)
+    with u_0 = 0, which is the running maximum of the cumulative returns (starting at 0) minus the cumulative
+    returns.
+
+    :param returns: portfolio returns of shape (Number of Dates)
+    :return: the drawdowns of shape (Number of Dates)
+    """
+    cumulative_returns = np.cumsum(returns)
+    return np.maximum(np.maximum.accumulate(cumulative_returns), 0) - cumulative_returns
+
+
+def _segment_error(x: np.ndarray, y: np.ndarray, i: int) -> tuple[float, float]:
+    """
+    Upper bound of the distance between a concave frontier and the chord of its segment [i, i + 1], with the
+    normalized coordinates x and y of the solved points (y = 1 being the maximum return).
+    The frontier is above the chord and below the extensions of the neighbouring chords (the horizontal line of the
+    maximum return on the right of the last point), so it lies in a triangle whose farthest vertex from the chord
+    gives the error.
+
+    :return: the error and the abscissa of the farthest vertex
+    """
+    x_a, y_a, x_b, y_b = x[i], y[i], x[i + 1], y[i + 1]
+
+    def left(value: float) -> float:
+        if i == 0 or x_a == x[i - 1]:
+            return np.inf
+        return y_a + (y_a - y[i - 1]) / (x_a - x[i - 1]) * (value - x_a)
+
+    def right(value: float) -> float:
+        if i + 2 >= len(x) or x[i + 2] == x_b:
+            return 1.0
+        return y_b + (y[i + 2] - y_b) / (x[i + 2] - x_b) * (value - x_b)
+
+    vertices = [x_a, x_b]
+    # Intersection of the two lines
+    if i > 0:
+        slope_left = (y_a - y[i - 1]) / (x_a - x[i - 1]) if x_a != x[i - 1] else np.inf
+        slope_right = (y[i + 2] - y_b) / (x[i + 2] - x_b) if i + 2 < len(x) and x[i + 2] != x_b else 0.0
+        if np.isfinite(slope_left) and slope_left != slope_right:
+            apex = (y_b - y_a + slope_left * x_a - slope_right * x_b) / (slope_left - slope_right)
+            if x_a < apex < x_b:
+                vertices.append(apex)
+
+    length = np.hypot(x_b - x_a, y_b - y_a)
+    if length == 0:
+        return 0.0, (x_a + x_b) / 2
+    error, abscissa = 0.0, (x_a + x_b) / 2
+    for vertex in vertices:
+        height = min(left(vertex), right(vertex))
+        distance = ((x_b - x_a) * (height - y_a) - (y_b - y_a) * (vertex - x_a)) / length
+        if distance > error:
+            error, abscissa = distance, vertex
+    return error, abscissa
+
+
+def adaptive_frontier(solve: Callable[[float], tuple[Optional[np.ndarray], SolveRecord]],
+                      risk: Callable[[np.ndarray], float],
+                      objective: Callable[[np.ndarray], float],
+                      min_risk: tuple[Optional[np.ndarray], SolveRecord],
+                      max_return: tuple[Optional[np.ndarray], SolveRecord],
+                      population_size: int,
+                      tolerance: float = FRONTIER_TOLERANCE
+                      ) -> tuple[np.ndarray, list[Optional[np.ndarray]], list[SolveRecord]]:
+    """
+    Efficient frontier with targets placed where the frontier curves (sandwich approximation).
+    The maximum objective for a risk target is a concave function of the target, so between two solved portfolios
+    the frontier lies above their chord and below the extensions of the neighbouring chords. Starting from the
+    minimum risk and maximum return portfolios, the segment of the largest error bound (distance to the chord,
+    relative to the risk and return ranges) is split at the vertex of its bound until all the errors are within
+    tolerance or population_size solves are reached. Few targets are spent on the straight parts of the frontier
+    and the targets beyond the minimum risk or the risk of the maximum return portfolio are never solved.
+    A new solution coinciding with one of its neighbours is discarded and its segment is not split again. A failed
+    solve is kept with None weights and its segment is not split again.
+
+    :param solve: function solving the problem for a risk target and returning the weights (None when it failed)
+                  and the SolveRecord of the solve
+    :param risk: risk of the weights, in the unit of the targets
+    :param objective: objective of the weights (returns net of costs and regularization)
+    :param min_risk: weights and SolveRecord of the minimum risk portfolio
+    :param max_return: weights and SolveRecord of the maximum return portfolio
+    :param population_size: maximum number of solves, including the two endpoints
+    :param tolerance: maximum distance between the frontier and its piecewise linear approximation, relative to
+                      the risk and return ranges of the frontier
+    :return: the targets by increasing order with the weights and the SolveRecord of each target. The SolveRecord
+             of the endpoints take the risk of their weights as target and their objective as objective.
+    """
+    (min_risk_weights, min_risk_record), (max_return_weights, max_return_record) = min_risk, max_return
+    targets = [risk(min_risk_weights), risk(max_return_weights)]
+    objectives = [objective(min_risk_weights), objective(max_return_weights)]
+    min_risk_record.target, max_return_record.target = targets
+    min_risk_record.objective, max_return_record.objective = objectives
+    if targets[1] <= targets[0] or objectives[1] <= objectives[0]:
+        # The frontier is a single portfolio
+        if objectives[1] > objectives[0]:
+            return np.array(targets[1:]), [max_return_weights], [max_return_record]
+        return np.array(targets[:1]), [min_risk_weights], [min_risk_record]
+
+    weights = [min_risk_weights, max_return_weights]
+    records = [min_risk_record, max_return_record]
+    # Segments that cannot be split anymore
+    done = [False]
+    risk_range, return_range = targets[1] - targets[0], objectives[1] - objectives[0]
+    solve_nb = 2
+    while solve_nb < population_size:
+        valid = np.array([w is not None for w in weights])
+        x = (np.array(targets) - targets[0]) / risk_range
+        y = np.array([objectives[k] if valid[k] else np.nan for k in range(len(weights))])
+        y = (y - objectives[0]) / return_range
+        errors = np.zeros(len(done))
+        abscissas = np.zeros(len(done))
+        # Error bound of each segment on the valid points
+        valid_idx = np.flatnonzero(valid)
+        valid_x, valid_y = x[valid_idx], y[valid_idx]
+        for k in range(len(valid_idx) - 1):
+            i = valid_idx[k]
+            if i + 1 != valid_idx[k + 1] or done[i]:
+                continue
+            errors[i], abscissas[i] = _segment_error(x=valid_x, y=valid_y, i=k)
+        i = int(np.argmax(errors))
+        if errors[i] <= tolerance:
+            break
+
+        # New target at the vertex of the error bound, away from the ends of the segment
+        length = x[i + 1] - x[i]
+        abscissa = np.clip(abscissas[i], x[i] + FRONTIER_MIN_SPLIT * length, x[i + 1] - FRONTIER_MIN_SPLIT * length)
+        target = targets[0] + abscissa * risk_range
+        new_weights, record = solve(target)
+        solve_nb += 1
+        if new_weights is not None and any(np.max(np.abs(new_weights - weights[k])) <= FRONTIER_WEIGHT_TOLERANCE
+                                           for k in [i, i + 1]):
+            logger.debug(f'Frontier solution of {target} coinciding with its neighbour')
+            done[i] = True
+            continue
+        targets.insert(i + 1, target)
+        weights.insert(i + 1, new_weights)
+        records.insert(i + 1, record)
+        objectives.insert(i + 1, objective(new_weights) if new_weights is not None else np.nan)
+        done[i:i + 1] = [new_weights is None, new_weights is None]
+
+    return np.array(targets), weights, records
@@ -0,0 +1,352 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+import numpy as np
+
+from portfolio_optimization.meta import *
+from portfolio_optimization.utils.tools import *
+from portfolio_optimization.optimization.first_order import proximal_box_budget
+
+__all__ = ['NSGA2_SOLVER',
+           'NSGA2',
+           'population_fitness',
+           'crowding_distance']
+
+logger = logging.getLogger('portfolio_optimization.genetic')
+
+# Solver name of the SolveRecord of NSGA-II
+NSGA2_SOLVER = 'NSGA2'
+# Minimum population size for the fitness to be evaluated on the process pool
+PARALLEL_FITNESS_MIN_SIZE = 2000
+# Distribution index of the simulated binary crossover (a large index gives children close to their parents)
+SBX_ETA = 15
+# Probability of the support swap of each portfolio of the mutation with a cardinality
+SWAP_PROBABILITY = 0.5
+# Tolerance of the weight bounds and budget of the repaired weights
+NSGA2_TOLERANCE = 1e-8
+
+# Returns and fitness type of the process pool workers (see _init_worker)
+_worker_data = {}
+
+
+def population_fitness(weights: np.ndarray, returns: np.ndarray, fitness_type: FitnessType) -> np.ndarray:
+    """
+    Fitness of a population of portfolios from one matrix product of the weights and the assets returns.
+    The objectives are the same as Portfolio.fitness: all maximized, the risks being negated.
+
+    :param weights: weights of shape (Number of Portfolios, Number of Assets)
+    :param returns: assets returns of shape (Number of Assets, Number of Dates)
+    :param fitness_type: objectives of the fitness
+    :return: the fitnesses of shape (Number of Portfolios, Number of Objectives)
+    """
+    portfolio_returns = np.atleast_2d(weights) @ returns
+    fitness = []
+    for metric in fitness_type.value:
+        if metric == Metrics.MEAN:
+            fitness.append(portfolio_returns.mean(axis=1))
+        elif metric == Metrics.STD:
+            fitness.append(-portfolio_returns.std(axis=1, ddof=1))
+        elif metric == Metrics.DOWNSIDE_STD:
+            # See downside_std
+            downside = np.minimum(0, portfolio_returns - portfolio_returns.mean(axis=1, keepdims=True))
+            fitness.append(-np.sqrt(np.sum(downside ** 2, axis=1) / (portfolio_returns.shape[1] - 1)))
+        elif metric == Metrics.MAX_DRAWDOWN:
+            # See max_drawdown of the cumulative returns starting at 1
+            prices = np.cumprod(1 + portfolio_returns, axis=1)
+            prices = np.concatenate([np.ones((len(prices), 1)), prices], axis=1)
+            fitness.append(-np.max(1 - prices / np.maximum.accumulate(prices, axis=1), axis=1))
+        else:
+            raise ValueError(f'fitness_type {fitness_type} should be of type {FitnessType}')
+    return np.stack(fitness, axis=1)
+
+
+def crowding_distance(fitnesses: np.ndarray) -> np.ndarray:
+    """
+    Crowding distance of the fitnesses of a front: sum over the objectives of the distance between the two
+    neighbours of each fitness, normalized by the range of the objective. The extreme fitnesses of each objective
+    have an infinite distance.
+
+    :param fitnesses: fitnesses of the front of shape (Number of Portfolios, Number of Objectives)
+    :return: the crowding distances of shape (Number of Portfolios)
+    """
+    n, m = fitnesses.shape
+    distances = np.zeros(n)
+    if n <= 2:
+        distances[:] = np.inf
+        return distances
+    order = np.argsort(fitnesses, axis=0, kind='stable')
+    sorted_fitnesses = np.take_along_axis(fitnesses, order, axis=0)
+    ranges = sorted_fitnesses[-1] - sorted_fitnesses[0]
+    ranges[ranges == 0] = 1
+    gaps = (sorted_fitnesses[2:] - sorted_fitnesses[:-2]) / ranges
+    for k in range(m):
+        distances[order[1:-1, k]] += gaps[:, k]
+        distances[order[[0, -1], k]] = np.inf
+    return distances
+
+
+def _init_worker(returns: np.ndarray, fitness_type: FitnessType):
+    """Keep the returns in the worker process so that only the weights are sent for each evaluation"""
+    _worker_data['returns'] = returns
+    _worker_data['fitness_type'] = fitness_type
+
+
+def _worker_fitness(weights: np.ndarray) -> np.ndarray:
+    return population_fitness(weights=weights,
+                              returns=_worker_data['returns'],
+                              fitness_type=_worker_data['fitness_type'])
+
+
+class NSGA2:
+    def __init__(self,
+                 returns: np.ndarray,
+                 lower_bounds: np.ndarray,
+                 upper_bounds: np.ndarray,
+                 budget: Optional[float] = 1,
+                 fitness_type: FitnessType = FitnessType.MEAN_STD,
+                 population_size: int = 100,
+                 cardinality: Optional[int] = None,
+                 crossover_probability: float = 0.9,
+                 mutation_probability: Optional[float] = None,
+                 mutation_scale: float = 0.1,
+                 n_jobs: Optional[int] = 1,
+                 seed: Optional[Union[int, np.random.Generator]] = None):
+        """
+        Multi-objective genetic algorithm NSGA-II (Deb et al. 2002) on a population of weights stored as a matrix of
+        shape (Number of Portfolios, Number of Assets):
+            * the parents are chosen by binary tournaments on the rank of their front and their crowding distance
+            * the children are created by simulated binary crossover and gaussian mutation of the whole matrix
+            * the children are repaired by the projection onto the weight bounds and the budget (see
+              proximal_box_budget). With a cardinality, the assets outside the largest absolute weights of each
+              portfolio are set to zero before the projection.
+            * the fitness of all the children is computed from one matrix product with the returns
+              (see population_fitness), on a process pool for large populations
+            * the next population is made of the best fronts of the parents and children (see
+              non_dominated_fronts), the last front being truncated by crowding distance
+
+        :param returns: assets returns of shape (Number of Assets, Number of Dates)
+        :param lower_bounds: lower bounds of shape (Number of Assets)
+        :param upper_bounds: upper bounds of shape (Number of Assets)
+        :param budget: sum of the weights. None for no budget constraint.
+        :param fitness_type: objectives of the fitness (see Portfolio.fitness)
+        :param population_size: number of portfolios of the population
+        :param cardinality: maximum number of non-zero weights of each portfolio. None for no limit. The bounds
+                            should contain zero.
+        :param crossover_probability: probability of the crossover of each pair of parents
+        :param mutation_probability: probability of the mutation of each weight. Default is 1 / Number of Assets.
+        :param mutation_scale: standard deviation of the mutations relative to the range of the bounds
+        :param n_jobs: number of worker processes of the fitness evaluation of populations larger than
+                       PARALLEL_FITNESS_MIN_SIZE. None to use all the CPUs and 1 to evaluate in the current process.
+        :param seed: seed or random generator
+        :raise ValueError: when the bounds cannot reach the budget
+        """
+        self.returns = np.asarray(returns, dtype=float)
+        self.asset_nb = self.returns.shape[0]
+        self.lower_bounds = np.asarray(lower_bounds, dtype=float)
+        self.upper_bounds = np.asarray(upper_bounds, dtype=float)
+        self.budget = budget
+        self.fitness_type = fitness_type
+        self.population_size = population_size
+        self.cardinality = cardinality
+        self.crossover_probability = crossover_probability
+        if mutation_probability is None:
+            mutation_probability = 1 / self.asset_nb
+        self.mutation_probability = mutation_probability
+        self.mutation_scale = mutation_scale
+        self.n_jobs = n_jobs if n_jobs is not None else os.cpu_count()
+        self.rng = np.random.default_rng(seed)
+        self._validation()
+
+        self.weights = None
+        self.fitnesses = None
+        self.ranks = None
+        self.distances = None
+        self.generation = 0
+
+    def _validation(self):
+        if self.population_size < 2 or self.population_size % 2 != 0:
+            raise ValueError(f'population_size should be an even number greater than one, '
+                             f'but received {self.population_size}')
+        if self.cardinality is not None:
+            if not 1 <= self.cardinality <= self.asset_nb:
+                raise ValueError(f'cardinality should be between 1 and {self.asset_nb}, '
+                                 f'but received {self.cardinality}')
+            if np.any(self.lower_bounds > 0) or np.any(self.upper_bounds < 0):
+                raise ValueError(f'The weight bounds should contain zero when cardinality is provided')
+        if self.budget is not None:
+            lower_bounds, upper_bounds = self._default_support_bounds()
+            if lower_bounds.sum() > self.budget + NSGA2_TOLERANCE or upper_bounds.sum() < self.budget - NSGA2_TOLERANCE:
+                raise ValueError(f'The weight bounds of {self.cardinality or self.asset_nb} assets cannot sum to '
+                                 f'{self.budget}')
+
+    def _default_support_bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Bounds of the assets that reach the budget most easily: the cardinality assets of largest upper bounds
+        (smallest lower bounds for a negative budget)
+        """
+        if self.cardinality is None:
+            return self.lower_bounds, self.upper_bounds
+        if self.budget >= 0:
+            support = np.argsort(-self.upper_bounds, kind='stable')[:self.cardinality]
+        else:
+            support = np.argsort(self.lower_bounds, kind='stable')[:self.cardinality]
+        mask = np.zeros(self.asset_nb, dtype=bool)
+        mask[support] = True
+        return np.where(mask, self.lower_bounds, 0), np.where(mask, self.upper_bounds, 0)
+
+    def repair(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Closest weights of each portfolio within the weight bounds, the budget and the cardinality
+
+        :param weights: weights of shape (Number of Portfolios, Number of Assets)
+        :return: the repaired weights
+        """
+        lower_bounds = np.broadcast_to(self.lower_bounds, weights.shape)
+        upper_bounds = np.broadcast_to(self.upper_bounds, weights.shape)
+        if self.cardinality is not None and self.cardinality < self.asset_nb:
+            largest = np.argsort(-np.abs(weights), axis=1, kind='stable')[:, :self.cardinality]
+            support = np.zeros(weights.shape, dtype=bool)
+            np.put_along_axis(support, largest, True, axis=1)
+            lower_bounds = np.where(support, lower_bounds, 0)
+            upper_bounds = np.where(support, upper_bounds, 0)
+            if self.budget is not None:
+                # Supports that cannot reach the budget are replaced by the default support
+                unreachable = ((lower_bounds.sum(axis=1) > self.budget + NSGA2_TOLERANCE)
+                               | (upper_bounds.sum(axis=1) < self.budget - NSGA2_TOLERANCE))
+                if np.any(unreachable):
+                    default_lower_bounds, default_upper_bounds = self._default_support_bounds()
+                    lower_bounds[unreachable] = default_lower_bounds
+                    upper_bounds[unreachable] = default_upper_bounds
+        if self.budget is None:
+            return np.clip(weights, lower_bounds, upper_bounds)
+        repaired, _ = proximal_box_budget(v=weights,
+                                          lower_bounds=lower_bounds,
+                                          upper_bounds=upper_bounds,
+                                          budget=np.full(len(weights), float(self.budget)))
+        return repaired
+
+    def fitness(self, weights: np.ndarray, executor: Optional[ProcessPoolExecutor] = None) -> np.ndarray:
+        """
+        Fitness of the population (see population_fitness), split in one chunk per worker of the executor
+
+        :param weights: weights of shape (Number of Portfolios, Number of Assets)
+        :param executor: process pool initialized with the returns (see _executor). None to evaluate in the current
+                         process.
+        :return: the fitnesses of shape (Number of Portfolios, Number of Objectives)
+        """
+        if executor is None:
+            return population_fitness(weights=weights, returns=self.returns, fitness_type=self.fitness_type)
+        chunks = np.array_split(weights, self.n_jobs)
+        return np.concatenate(list(executor.map(_worker_fitness, chunks)))
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.n_jobs <= 1 or self.population_size < PARALLEL_FITNESS_MIN_SIZE:
+            return None
+        return ProcessPoolExecutor(max_workers=self.n_jobs,
+                                   initializer=_init_worker,
+                                   initargs=(self.returns, self.fitness_type))
+
+    def initial_population(self) -> np.ndarray:
+        """Random weights uniform within the bounds (of a random support with cardinality), repaired"""
+        weights = self.rng.uniform(self.lower_bounds, self.upper_bounds, size=(self.population_size, self.asset_nb))
+        if self.cardinality is not None:
+            scores = self.rng.random(weights.shape)
+            threshold = np.sort(scores, axis=1)[:, -self.cardinality][:, np.newaxis]
+            weights = np.where(scores >= threshold, weights, 0)
+        return self.repair(weights)
+
+    def _select(self) -> np.ndarray:
+        """Parents indices from binary tournaments on the rank then the crowding distance"""
+        candidates = self.rng.integers(self.population_size, size=(2, self.population_size))
+        first, second = candidates
+        first_wins = ((self.ranks[first] < self.ranks[second])
+                      | ((self.ranks[first] == self.ranks[second])
+                         & (self.distances[first] >= self.distances[second])))
+        return np.where(first_wins, first, second)
+
+    def _crossover(self, parents: np.ndarray) -> np.ndarray:
+        """Simulated binary crossover of the consecutive pairs of parents"""
+        first, second = parents[0::2], parents[1::2]
+        u = self.rng.random(first.shape)
+        beta = np.where(u <= 0.5,
+                        (2 * u) ** (1 / (SBX_ETA + 1)),
+                        (1 / (2 * (1 - u))) ** (1 / (SBX_ETA + 1)))
+        crossed = self.rng.random(len(first)) < self.crossover_probability
+        beta = np.where(crossed[:, np.newaxis], beta, 1)
+        children = np.empty_like(parents)
+        children[0::2] = 0.5 * ((1 + beta) * first + (1 - beta) * second)
+        children[1::2] = 0.5 * ((1 - beta) * first + (1 + beta) * second)
+        return children
+
+    def _mutate(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Gaussian mutation of each weight with mutation_probability. With a cardinality, the weights of a random
+        asset of the support and of a random asset outside the support are also swapped in each portfolio with
+        probability SWAP_PROBABILITY, so that the supports change even when the weights are at their bounds.
+        """
+        mutated = self.rng.random(weights.shape) < self.mutation_probability
+        noise = self.rng.normal(scale=self.mutation_scale * (self.upper_bounds - self.lower_bounds),
+                                size=weights.shape)
+        weights = weights + np.where(mutated, noise, 0)
+        if self.cardinality is not None and self.cardinality < self.asset_nb:
+            support = weights != 0
+            rows = np.flatnonzero((self.rng.random(len(weights)) < SWAP_PROBABILITY)
+                                  & support.any(axis=1) & ~support.all(axis=1))
+            scores = self.rng.random((len(rows), self.asset_nb))
+            inside = np.argmax(np.where(support[rows], scores, -1), axis=1)
+            outside = np.argmax(np.where(support[rows], -1, scores), axis=1)
+            weights[rows, inside], weights[rows, outside] = weights[rows, outside], weights[rows, inside]
+        return weights
+
+    def _survivors(self, weights: np.ndarray, fitnesses: np.ndarray):
+        """Best population_size portfolios by front then crowding distance, with their ranks and distances"""
+        selected, ranks, distances = [], [], []
+        selected_nb = 0
+        for rank, front in enumerate(non_dominated_fronts(fitnesses=fitnesses)):
+            front_distances = crowding_distance(fitnesses[front])
+            if selected_nb + len(front) > self.population_size:
+                kept = np.argsort(-front_distances, kind='stable')[:self.population_size - selected_nb]
+                front, front_distances = front[kept], front_distances[kept]
+            selected.append(front)
+            ranks.append(np.full(len(front), rank))
+            distances.append(front_distances)
+            selected_nb += len(front)
+            if selected_nb == self.population_size:
+                break
+        selected = np.concatenate(selected)
+        self.weights = weights[selected]
+        self.fitnesses = fitnesses[selected]
+        self.ranks = np.concatenate(ranks)
+        self.distances = np.concatenate(distances)
+
+    def run(self, generations: int = 100) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evolve the population for a number of generations, continuing from the last population when run again
+
+        :param generations: number of generations
+        :return: the weights and the fitnesses of the first front, by increasing first objective
+        """
+        executor = self._executor()
+        try:
+            if self.weights is None:
+                weights = self.initial_population()
+                self._survivors(weights=weights, fitnesses=self.fitness(weights=weights, executor=executor))
+            for _ in range(generations):
+                parents = self.weights[self._select()]
+                children = self.repair(self._mutate(self._crossover(parents)))
+                children_fitnesses = self.fitness(weights=children, executor=executor)
+                self._survivors(weights=np.concatenate([self.weights, children]),
+                                fitnesses=np.concatenate([self.fitnesses, children_fitnesses]))
+                self.generation += 1
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return self.first_front
+
+    @property
+    def first_front(self) -> tuple[np.ndarray, np.ndarray]:
+        """The weights and the fitnesses of the non-dominated portfolios, by increasing first objective"""
+        front = np.flatnonzero(self.ranks == 0)
+        front = front[np.argsort(self.fitnesses[front, 0], kind='stable')]
+        return self.weights[front], self.fitnesses[front]
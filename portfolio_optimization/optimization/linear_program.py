@@ -0,0 +1,461 @@
+import logging
+import time
+from typing import Optional, Union
+import numpy as np
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+from portfolio_optimization.optimization.solver import *
+
+__all__ = ['LINEAR_PROGRAM_SOLVER',
+           'CUTTING_PLANE_SOLVER',
+           'LinearProgram',
+           'CvarCuttingPlane',
+           'cvar_linear_program',
+           'cdar_linear_program']
+
+logger = logging.getLogger('portfolio_optimization.linear_program')
+
+# Solver name of the SolveRecord of the linear programs solved with scipy.optimize.linprog
+LINEAR_PROGRAM_SOLVER = 'HIGHS'
+# Solver name of the SolveRecord of the cutting-plane CVaR
+CUTTING_PLANE_SOLVER = 'CUTTING_PLANE'
+# Tolerance of the excess of the scenario losses over alpha of the cutting-plane solutions, relative to their largest
+# loss: the default primal feasibility tolerance of HiGHS
+CUTTING_PLANE_TOLERANCE = 1e-7
+# CVXPY status of each status of scipy.optimize.linprog
+LINPROG_STATUS = {0: 'optimal',
+                  1: 'user_limit',
+                  2: 'infeasible',
+                  3: 'unbounded',
+                  4: 'solver_error'}
+
+
+class LinearProgram:
+    def __init__(self,
+                 c: np.ndarray,
+                 a_ub: sp.csr_matrix,
+                 b_ub: np.ndarray,
+                 a_eq: Optional[sp.csr_matrix],
+                 b_eq: Optional[np.ndarray],
+                 bounds: np.ndarray,
+                 asset_nb: int,
+                 target_row: int = 0):
+        """
+        Linear program in the form of scipy.optimize.linprog, built directly with sparse matrices:
+            minimize c'x  s.t.  a_ub @ x <= b_ub, a_eq @ x == b_eq, bounds[:, 0] <= x <= bounds[:, 1]
+        The weights are the first asset_nb variables and the risk target is the right-hand side of the row
+        target_row of a_ub, so that the frontier is solved by only changing b_ub. The endpoints of the frontier are
+        solved without the target row: the minimum risk portfolio minimizes the target row and the maximum return
+        portfolio minimizes c.
+
+        :param c: objective coefficients
+        :param a_ub: inequality constraints matrix
+        :param b_ub: inequality constraints right-hand side
+        :param a_eq: equality constraints matrix
+        :param b_eq: equality constraints right-hand side
+        :param bounds: lower and upper bounds of the variables of shape (Number of Variables, 2)
+        :param asset_nb: number of assets
+        :param target_row: row of the risk target constraint in a_ub
+        """
+        self.c = c
+        self.a_ub = a_ub
+        self.b_ub = b_ub
+        self.a_eq = a_eq
+        self.b_eq = b_eq
+        self.bounds = bounds
+        self.asset_nb = asset_nb
+        self.target_row = target_row
+
+    @property
+    def risk_objective(self) -> np.ndarray:
+        """Coefficients of the risk target row, minimized by the minimum risk portfolio"""
+        return self.a_ub[self.target_row].toarray().ravel()
+
+    def linprog(self, c: np.ndarray, target: Optional[float] = None):
+        """
+        Solve the linear program of objective c with HiGHS
+
+        :param c: objective coefficients
+        :param target: value of the risk target. None to solve without the risk target row.
+        :return: the scipy.optimize.OptimizeResult
+        """
+        if target is None:
+            rows = np.arange(self.a_ub.shape[0]) != self.target_row
+            a_ub, b_ub = self.a_ub[rows], self.b_ub[rows]
+        else:
+            a_ub, b_ub = self.a_ub, self.b_ub.copy()
+            b_ub[self.target_row] = target
+        return linprog(c=c,
+                       A_ub=a_ub,
+                       b_ub=b_ub,
+                       A_eq=self.a_eq,
+                       b_eq=self.b_eq,
+                       bounds=self.bounds,
+                       method='highs')
+
+    def _solve(self,
+               c: np.ndarray,
+               target: Optional[float],
+               sign: float,
+               name: str) -> tuple[Optional[np.ndarray], SolveRecord]:
+        start = time.perf_counter()
+        result = self.linprog(c=c, target=target)
+        record = SolveRecord(target=target,
+                             solver=LINEAR_PROGRAM_SOLVER,
+                             status=LINPROG_STATUS.get(result.status, 'solver_error'),
+                             iterations=result.nit,
+                             objective=sign * float(result.fun) if result.status == 0 else None,
+                             wall_time=time.perf_counter() - start,
+                             error=None if result.status == 0 else result.message)
+        if result.status != 0:
+            logger.warning(f'None return for {name}: {result.message}')
+            return None, record
+        return result.x[:self.asset_nb], record
+
+    def solve(self, target: float) -> tuple[Optional[np.ndarray], SolveRecord]:
+        """
+        Solve the linear program for the risk target with HiGHS
+
+        :param target: value of the risk target
+        :return: the weights (None when the optimization failed) and the SolveRecord of the solve
+        """
+        return self._solve(c=self.c, target=target, sign=-1, name=str(target))
+
+    def min_risk(self) -> tuple[Optional[np.ndarray], SolveRecord]:
+        """
+        Minimum risk portfolio under the weight bounds and budget
+
+        :return: the weights (None when the optimization failed) and the SolveRecord of the solve, whose objective
+                 is the minimum risk
+        """
+        return self._solve(c=self.risk_objective, target=None, sign=1, name='the minimum risk portfolio')
+
+    def max_return(self) -> tuple[Optional[np.ndarray], SolveRecord]:
+        """
+        Maximum return portfolio (without risk target) under the weight bounds and budget
+
+        :return: the weights (None when the optimization failed) and the SolveRecord of the solve
+        """
+        return self._solve(c=self.c, target=None, sign=-1, name='the maximum return portfolio')
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """Number of constraints and number of variables"""
+        eq_nb = 0 if self.a_eq is None else self.a_eq.shape[0]
+        return self.a_ub.shape[0] + eq_nb, len(self.c)
+
+    def __str__(self):
+        return f'LinearProgram <{self.shape[0]} constraints - {self.shape[1]} variables>'
+
+    def __repr__(self):
+        return str(self)
+
+
+def _linear_program(values: dict[str, Union[float, np.ndarray]],
+                    risk_row: sp.csr_matrix,
+                    scenario_rows: sp.csr_matrix,
+                    risk_bounds: np.ndarray,
+                    investment_target: Optional[float]) -> LinearProgram:
+    """
+    Linear program maximizing the expected returns net of costs with weight bounds and budget, from the risk
+    constraints on the variables [w, risk variables].
+    The costs |daily_costs * w - daily_costs_prev_w| are added as variables t >= ±(daily_costs * w -
+    daily_costs_prev_w).
+
+    :param values: the problem data (see Optimization._problem_values)
+    :param risk_row: the risk target row on [w, risk variables]
+    :param scenario_rows: the other risk constraints (<= 0) on [w, risk variables]
+    :param risk_bounds: bounds of the risk variables of shape (Number of Risk Variables, 2)
+    :param investment_target: sum of the weights. None for no budget constraint.
+    """
+    asset_nb = len(values['expected_returns'])
+    risk_variable_nb = risk_bounds.shape[0]
+    c = np.concatenate([-values['expected_returns'], np.zeros(risk_variable_nb)])
+    a_ub = sp.vstack([risk_row, scenario_rows], format='csr')
+    b_ub = np.zeros(a_ub.shape[0])
+    bounds = np.vstack([np.column_stack([values['lower_bounds'], values['upper_bounds']]), risk_bounds])
+
+    if 'daily_costs' in values:
+        costs = sp.diags(values['daily_costs'])
+        zeros = sp.csr_matrix((asset_nb, risk_variable_nb))
+        identity = sp.identity(asset_nb)
+        costs_rows = sp.vstack([sp.hstack([costs, zeros, -identity]),
+                                sp.hstack([-costs, zeros, -identity])], format='csr')
+        a_ub = sp.vstack([sp.hstack([a_ub, sp.csr_matrix((a_ub.shape[0], asset_nb))]), costs_rows], format='csr')
+        b_ub = np.concatenate([b_ub, values['daily_costs_prev_w'], -values['daily_costs_prev_w']])
+        c = np.concatenate([c, np.ones(asset_nb)])
+        bounds = np.vstack([bounds, np.column_stack([np.zeros(asset_nb), np.full(asset_nb, np.inf)])])
+
+    a_eq, b_eq = None, None
+    if investment_target is not None:
+        a_eq = sp.csr_matrix(np.concatenate([np.ones(asset_nb), np.zeros(len(c) - asset_nb)])[np.newaxis, :])
+        b_eq = np.array([investment_target], dtype=float)
+
+    return LinearProgram(c=c, a_ub=a_ub, b_ub=b_ub, a_eq=a_eq, b_eq=b_eq, bounds=bounds, asset_nb=asset_nb)
+
+
+def cvar_linear_program(values: dict[str, Union[float, np.ndarray]],
+                        returns: np.ndarray,
+                        beta: float,
+                        investment_target: Optional[float] = None) -> LinearProgram:
+    """
+    Mean-CVaR linear program (Rockafellar-Uryasev) on the variables [w, alpha, u]:
+        alpha + 1 / (T * (1 - beta)) * sum(u) <= target
+        - returns.T @ w - alpha - u <= 0
+        u >= 0
+
+    :param values: the problem data (see Optimization._problem_values)
+    :param returns: returns of shape (Number of Assets, Number of Dates)
+    :param beta: CVaR confidence level
+    :param investment_target: sum of the weights. None for no budget constraint.
+    """
+    asset_nb, date_nb = returns.shape
+    cvar_coef = 1.0 / (date_nb * (1 - beta))
+    risk_row = sp.csr_matrix(np.concatenate([np.zeros(asset_nb), [1.0], np.full(date_nb, cvar_coef)])[np.newaxis, :])
+    scenario_rows = sp.hstack([sp.csr_matrix(-returns.T),
+                               sp.csr_matrix(-np.ones((date_nb, 1))),
+                               -sp.identity(date_nb)], format='csr')
+    risk_bounds = np.vstack([[-np.inf, np.inf],
+                             np.column_stack([np.zeros(date_nb), np.full(date_nb, np.inf)])])
+    return _linear_program(values=values,
+                           risk_row=risk_row,
+                           scenario_rows=scenario_rows,
+                           risk_bounds=risk_bounds,
+                           investment_target=investment_target)
+
+
+def cdar_linear_program(values: dict[str, Union[float, np.ndarray]],
+                        returns: np.ndarray,
+                        beta: float,
+                        investment_target: Optional[float] = None) -> LinearProgram:
+    """
+    Mean-CDaR linear program on the variables [w, alpha, u, z] where u are the running maxima of the uncompounded
+    cumulative losses (u_0 = 0) and z the drawdowns above alpha:
+        alpha + 1 / (T * (1 - beta)) * sum(z) <= target
+        u - alpha - z <= 0
+        - returns.T @ w + D @ u <= 0, with D the difference matrix (D @ u)_t = u_{t-1} - u_t
+        u >= 0, z >= 0
+
+    :param values: the problem data (see Optimization._problem_values)
+    :param returns: returns of shape (Number of Assets, Number of Dates)
+    :param beta: CDaR confidence level
+    :param investment_target: sum of the weights. None for no budget constraint.
+    """
+    asset_nb, date_nb = returns.shape
+    cdar_coef = 1.0 / (date_nb * (1 - beta))
+    risk_row = sp.csr_matrix(np.concatenate([np.zeros(asset_nb),
+                                             [1.0],
+                                             np.zeros(date_nb),
+                                             np.full(date_nb, cdar_coef)])[np.newaxis, :])
+    identity = sp.identity(date_nb)
+    # u_{t-1} - u_t with u_0 = 0
+    difference = sp.diags([np.ones(date_nb - 1), -np.ones(date_nb)], offsets=[-1, 0])
+    drawdown_rows = sp.hstack([sp.csr_matrix((date_nb, asset_nb)),
+                               sp.csr_matrix(-np.ones((date_nb, 1))),
+                               identity,
+                               -identity])
+    running_max_rows = sp.hstack([sp.csr_matrix(-returns.T),
+                                  sp.csr_matrix((date_nb, 1)),
+                                  difference,
+                                  sp.csr_matrix((date_nb, date_nb))])
+    scenario_rows = sp.vstack([drawdown_rows, running_max_rows], format='csr')
+    risk_bounds = np.vstack([[-np.inf, np.inf],
+                             np.column_stack([np.zeros(2 * date_nb), np.full(2 * date_nb, np.inf)])])
+    return _linear_program(values=values,
+                           risk_row=risk_row,
+                           scenario_rows=scenario_rows,
+                           risk_bounds=risk_bounds,
+                           investment_target=investment_target)
+
+
+class CvarCuttingPlane:
+    def __init__(self,
+                 values: dict[str, Union[float, np.ndarray]],
+                 returns: np.ndarray,
+                 beta: float,
+                 investment_target: Optional[float] = None,
+                 tolerance: float = CUTTING_PLANE_TOLERANCE,
+                 max_iterations: int = 100):
+        """
+        Mean-CVaR by scenario generation with aggregated cuts (Künzi-Bay & Mayer). The CVaR is
+            CVaR(w) = min_alpha alpha + 1 / (T * (1 - beta)) * sum_t max(loss_t(w) - alpha, 0)
+        The master LP on the variables [w, alpha, v, u] only keeps a variable u_t and a row for the active scenarios,
+        as in the Rockafellar-Uryasev LP, and bounds the other scenarios by aggregated cuts on the single variable v:
+            alpha + 1 / (T * (1 - beta)) * (v + sum(u)) <= target
+            loss_t(w) - alpha - u_t <= 0  for each active scenario t
+            v >= sum_{t in K} (loss_t(w) - alpha)  for each cut K, over its inactive scenarios
+        After each solve of the master LP, the scenarios whose loss exceeds alpha become active, at most
+        (1 - beta) * T per iteration by decreasing excess, the others being added as one aggregated cut. When no
+        inactive scenario exceeds alpha, the solution is the solution of the Rockafellar-Uryasev LP. The aggregated
+        cuts alone (Kelley's method) converge very slowly when short positions are allowed: activating the tail
+        scenarios converges in a few iterations while the master LP only holds the scenarios that were in the tail
+        of a solution. The active scenarios and the cuts are valid for any target and are kept across the targets
+        of the frontier.
+
+        :param values: the problem data (see Optimization._problem_values)
+        :param returns: returns of shape (Number of Assets, Number of Scenarios)
+        :param beta: CVaR confidence level
+        :param investment_target: sum of the weights. None for no budget constraint.
+        :param tolerance: tolerance of the excess of the scenario losses over alpha, relative to the largest loss of
+                          the solution
+        :param max_iterations: maximum number of master LP solves per target
+        """
+        self.values = values
+        self.returns = returns
+        self.beta = beta
+        self.investment_target = investment_target
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.asset_nb, scenario_nb = returns.shape
+        self.cvar_coef = 1.0 / (scenario_nb * (1 - beta))
+        # Maximum number of scenarios activated per iteration: the size of the tail
+        self.tail_nb = int(np.ceil((1 - beta) * scenario_nb))
+
+        # alpha is the VaR of the solution, bounded by the largest loss or gain of any portfolio within the bounds
+        max_weights = np.maximum(np.abs(values['lower_bounds']), np.abs(values['upper_bounds']))
+        self.alpha_bound = float(np.max(np.abs(returns).T @ max_weights))
+
+        self.active = np.zeros(scenario_nb, dtype=bool)
+        # Rows of the cuts on [w, alpha, v] and their inactive scenarios, preallocated and grown by doubling
+        self.cut_nb = 0
+        self._cut_rows = np.zeros((8, self.asset_nb + 2))
+        self._cut_scenarios = np.zeros((8, scenario_nb), dtype=bool)
+        # First cut: all the scenarios
+        self._add_cut(np.ones(scenario_nb, dtype=bool))
+
+    @property
+    def active_nb(self) -> int:
+        """Number of active scenarios of the master LP"""
+        return int(self.active.sum())
+
+    def _add_cut(self, scenarios: np.ndarray):
+        """Add the cut -sum_{t in K} returns_t @ w - |K| * alpha - v <= 0 of the scenarios K"""
+        if self.cut_nb == len(self._cut_rows):
+            self._cut_rows = np.vstack([self._cut_rows, np.zeros_like(self._cut_rows)])
+            self._cut_scenarios = np.vstack([self._cut_scenarios, np.zeros_like(self._cut_scenarios)])
+        self._cut_rows[self.cut_nb, :self.asset_nb] = -self.returns[:, scenarios].sum(axis=1)
+        self._cut_rows[self.cut_nb, self.asset_nb] = -scenarios.sum()
+        self._cut_rows[self.cut_nb, self.asset_nb + 1] = -1
+        self._cut_scenarios[self.cut_nb] = scenarios
+        self.cut_nb += 1
+
+    def _activate(self, scenarios: np.ndarray):
+        """Give a row to the scenarios and remove them from the cuts, which only aggregate the inactive scenarios"""
+        cut_scenarios = self._cut_scenarios[:self.cut_nb, scenarios]
+        self._cut_rows[:self.cut_nb, :self.asset_nb] += cut_scenarios @ self.returns[:, scenarios].T
+        self._cut_rows[:self.cut_nb, self.asset_nb] += cut_scenarios.sum(axis=1)
+        self._cut_scenarios[:self.cut_nb, scenarios] = False
+        self.active[scenarios] = True
+
+    def _add_scenarios(self, excess: np.ndarray, scenarios: np.ndarray):
+        """
+        Activate the scenarios of largest excess over alpha, at most tail_nb, and add the cut of the others
+
+        :param excess: excess of the losses over alpha of all the scenarios
+        :param scenarios: indices of the inactive scenarios exceeding alpha
+        """
+        if len(scenarios) > self.tail_nb:
+            scenarios = scenarios[np.argsort(-excess[scenarios], kind='stable')]
+            cut = np.zeros(len(excess), dtype=bool)
+            cut[scenarios[self.tail_nb:]] = True
+            self._add_cut(cut)
+            scenarios = scenarios[:self.tail_nb]
+        self._activate(scenarios)
+
+    @property
+    def linear_program(self) -> LinearProgram:
+        """The master LP on the variables [w, alpha, v, u] of the current active scenarios and cuts"""
+        active = np.flatnonzero(self.active)
+        active_nb = len(active)
+        risk_row = sp.csr_matrix(np.concatenate([np.zeros(self.asset_nb),
+                                                 [1.0],
+                                                 np.full(active_nb + 1, self.cvar_coef)])[np.newaxis, :])
+        active_rows = sp.hstack([sp.csr_matrix(-self.returns[:, active].T),
+                                 sp.csr_matrix(-np.ones((active_nb, 1))),
+                                 sp.csr_matrix((active_nb, 1)),
+                                 -sp.identity(active_nb)])
+        cut_rows = sp.hstack([sp.csr_matrix(self._cut_rows[:self.cut_nb]), sp.csr_matrix((self.cut_nb, active_nb))])
+        risk_bounds = np.vstack([[-self.alpha_bound, self.alpha_bound],
+                                 [0, np.inf],
+                                 np.column_stack([np.zeros(active_nb), np.full(active_nb, np.inf)])])
+        return _linear_program(values=self.values,
+                               risk_row=risk_row,
+                               scenario_rows=sp.vstack([active_rows, cut_rows], format='csr'),
+                               risk_bounds=risk_bounds,
+                               investment_target=self.investment_target)
+
+    def solve(self, target: float) -> tuple[Optional[np.ndarray], SolveRecord]:
+        """
+        Solve the master LP for the CVaR target, activating scenarios until none exceeds alpha
+
+        :param target: value of the CVaR target
+        :return: the weights (None when the optimization failed) and the SolveRecord of the solve
+        """
+        return self._solve(target=target, min_risk=False, name=str(target))
+
+    def min_risk(self) -> tuple[Optional[np.ndarray], SolveRecord]:
+        """
+        Minimum CVaR portfolio, minimizing the risk row of the master LP. Its tail scenarios are activated so that
+        the targets close to the minimum start from them.
+
+        :return: the weights (None when the optimization failed) and the SolveRecord of the solve, whose objective
+                 is the minimum CVaR
+        """
+        return self._solve(target=None, min_risk=True, name='the minimum risk portfolio')
+
+    def max_return(self) -> tuple[Optional[np.ndarray], SolveRecord]:
+        """
+        Maximum return portfolio (without CVaR target): the scenarios do not constrain the weights and none is
+        activated
+
+        :return: the weights (None when the optimization failed) and the SolveRecord of the solve
+        """
+        weights, record = self.linear_program.max_return()
+        record.solver = CUTTING_PLANE_SOLVER
+        return weights, record
+
+    def _solve(self,
+               target: Optional[float],
+               min_risk: bool,
+               name: str) -> tuple[Optional[np.ndarray], SolveRecord]:
+        start = time.perf_counter()
+        status = 'user_limit'
+        error = f'No convergence in {self.max_iterations} iterations'
+        result = None
+        for iteration in range(1, self.max_iterations + 1):
+            linear_program = self.linear_program
+            c = linear_program.risk_objective if min_risk else linear_program.c
+            result = linear_program.linprog(c=c, target=target)
+            if result.status != 0:
+                status = LINPROG_STATUS.get(result.status, 'solver_error')
+                error = result.message
+                break
+            weights, alpha = result.x[:self.asset_nb], result.x[self.asset_nb]
+            losses = -(weights @ self.returns)
+            excess = losses - alpha
+            scenarios = np.flatnonzero((excess > self.tolerance * np.max(np.abs(losses))) & ~self.active)
+            if len(scenarios) == 0:
+                status = 'optimal'
+                break
+            self._add_scenarios(excess=excess, scenarios=scenarios)
+
+        sign = 1 if min_risk else -1
+        record = SolveRecord(target=target,
+                             solver=CUTTING_PLANE_SOLVER,
+                             status=status,
+                             iterations=iteration,
+                             objective=sign * float(result.fun) if status == 'optimal' else None,
+                             wall_time=time.perf_counter() - start,
+                             error=None if status == 'optimal' else error)
+        if status != 'optimal':
+            logger.warning(f'None return for {name}: {status}')
+            return None, record
+        return result.x[:self.asset_nb], record
+
+    def __str__(self):
+        return (f'CvarCuttingPlane <{self.returns.shape[1]} scenarios - {self.active_nb} active - '
+                f'{self.cut_nb} cuts>')
+
+    def __repr__(self):
+        return str(self)
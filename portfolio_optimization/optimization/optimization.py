@@ -1,5 +1,10 @@
+import functools
+import inspect
 import logging
-from typing import Union, Optional
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union, Optional, Callable
 import numpy as np
 import cvxpy as cp
 from cvxpy import SolverError
@@ -9,11 +14,137 @@ from portfolio_optimization.meta import *
 from portfolio_optimization.assets import *
 from portfolio_optimization.exception import *
 from portfolio_optimization.utils.tools import *
-
-__all__ = ['Optimization']
+from portfolio_optimization.utils.linalg import *
+from portfolio_optimization.optimization.problem_cache import *
+from portfolio_optimization.optimization.solver import *
+from portfolio_optimization.optimization.analytical import *
+from portfolio_optimization.optimization.cla import *
+from portfolio_optimization.optimization.linear_program import *
+from portfolio_optimization.optimization.first_order import *
+from portfolio_optimization.optimization.frontier import *
+from portfolio_optimization.optimization.genetic import *
+from portfolio_optimization.optimization.result_cache import *
+
+__all__ = ['WARM_START_SOLVER',
+           'WARM_START_SOLVER_PARAMS',
+           'WARM_START_SOLVERS',
+           'Optimization']
 
 logger = logging.getLogger('portfolio_optimization.optimization')
 
+# Solver used for the warm-started frontier sweeps. ECOS cannot be warm-started.
+WARM_START_SOLVER = 'SCS'
+# The returns and variances are daily so the default tolerances of SCS are too loose
+WARM_START_SOLVER_PARAMS = {'eps_abs': 1e-8, 'eps_rel': 1e-8}
+# Solvers supporting the warm start of CVXPY
+WARM_START_SOLVERS = ['SCS', 'OSQP']
+# Solver name of the SolveRecord of the closed-form frontier
+ANALYTICAL_SOLVER = 'ANALYTICAL'
+# Tolerance of the weight bounds check of the closed-form frontier
+ANALYTICAL_BOUNDS_TOLERANCE = 1e-10
+# Solver name of the SolveRecord of the Critical Line Algorithm
+CLA_SOLVER = 'CLA'
+# Relative tolerance of the minimum risk below which a target is skipped by the feasibility check
+FEASIBILITY_TOLERANCE = 1e-4
+# Relative tolerance of the Sharpe ratio between two Dinkelbach iterations of maximum_sharpe
+DINKELBACH_TOLERANCE = 1e-6
+# Maximum number of solves of the Dinkelbach iterations of maximum_sharpe
+DINKELBACH_MAX_ITERATIONS = 30
+# Statuses of the solves that depend on the machine load or on a transient failure: the results holding one of them
+# are not stored in the result_cache
+UNCACHED_STATUSES = [TIME_LIMIT_STATUS, SOLVER_ERROR_STATUS]
+
+
+def _solve_targets(problem: cp.Problem,
+                   w: cp.Variable,
+                   parameter: cp.Parameter,
+                   targets: Union[list, np.ndarray],
+                   solver_config: SolverConfig,
+                   warm_start: bool = False,
+                   solve: Optional[Callable[[float], SolveRecord]] = None
+                   ) -> tuple[list[Optional[np.ndarray]], list[SolveRecord]]:
+    """
+    Solve the problem for each value of the target parameter.
+    With warm_start, the targets are solved in increasing order so that each solve is warm-started from the solution
+    of the closest target.
+    This function is also run in the worker processes of the parallel frontier.
+
+    :param problem: the problem
+    :param w: the weights variable of the problem
+    :param parameter: the target parameter of the problem
+    :param targets: the target values
+    :param solver_config: the solver configuration
+    :param warm_start: True to warm-start the solves
+    :param solve: function solving the problem for a target value and returning its SolveRecord.
+                  Default is solve_problem()
+    :return: the weights and the SolveRecord of each target in the order of the targets. The weights are None when
+             the optimization failed.
+    """
+    if solve is None:
+        def solve(target: float) -> SolveRecord:
+            return solve_problem(problem=problem, solver_config=solver_config, target=target, warm_start=warm_start)
+
+    if warm_start:
+        order = np.argsort(targets, kind='stable')
+    else:
+        order = range(len(targets))
+
+    results = [None] * len(targets)
+    records = [None] * len(targets)
+    for i in order:
+        value = targets[i]
+        parameter.value = value
+        start = time.perf_counter()
+        try:
+            records[i] = solve(value)
+            if w.value is None:
+                logger.warning(f'None return for {value}')
+            results[i] = w.value
+        except SolverError as e:
+            logger.warning(f'SolverError for {value}: {e}')
+            records[i] = SolveRecord(target=value,
+                                     status='solver_error',
+                                     wall_time=time.perf_counter() - start,
+                                     error=str(e))
+        except ArpackNoConvergence as e:
+            logger.warning(f'ArpackNoConvergence for {value}: {e}')
+            records[i] = SolveRecord(target=value,
+                                     status='arpack_no_convergence',
+                                     wall_time=time.perf_counter() - start,
+                                     error=str(e))
+    return results, records
+
+
+def _cached_result(method: Callable) -> Callable:
+    """
+    Decorator of the optimization methods: with a result_cache, the stored result of an identical optimization is
+    returned without solving and the result of the other optimizations is stored, unless one of its solves was
+    stopped by the time budget or failed (see UNCACHED_STATUSES)
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.result_cache is None:
+            return method(self, *args, **kwargs)
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        key = self._result_key(method=method.__name__,
+                               arguments={k: v for k, v in arguments.arguments.items() if k != 'self'})
+        result = self.result_cache.get(key)
+        if result is not None:
+            logger.debug(f'Cached result of {method.__name__}')
+            self._result = result
+            return result.weights
+        weights = method(self, *args, **kwargs)
+        if any(record.status in UNCACHED_STATUSES for record in self._result.records):
+            logger.debug(f'Result of {method.__name__} not cached')
+        else:
+            self.result_cache.add(key=key, result=self._result)
+        return weights
+
+    return wrapper
+
 
 class Optimization:
     def __init__(self,
@@ -23,7 +154,14 @@ class Optimization:
                                       Optional[Union[float, np.ndarray]]] = (None, None),
                  costs: Optional[Union[float, np.ndarray]] = None,
                  investment_duration_in_days: Optional[int] = None,
-                 prev_w: Optional[np.ndarray] = None):
+                 prev_w: Optional[np.ndarray] = None,
+                 problem_cache: Optional[ProblemCache] = None,
+                 warm_start: bool = False,
+                 n_jobs: Optional[int] = 1,
+                 solver_config: Optional[SolverConfig] = None,
+                 covariance_model: Optional[Union[str, int]] = None,
+                 feasibility_check: bool = True,
+                 result_cache: Optional[ResultCache] = None):
         """
         :param investment_type: investment type (fully invested, market neutral, unconstrained)
         :type investment_type: InvestmentType
@@ -63,6 +201,69 @@ class Optimization:
 
         :param prev_w: previous weights
         :type prev_w: np.ndarray of shape(Number of Assets), default None (equivalent to an array of zeros)
+
+        :param problem_cache: cache of compiled problems. When provided, the problems are built with cp.Parameter
+                              for all their data (expected returns, covariance factor, returns, bounds, costs,
+                              prev_w) and kept in the cache, so solving the same problem structure on new data
+                              (for example across walk forward windows) skips the CVXPY canonicalization.
+                              The problems with more than MAX_PARAMETER_SIZE (32768) parameter entries are not
+                              cached unless their method is opted in (see ProblemCache max_parameter_size). The
+                              scenario methods (mean_semivariance, mean_cvar and mean_cdar) hold the returns of
+                              every observation, so on a real history (100 assets over a few years) they are only
+                              cached with an explicit limit, for example
+                              ProblemCache(max_parameter_size={'mean_cvar': None}). Their compilation is slow and
+                              memory-intensive at that size (about 10s and 1.3GB for 99 assets over 1565 days).
+                              The same ProblemCache can be shared by several Optimization instances.
+        :type problem_cache: ProblemCache, default None
+
+        :param warm_start: if True, the efficient frontiers (array of targets or population_size) are solved with
+                           WARM_START_SOLVER when the solver of solver_config cannot be warm-started. The targets are
+                           solved in increasing order and each solve starts from the primal/dual solution of the
+                           previous (closest) target.
+                           The weights are returned in the order of the targets.
+        :type warm_start: bool, default False
+
+        :param n_jobs: number of worker processes used to solve the efficient frontiers (array of targets or
+                       population_size). The targets are split in one chunk per worker; each worker builds the problem
+                       once and solves its chunk. The weights are returned in the order of the targets.
+                       None to use all the CPUs and 1 to solve in the current process.
+        :type n_jobs: int, default 1
+
+        :param solver_config: solver name, tolerance, maximum iterations, time limit, time budget per target and
+                              fallback chain (retried on solver errors and inaccurate statuses).
+                              The SolveRecord of each solve (status, setup time, solve time, iterations, objective)
+                              is gathered with the weights in the OptimizationResult of the last optimization: result.
+                              The attempts of each solver of the chain are in result.attempts.
+        :type solver_config: SolverConfig, default None (ECOS with its default parameters)
+
+        :param covariance_model: formulation of the variance in mean_variance and maximum_sharpe:
+                                 * None: quadratic form of the dense covariance (factor F of the covariance with a
+                                   problem cache)
+                                 * 'cholesky': sum_squares(F.T @ w) with F the Cholesky factor of the covariance
+                                 * rank k (int): sum_squares(B.T @ w) + sum_squares(d * w) with the low-rank plus
+                                   diagonal factor model covariance ≈ B @ B.T + diag(d ** 2) of k factors (see
+                                   factor_model). The problem size grows with Number of Assets * k instead of
+                                   Number of Assets².
+                                 The factorizations are cached on the Assets (see Assets.expected_cov_cholesky and
+                                 Assets.expected_cov_eigen). They avoid the PSD check of the quadratic form (and its
+                                 ARPACK path).
+        :type covariance_model: str or int, default None
+
+        :param feasibility_check: if True, the minimum risk portfolio is solved before an array of targets (or
+                                  population_size) and the targets below its risk, which cannot be reached under the
+                                  weight bounds and the budget, are skipped: their weights are None (dropped with
+                                  ignore_none) and their SolveRecord is infeasible with solver
+                                  FEASIBILITY_CHECK_SOLVER (see OptimizationResult.skipped). The 'highs' and
+                                  'cutting_plane' engines solve the minimum risk with their linear program.
+        :type feasibility_check: bool, default True
+
+        :param result_cache: on-disk cache of the results of mean_variance, mean_variance_cla, maximum_sharpe,
+                             mean_semivariance, mean_cvar and mean_cdar keyed by the fingerprint of their inputs
+                             (see ResultCache). A repeated optimization on the same data and settings returns the
+                             stored weights and SolveRecord without solving. The results with a solve stopped by
+                             the target_time_limit of the solver_config or failed are not stored. The same
+                             ResultCache can be shared by several Optimization instances.
+        :type result_cache: ResultCache, default None
         """
         self.assets = assets
         self.investment_type = investment_type
@@ -70,6 +271,16 @@ class Optimization:
         self.costs = costs
         self.investment_duration_in_days = investment_duration_in_days
         self.prev_w = prev_w
+        self.problem_cache = problem_cache
+        self.warm_start = warm_start
+        self.n_jobs = n_jobs
+        if solver_config is None:
+            solver_config = SolverConfig()
+        self.solver_config = solver_config
+        self.covariance_model = covariance_model
+        self.feasibility_check = feasibility_check
+        self.result_cache = result_cache
+        self._result = None
         self.loaded = True
         self._validation()
 
@@ -80,7 +291,14 @@ class Optimization:
                         'weight_bounds',
                         'costs',
                         'investment_duration_in_days',
-                        'prev_w']
+                        'prev_w',
+                        'problem_cache',
+                        'warm_start',
+                        'n_jobs',
+                        'solver_config',
+                        'covariance_model',
+                        'feasibility_check',
+                        'result_cache']
         for k, v in kwargs.items():
             if k not in valid_kwargs:
                 raise TypeError(f'Invalid keyword argument {k}')
@@ -89,7 +307,7 @@ class Optimization:
         self.loaded = True
 
     def __setattr__(self, name, value):
-        if name != 'loaded' and self.__dict__.get('loaded'):
+        if name != 'loaded' and not name.startswith('_') and self.__dict__.get('loaded'):
             logger.warning(f'Attributes should be updated with the update() method to allow proper validation')
         super().__setattr__(name, value)
 
@@ -131,42 +349,239 @@ class Optimization:
             if len(self.prev_w) != self.assets.asset_nb:
                 raise ValueError(f'prev_w should be of size {self.assets.asset_nb} but received {len(self.prev_w)}')
 
-    def _portfolio_returns(self,
-                           w: cp.Variable,
-                           l1_coef: Optional[float] = None,
-                           l2_coef: Optional[float] = None) -> cp.Expression:
-        if self.costs is None or (np.isscalar(self.costs) and self.costs == 0):
-            portfolio_cost = 0
-        else:
+        if not isinstance(self.solver_config, SolverConfig):
+            raise TypeError(f'solver_config should be of type SolverConfig')
+
+        if self.result_cache is not None and not isinstance(self.result_cache, ResultCache):
+            raise TypeError(f'result_cache should be of type ResultCache')
+
+        if self.n_jobs is not None and self.n_jobs < 1:
+            raise ValueError(f'n_jobs should be None or strictly positive, but received {self.n_jobs}')
+
+        if self.covariance_model is not None and self.covariance_model != 'cholesky':
+            if not isinstance(self.covariance_model, int) or isinstance(self.covariance_model, bool):
+                raise ValueError(f"covariance_model should be None, 'cholesky' or the number of factors, "
+                                 f"but received {self.covariance_model}")
+            if not 1 <= self.covariance_model <= self.assets.asset_nb:
+                raise ValueError(f'The number of factors of covariance_model should be between 1 and '
+                                 f'{self.assets.asset_nb}, but received {self.covariance_model}')
+
+    def _result_key(self, method: str, arguments: dict) -> str:
+        """
+        Fingerprint of an optimization for the result cache: the returns, expected returns and expected covariance,
+        the method and its arguments and the settings changing the solution (the problem cache and n_jobs do not)
+        """
+        settings = {'investment_type': self.investment_type,
+                    'weight_bounds': self.weight_bounds,
+                    'costs': self.costs,
+                    'investment_duration_in_days': self.investment_duration_in_days,
+                    'prev_w': self.prev_w,
+                    'warm_start': self.warm_start,
+                    'covariance_model': self.covariance_model,
+                    'feasibility_check': self.feasibility_check,
+                    'solver': self.solver_config.solvers,
+                    'tolerance': self.solver_config.tolerance,
+                    'max_iters': self.solver_config.max_iters,
+                    'time_limit': self.solver_config.time_limit,
+                    'solver_params': self.solver_config.solver_params,
+                    'target_time_limit': self.solver_config.target_time_limit,
+                    'retry_statuses': self.solver_config.retry_statuses}
+        return fingerprint(method,
+                           arguments,
+                           settings,
+                           self.assets.returns,
+                           self.assets.expected_returns,
+                           self.assets.expected_cov)
+
+    def _problem_values(self,
+                        l1_coef: Optional[float] = None,
+                        l2_coef: Optional[float] = None) -> dict[str, Union[float, np.ndarray]]:
+        """
+        Data shared by all the problems: expected returns, bounds, costs and regularization coefficients.
+        The costs, l1_coef and l2_coef are only included when they are used.
+        """
+        lower_bounds, upper_bounds = self._get_lower_and_upper_bounds()
+        values = {'expected_returns': self.assets.expected_returns,
+                  'lower_bounds': lower_bounds,
+                  'upper_bounds': upper_bounds}
+
+        if not (self.costs is None or (np.isscalar(self.costs) and self.costs == 0)):
             if self.prev_w is None:
                 prev_w = np.zeros(self.assets.asset_nb)
             else:
                 prev_w = self.prev_w
             daily_costs = self.costs / self.investment_duration_in_days
             if np.isscalar(daily_costs):
-                portfolio_cost = daily_costs * cp.norm(prev_w - w, 1)
-            else:
-                portfolio_cost = cp.norm(cp.multiply(daily_costs, (prev_w - w)), 1)
+                daily_costs = np.full(self.assets.asset_nb, daily_costs)
+            values['daily_costs'] = daily_costs
+            # costs * prev_w is given as a separate data to keep the problem DPP-compliant
+            values['daily_costs_prev_w'] = daily_costs * prev_w
+
+        if l1_coef is not None and l1_coef != 0:
+            values['l1_coef'] = l1_coef
+
+        if l2_coef is not None and l2_coef != 0:
+            values['l2_coef'] = l2_coef
+
+        return values
+
+    @staticmethod
+    def _portfolio_returns(w: cp.Variable, data: dict[str, Union[np.ndarray, cp.Parameter]]) -> cp.Expression:
+        """
+        Expected portfolio returns net of costs and regularization.
+        The problem data are either constants or cp.Parameter (see _get_problem).
+        """
+        portfolio_return = data['expected_returns'] @ w
+
+        # Costs
+        if 'daily_costs' in data:
+            portfolio_return -= cp.norm(cp.multiply(data['daily_costs'], w) - data['daily_costs_prev_w'], 1)
 
         # Norm L1
-        if l1_coef is None or l1_coef == 0:
-            l1_regularization = 0
-        else:
-            l1_regularization = l1_coef * cp.norm(w, 1)
+        if 'l1_coef' in data:
+            portfolio_return -= data['l1_coef'] * cp.norm(w, 1)
 
         # Norm L2
-        if l2_coef is None or l2_coef == 0:
-            l2_regularization = 0
-        else:
-            l2_regularization = l2_coef * cp.sum_squares(w)
-
-        portfolio_return = (self.assets.expected_returns @ w
-                            - portfolio_cost
-                            - l1_regularization
-                            - l2_regularization)
+        if 'l2_coef' in data:
+            portfolio_return -= data['l2_coef'] * cp.sum_squares(w)
 
         return portfolio_return
 
+    @staticmethod
+    def _objective_value(weights: np.ndarray, values: dict[str, Union[float, np.ndarray]]) -> float:
+        """Expected portfolio returns net of costs and regularization of the weights (see _portfolio_returns)"""
+        value = values['expected_returns'] @ weights
+        if 'daily_costs' in values:
+            value -= np.sum(np.abs(values['daily_costs'] * weights - values['daily_costs_prev_w']))
+        if 'l1_coef' in values:
+            value -= values['l1_coef'] * np.sum(np.abs(weights))
+        if 'l2_coef' in values:
+            value -= values['l2_coef'] * np.sum(weights ** 2)
+        return float(value)
+
+    @staticmethod
+    def _portfolio_variance(w: cp.Variable, data: dict[str, Union[np.ndarray, cp.Parameter]]) -> cp.Expression:
+        """
+        Portfolio variance from the covariance matrix, from a covariance factor F (covariance = F @ F.T) or from
+        a factor model (covariance ≈ B @ B.T + diag(d ** 2))
+        """
+        if 'factor_loadings' in data:
+            return (cp.sum_squares(data['factor_loadings'].T @ w)
+                    + cp.sum_squares(cp.multiply(data['specific_std'], w)))
+        if 'covariance_factor' in data:
+            return cp.sum_squares(data['covariance_factor'].T @ w)
+        return cp.quad_form(w, data['covariance'])
+
+    @staticmethod
+    def _portfolio_volatility(w: cp.Variable, data: dict[str, Union[np.ndarray, cp.Parameter]]) -> cp.Expression:
+        """
+        Portfolio volatility as the norm of the covariance factor F (covariance = F @ F.T) or of the factor model
+        (covariance ≈ B @ B.T + diag(d ** 2)) applied to the weights
+        """
+        if 'factor_loadings' in data:
+            return cp.norm(cp.hstack([data['factor_loadings'].T @ w, cp.multiply(data['specific_std'], w)]), 2)
+        return cp.norm(data['covariance_factor'].T @ w, 2)
+
+    def _portfolio_risk(self,
+                        method: str,
+                        w: cp.Variable,
+                        data: dict[str, Union[np.ndarray, cp.Parameter]]) -> tuple[cp.Expression, list]:
+        """
+        Risk of the optimization method (variance, semivariance, cvar or cdar) with the constraints of its auxiliary
+        variables
+
+        :return: the risk expression and the constraints of its auxiliary variables
+        """
+        if method == 'mean_variance':
+            return self._portfolio_variance(w=w, data=data), []
+
+        date_nb = self.assets.date_nb
+        if method == 'mean_semivariance':
+            p = cp.Variable(date_nb, nonneg=True)
+            n = cp.Variable(date_nb, nonneg=True)
+            return cp.sum(cp.square(n)), [data['semivariance_returns'] @ w - p + n == 0]
+
+        alpha = cp.Variable()
+        if method == 'mean_cvar':
+            u = cp.Variable(date_nb)
+            return alpha + data['cvar_coef'] * cp.sum(u), [data['returns'] @ w + alpha + u >= 0,
+                                                            u >= 0]
+
+        if method == 'mean_cdar':
+            u = cp.Variable(date_nb + 1)
+            z = cp.Variable(date_nb)
+            return alpha + data['cdar_coef'] * cp.sum(z), [z >= u[1:] - alpha,
+                                                            z >= 0,
+                                                            u[1:] >= u[:-1] - data['returns'] @ w,
+                                                            u[0] == 0,
+                                                            u[1:] >= 0]
+
+        raise ValueError(f'Unknown risk of method {method}')
+
+    def _covariance_values(self) -> dict[str, np.ndarray]:
+        """
+        Covariance data of the problems (see covariance_model). With a problem cache, the dense covariance is given
+        by its Cholesky factor L with covariance = L @ L.T so that the variance sum_squares(L.T @ w) is DPP-compliant.
+        The factorizations of the covariance are cached on the Assets.
+        """
+        if self.covariance_model is None and self.problem_cache is None:
+            return {'covariance': self.assets.expected_cov}
+
+        if self.covariance_model is None or self.covariance_model == 'cholesky':
+            return {'covariance_factor': self.assets.expected_cov_cholesky}
+
+        loadings, specific_std = factor_model(self.assets.expected_cov,
+                                              rank=self.covariance_model,
+                                              eigen=self.assets.expected_cov_eigen)
+        return {'factor_loadings': loadings, 'specific_std': specific_std}
+
+    def _model_expected_cov(self) -> np.ndarray:
+        """
+        Covariance of the variance of the problems: the expected covariance, or the covariance of the factor model
+        when covariance_model is a number of factors
+        """
+        if self.covariance_model is None or self.covariance_model == 'cholesky':
+            return self.assets.expected_cov
+        covariance_values = self._covariance_values()
+        loadings = covariance_values['factor_loadings']
+        return loadings @ loadings.T + np.diag(covariance_values['specific_std'] ** 2)
+
+    def _get_problem(self,
+                     method: str,
+                     values: dict[str, Union[float, np.ndarray]],
+                     builder: Callable[[dict], tuple[cp.Problem, cp.Variable, cp.Parameter]]
+                     ) -> tuple[cp.Problem, cp.Variable, cp.Parameter, Optional[tuple]]:
+        """
+        Build the problem with builder() or retrieve it from the problem cache.
+
+        :param method: name of the optimization method
+        :param values: the problem data by name
+        :param builder: function taking the problem data by name (constants or cp.Parameter) and returning the
+                        problem, the weights variable and the target parameter
+        :return: the problem, the weights variable, the target parameter and the cache key
+        """
+        if self.problem_cache is None:
+            problem, w, target_parameter = builder(values)
+            return problem, w, target_parameter, None
+
+        if not self.problem_cache.is_cacheable(method=method, values=values):
+            self.problem_cache.skip(method=method, values=values)
+            problem, w, target_parameter = builder(values)
+            return problem, w, target_parameter, None
+
+        key = ProblemCache.key(method=method, values=values, investment_type=self.investment_type.value)
+        cached_problem = self.problem_cache.get(key)
+        if cached_problem is None:
+            parameters = ProblemCache.parameters(values)
+            problem, w, target_parameter = builder(parameters)
+            cached_problem = CachedProblem(problem=problem,
+                                           w=w,
+                                           target_parameter=target_parameter,
+                                           parameters=parameters)
+            self.problem_cache.add(key=key, cached_problem=cached_problem)
+        cached_problem.set_values(values)
+        return cached_problem.problem, cached_problem.w, cached_problem.target_parameter, key
+
     def _get_lower_and_upper_bounds(self) -> tuple[np.ndarray, np.ndarray]:
         # Upper and lower bounds
         lower_bounds, upper_bounds = self.weight_bounds
@@ -182,41 +597,450 @@ class Optimization:
 
         return lower_bounds, upper_bounds
 
-    @staticmethod
-    def _get_optimization_weights(problem: cp.Problem,
+    def _get_solver_config(self, warm_start: bool = False) -> SolverConfig:
+        """
+        The solver configuration. With warm_start, solvers that cannot be warm-started are replaced by
+        WARM_START_SOLVER, the solvers of the configuration being kept as the fallback chain.
+        """
+        if not warm_start or self.solver_config.solver in WARM_START_SOLVERS:
+            return self.solver_config
+        return SolverConfig(solver=WARM_START_SOLVER,
+                            tolerance=self.solver_config.tolerance,
+                            max_iters=self.solver_config.max_iters,
+                            time_limit=self.solver_config.time_limit,
+                            fallback=self.solver_config.solvers,
+                            solver_params=WARM_START_SOLVER_PARAMS if self.solver_config.tolerance is None else None,
+                            target_time_limit=self.solver_config.target_time_limit,
+                            retry_statuses=self.solver_config.retry_statuses)
+
+    def _solve(self,
+               problem: cp.Problem,
+               key: Optional[tuple] = None,
+               target: Optional[float] = None,
+               warm_start: bool = False) -> SolveRecord:
+        """
+        Solve the problem and record the canonicalization and solve times in the problem cache
+
+        :return: the SolveRecord of the solve
+        """
+        solver_config = self._get_solver_config(warm_start=warm_start)
+        if self.problem_cache is None or key is None:
+            return solve_problem(problem=problem, solver_config=solver_config, target=target, warm_start=warm_start)
+        cached_problem = self.problem_cache.problems.get(key)
+        first_solve = cached_problem is None or cached_problem.solve_nb == 0
+        start = time.perf_counter()
+        try:
+            return solve_problem(problem=problem, solver_config=solver_config, target=target, warm_start=warm_start)
+        finally:
+            if cached_problem is not None:
+                cached_problem.solve_nb += 1
+            self.problem_cache.record(key=key,
+                                      duration=time.perf_counter() - start,
+                                      problem=problem,
+                                      first_solve=first_solve)
+
+    def _get_optimization_weights(self,
+                                  method: str,
+                                  problem: cp.Problem,
                                   w: cp.Variable,
                                   parameter: cp.Parameter,
                                   target: Union[float, np.ndarray],
-                                  ignore_none: bool = True) -> list[Union[np.ndarray, None]]:
-
+                                  ignore_none: bool = True,
+                                  key: Optional[tuple] = None,
+                                  infeasible_records: Optional[list[Optional[SolveRecord]]] = None
+                                  ) -> list[Union[np.ndarray, None]]:
+        """
+        Solve the problem for each target. The targets with an infeasible record (see _infeasible_records) are not
+        solved and keep their record.
+        """
         if np.isscalar(target):
-            parameter_array = [target]
+            targets = [target]
         else:
-            parameter_array = target
-
-        weights = []
-        for value in parameter_array:
-            parameter.value = value
-            weight = None
-            try:
-                problem.solve(solver='ECOS')
-                if w.value is None:
-                    logger.warning(f'None return for {value}')
-                weight = w.value
-            except SolverError as e:
-                logger.warning(f'SolverError for {value}: {e}')
-            except ArpackNoConvergence as e:
-                logger.warning(f'ArpackNoConvergence for {value}: {e}')
-            if weight is not None or not ignore_none:
-                weights.append(weight)
+            targets = target
+        if infeasible_records is None:
+            infeasible_records = [None] * len(targets)
+        to_solve = [i for i, record in enumerate(infeasible_records) if record is None]
+        parameter_array = [targets[i] for i in to_solve]
+
+        warm_start = self.warm_start and len(parameter_array) > 1
+        n_jobs = self.n_jobs if self.n_jobs is not None else os.cpu_count()
+        n_jobs = min(n_jobs, len(parameter_array))
+
+        if len(parameter_array) == 0:
+            results, records = [], []
+        elif n_jobs <= 1:
+            results, records = _solve_targets(problem=problem,
+                                              w=w,
+                                              parameter=parameter,
+                                              targets=parameter_array,
+                                              solver_config=self.solver_config,
+                                              warm_start=warm_start,
+                                              solve=lambda value: self._solve(problem=problem,
+                                                                              key=key,
+                                                                              target=value,
+                                                                              warm_start=warm_start))
+        else:
+            # The targets are split in contiguous chunks (of the sorted targets with warm_start). Each worker
+            # receives a copy of the problem, canonicalizes it once and solves its chunk.
+            if warm_start:
+                order = np.argsort(parameter_array, kind='stable')
+            else:
+                order = np.arange(len(parameter_array))
+            chunks = np.array_split(order, n_jobs)
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = [executor.submit(_solve_targets,
+                                           problem=problem,
+                                           w=w,
+                                           parameter=parameter,
+                                           targets=[parameter_array[i] for i in chunk],
+                                           solver_config=self._get_solver_config(warm_start=warm_start),
+                                           warm_start=warm_start)
+                           for chunk in chunks]
+                results = [None] * len(parameter_array)
+                records = [None] * len(parameter_array)
+                for chunk, future in zip(chunks, futures):
+                    chunk_results, chunk_records = future.result()
+                    for i, weight, record in zip(chunk, chunk_results, chunk_records):
+                        results[i] = weight
+                        records[i] = record
+
+        all_results = [None] * len(targets)
+        all_records = list(infeasible_records)
+        for i, weight, record in zip(to_solve, results, records):
+            all_results[i] = weight
+            all_records[i] = record
+
+        return self._gather_weights(method=method,
+                                    target=target,
+                                    results=all_results,
+                                    records=all_records,
+                                    ignore_none=ignore_none)
+
+    def _gather_weights(self,
+                        method: str,
+                        target: Union[float, np.ndarray],
+                        results: list[Optional[np.ndarray]],
+                        records: list[SolveRecord],
+                        ignore_none: bool = True) -> Union[list[Union[np.ndarray, None]], np.ndarray]:
+        """
+        Weights returned by the optimization methods from the weights of each target and save the result.
+        """
+        weights = [weight for weight in results if weight is not None or not ignore_none]
 
         if np.isscalar(target):
+            self._result = OptimizationResult(method=method,
+                                              weights=weights[0] if len(weights) > 0 else None,
+                                              records=records)
             if len(weights) == 0:
                 raise OptimizationError(f'Optimization did not converge')
             return weights[0]
 
+        self._result = OptimizationResult(method=method, weights=weights, records=records)
         return weights
 
+    @property
+    def result(self) -> Optional[OptimizationResult]:
+        """The weights and the SolveRecord of each solve of the last optimization"""
+        return self._result
+
+    def _linear_program_weights(self,
+                                method: str,
+                                linear_program: Union[LinearProgram, CvarCuttingPlane],
+                                target: Union[float, np.ndarray],
+                                ignore_none: bool = True,
+                                infeasible_records: Optional[list[Optional[SolveRecord]]] = None
+                                ) -> Union[list[Union[np.ndarray, None]], np.ndarray]:
+        """
+        Weights of the linear program (or of the cutting-plane CVaR) solved for each target with HiGHS.
+        The targets with an infeasible record (see _infeasible_records) are not solved and keep their record.
+        """
+        targets = np.atleast_1d(target)
+        if infeasible_records is None:
+            infeasible_records = [None] * len(targets)
+        results = []
+        records = []
+        for value, infeasible_record in zip(targets, infeasible_records):
+            if infeasible_record is not None:
+                results.append(None)
+                records.append(infeasible_record)
+                continue
+            weight, record = linear_program.solve(target=value)
+            results.append(weight)
+            records.append(record)
+
+        return self._gather_weights(method=method,
+                                    target=target,
+                                    results=results,
+                                    records=records,
+                                    ignore_none=ignore_none)
+
+    def _solve_target(self,
+                      problem: cp.Problem,
+                      w: cp.Variable,
+                      parameter: cp.Parameter,
+                      target: float,
+                      key: Optional[tuple] = None) -> tuple[Optional[np.ndarray], SolveRecord]:
+        """
+        Solve the problem for one value of the target parameter
+
+        :return: the weights (None when the optimization failed) and the SolveRecord of the solve
+        """
+        results, records = _solve_targets(problem=problem,
+                                          w=w,
+                                          parameter=parameter,
+                                          targets=[target],
+                                          solver_config=self.solver_config,
+                                          solve=lambda value: self._solve(problem=problem,
+                                                                          key=key,
+                                                                          target=value,
+                                                                          warm_start=self.warm_start))
+        return results[0], records[0]
+
+    def _frontier_endpoints(self,
+                            method: str,
+                            values: dict[str, Union[float, np.ndarray]],
+                            max_return: bool = True,
+                            linear_program: Optional[Union[LinearProgram, CvarCuttingPlane]] = None
+                            ) -> list[tuple[Optional[np.ndarray], SolveRecord]]:
+        """
+        Minimum risk portfolio and maximum return portfolio (without risk constraint) of the frontier of the
+        optimization method, solved with the solvers of solver_config or with the linear program of the engine
+
+        :param method: name of the optimization method
+        :param values: the problem data by name, including the data of the risk
+        :param max_return: False to only solve the minimum risk portfolio
+        :param linear_program: the linear program of the 'highs' or 'cutting_plane' engine. The endpoints are then
+                               solved with HiGHS without building any CVXPY problem.
+        :return: the weights (None when the optimization failed) and the SolveRecord of the minimum risk portfolio
+                 and of the maximum return portfolio
+        """
+        if linear_program is not None:
+            endpoints = [linear_program.min_risk()]
+            if max_return:
+                endpoints.append(linear_program.max_return())
+            return endpoints
+
+        investment_target = self._get_investment_target()
+
+        def constraints(w: cp.Variable, data: dict) -> list:
+            weight_constraints = [w >= data['lower_bounds'], w <= data['upper_bounds']]
+            if investment_target is not None:
+                weight_constraints.append(cp.sum(w) == investment_target)
+            return weight_constraints
+
+        def build_min_risk(data: dict) -> tuple[cp.Problem, cp.Variable, None]:
+            w = cp.Variable(self.assets.asset_nb)
+            portfolio_risk, risk_constraints = self._portfolio_risk(method=method, w=w, data=data)
+            return cp.Problem(cp.Minimize(portfolio_risk), risk_constraints + constraints(w=w, data=data)), w, None
+
+        def build_max_return(data: dict) -> tuple[cp.Problem, cp.Variable, None]:
+            w = cp.Variable(self.assets.asset_nb)
+            problem = cp.Problem(cp.Maximize(self._portfolio_returns(w=w, data=data)), constraints(w=w, data=data))
+            return problem, w, None
+
+        builders = [('min_risk', build_min_risk)]
+        if max_return:
+            builders.append(('max_return', build_max_return))
+        endpoints = []
+        for name, builder in builders:
+            problem, w, _, key = self._get_problem(method=f'{method}_{name}', values=values, builder=builder)
+            start = time.perf_counter()
+            try:
+                record = self._solve(problem=problem, key=key)
+            except SolverError as e:
+                logger.warning(f'SolverError for the {name} portfolio of {method}: {e}')
+                endpoints.append((None, SolveRecord(status='solver_error',
+                                                    wall_time=time.perf_counter() - start,
+                                                    error=str(e))))
+                continue
+            if w.value is None:
+                logger.warning(f'None return for the {name} portfolio of {method}')
+            endpoints.append((w.value, record))
+        return endpoints
+
+    def _infeasible_records(self,
+                            method: str,
+                            values: dict[str, Union[float, np.ndarray]],
+                            risk: Callable[[np.ndarray], float],
+                            target: Union[float, np.ndarray],
+                            linear_program: Optional[Union[LinearProgram, CvarCuttingPlane]] = None
+                            ) -> Optional[list[Optional[SolveRecord]]]:
+        """
+        Feasibility pre-check of an array of targets (see feasibility_check): the minimum risk portfolio is solved
+        once and the targets below its risk cannot be reached under the weight bounds and budget. They are skipped
+        with an infeasible SolveRecord of solver FEASIBILITY_CHECK_SOLVER instead of paying a failed solve.
+
+        :param method: name of the optimization method
+        :param values: the problem data by name, including the data of the risk
+        :param risk: risk of the weights, in the unit of the targets
+        :param target: the targets
+        :param linear_program: the linear program of the engine solving the minimum risk portfolio
+                               (see _frontier_endpoints)
+        :return: the infeasible SolveRecord of each target (None for the targets to solve). None when the check is
+                 not run (disabled, single target or failed minimum risk portfolio).
+        """
+        if not self.feasibility_check or np.isscalar(target) or len(target) <= 1:
+            return None
+        start = time.perf_counter()
+        [(weights, _)] = self._frontier_endpoints(method=method,
+                                                  values=values,
+                                                  max_return=False,
+                                                  linear_program=linear_program)
+        if weights is None:
+            return None
+        min_risk = risk(weights)
+        records = [None] * len(target)
+        for i, value in enumerate(target):
+            if value < min_risk * (1 - FEASIBILITY_TOLERANCE):
+                records[i] = SolveRecord(target=value,
+                                         solver=FEASIBILITY_CHECK_SOLVER,
+                                         status='infeasible',
+                                         wall_time=0.0,
+                                         error=f'Target below the minimum risk {min_risk}')
+        skipped_nb = sum(record is not None for record in records)
+        if skipped_nb != 0:
+            logger.info(f'{skipped_nb} targets of {method} below the minimum risk {min_risk} skipped '
+                        f'(check in {time.perf_counter() - start:.3f}s)')
+        return records
+
+    def _adaptive_frontier_weights(self,
+                                   method: str,
+                                   values: dict[str, Union[float, np.ndarray]],
+                                   solve: Callable[[float], tuple[Optional[np.ndarray], SolveRecord]],
+                                   risk: Callable[[np.ndarray], float],
+                                   population_size: int,
+                                   frontier_tolerance: float,
+                                   ignore_none: bool = True,
+                                   linear_program: Optional[Union[LinearProgram, CvarCuttingPlane]] = None
+                                   ) -> list[Optional[np.ndarray]]:
+        """
+        Weights of the frontier with adaptive targets (see adaptive_frontier), from the minimum risk and maximum
+        return portfolios
+
+        :param method: name of the optimization method
+        :param values: the problem data by name, including the data of the risk
+        :param solve: function solving the problem for a risk target
+        :param risk: risk of the weights, in the unit of the targets
+        :param population_size: maximum number of solves, including the two endpoints
+        :param frontier_tolerance: tolerance of the adaptive frontier
+        :param linear_program: the linear program of the engine solving the endpoints (see _frontier_endpoints)
+        :return: the weights by increasing risk
+        """
+        min_risk, max_return = self._frontier_endpoints(method=method, values=values, linear_program=linear_program)
+        if min_risk[0] is None or max_return[0] is None:
+            return self._gather_weights(method=method,
+                                        target=np.array([np.nan, np.nan]),
+                                        results=[None, None],
+                                        records=[min_risk[1], max_return[1]],
+                                        ignore_none=ignore_none)
+
+        targets, results, records = adaptive_frontier(solve=solve,
+                                                      risk=risk,
+                                                      objective=lambda weights: self._objective_value(weights=weights,
+                                                                                                      values=values),
+                                                      min_risk=min_risk,
+                                                      max_return=max_return,
+                                                      population_size=population_size,
+                                                      tolerance=frontier_tolerance)
+        return self._gather_weights(method=method,
+                                    target=targets,
+                                    results=results,
+                                    records=records,
+                                    ignore_none=ignore_none)
+
+    def _analytical_mean_variance(self,
+                                  target_variances: np.ndarray,
+                                  l1_coef: Optional[float] = None,
+                                  l2_coef: Optional[float] = None
+                                  ) -> tuple[list[Optional[np.ndarray]], list[Optional[SolveRecord]]]:
+        """
+        Mean-variance weights from the closed-form frontier (see AnalyticalFrontier).
+        The closed-form frontier is used when there are no costs and no regularization. Its weights are the solution
+        of the problem with weight bounds only when they satisfy the bounds, so targets whose weights break the
+        bounds are left to the solver.
+
+        :return: the weights and the SolveRecord of each target. The SolveRecord is None for the targets that have
+                 to be solved by the solver.
+        """
+        results = [None] * len(target_variances)
+        records = [None] * len(target_variances)
+        values = self._problem_values(l1_coef=l1_coef, l2_coef=l2_coef)
+        if any(name in values for name in ['daily_costs', 'l1_coef', 'l2_coef']):
+            return results, records
+
+        start = time.perf_counter()
+        if self.covariance_model is None or self.covariance_model == 'cholesky':
+            cholesky = self.assets.expected_cov_cholesky
+        else:
+            cholesky = None
+        expected_cov = self._model_expected_cov()
+        try:
+            frontier = AnalyticalFrontier(expected_returns=self.assets.expected_returns,
+                                          expected_cov=expected_cov,
+                                          investment_type=self.investment_type,
+                                          cholesky=cholesky)
+        except np.linalg.LinAlgError:
+            logger.debug('Covariance not positive definite: the closed-form frontier is not used')
+            return results, records
+
+        lower_bounds, upper_bounds = values['lower_bounds'], values['upper_bounds']
+        analytical_weights = frontier.weights(target_variance=target_variances)
+        wall_time = (time.perf_counter() - start) / len(target_variances)
+        for i, (variance, weight) in enumerate(zip(target_variances, analytical_weights)):
+            if weight is None:
+                records[i] = SolveRecord(target=variance, solver=ANALYTICAL_SOLVER, status='infeasible',
+                                         wall_time=wall_time)
+            elif (np.all(weight >= lower_bounds - ANALYTICAL_BOUNDS_TOLERANCE)
+                  and np.all(weight <= upper_bounds + ANALYTICAL_BOUNDS_TOLERANCE)):
+                results[i] = weight
+                records[i] = SolveRecord(target=variance, solver=ANALYTICAL_SOLVER, status='optimal',
+                                         objective=float(self.assets.expected_returns @ weight), wall_time=wall_time)
+        return results, records
+
+    def _first_order_model(self,
+                           l1_coef: Optional[float] = None,
+                           l2_coef: Optional[float] = None) -> FirstOrderMeanVariance:
+        """
+        FirstOrderMeanVariance of the mean-variance problem, with the tolerance and max_iters of solver_config when
+        they are provided
+        """
+        if self.covariance_model is None or self.covariance_model == 'cholesky':
+            eigen = self.assets.expected_cov_eigen
+        else:
+            eigen = None
+        kwargs = {}
+        if self.solver_config.tolerance is not None:
+            kwargs['tolerance'] = self.solver_config.tolerance
+        if self.solver_config.max_iters is not None:
+            kwargs['max_iterations'] = self.solver_config.max_iters
+        return FirstOrderMeanVariance(values=self._problem_values(l1_coef=l1_coef, l2_coef=l2_coef),
+                                      expected_cov=self._model_expected_cov(),
+                                      investment_target=self._get_investment_target(),
+                                      eigen=eigen,
+                                      **kwargs)
+
+    def _first_order_mean_variance(self,
+                                   target_variances: np.ndarray,
+                                   l1_coef: Optional[float] = None,
+                                   l2_coef: Optional[float] = None
+                                   ) -> tuple[list[Optional[np.ndarray]], list[SolveRecord]]:
+        """
+        Mean-variance weights from the solver-free ADMM (see FirstOrderMeanVariance).
+        The targets are solved by increasing variance so that each solve is warm-started from the previous solution.
+        The first solve is warm-started from prev_w when it is provided. The tolerance and max_iters of
+        solver_config are used when they are provided.
+
+        :return: the weights and the SolveRecord of each target
+        """
+        first_order = self._first_order_model(l1_coef=l1_coef, l2_coef=l2_coef)
+        results = [None] * len(target_variances)
+        records = [None] * len(target_variances)
+        initial_weights = self.prev_w
+        for i in np.argsort(target_variances, kind='stable'):
+            results[i], records[i] = first_order.solve(target=target_variances[i], initial_weights=initial_weights)
+            initial_weights = None
+        return results, records
+
     def _get_investment_target(self) -> Optional[int]:
         # Sum of weights
         if self.investment_type == InvestmentType.FULLY_INVESTED:
@@ -224,6 +1048,11 @@ class Optimization:
         elif self.investment_type == InvestmentType.MARKET_NEUTRAL:
             return 0
 
+    @staticmethod
+    def _validate_engine(engine: str, engines: list[str]):
+        if engine not in engines:
+            raise ValueError(f'engine should be one of {engines}, but received {engine}')
+
     def _validate_args(self, **kwargs):
         population_size = kwargs.get('population_size')
         targets_names = [k for k, v in kwargs.items() if k.startswith('target_')]
@@ -242,6 +1071,13 @@ class Optimization:
         if population_size is not None and population_size <= 1:
             raise ValueError('f population_size should be strictly greater than one')
 
+        frontier_tolerance = kwargs.get('frontier_tolerance')
+        if frontier_tolerance is not None:
+            if population_size is None:
+                raise ValueError('frontier_tolerance can only be used with population_size')
+            if frontier_tolerance <= 0:
+                raise ValueError('frontier_tolerance should be strictly positive')
+
         if target_name is not None:
             target = kwargs[target_name]
             if np.isscalar(target):
@@ -262,12 +1098,16 @@ class Optimization:
                 elif v > 0 and np.all(lower_bounds >= 0):
                     logger.warning(f'Positive {k} will have no impact with positive or null lower bounds')
 
+    @_cached_result
     def mean_variance(self,
                       target_volatility: Optional[Union[float, list, np.ndarray]] = None,
                       population_size: Optional[int] = None,
                       l1_coef: Optional[float] = None,
                       l2_coef: Optional[float] = None,
-                      ignore_none: bool = True) -> Union[list[np.ndarray], np.ndarray]:
+                      ignore_none: bool = True,
+                      analytical: bool = True,
+                      engine: str = 'cvxpy',
+                      frontier_tolerance: Optional[float] = None) -> Union[list[np.ndarray], np.ndarray]:
         """
         Optimization along the mean-variance frontier (Markowitz optimization).
 
@@ -289,87 +1129,315 @@ class Optimization:
         :param ignore_none: if True, None are removed from the list of weights results when the optimization failed
         :type ignore_none: bool, default True
 
+        :param analytical: if True, the frontier is computed in closed form from a single factorization of the
+                           covariance when there are no costs and no regularization (see AnalyticalFrontier).
+                           The targets whose closed-form weights break the weight bounds are solved by the solver.
+        :type analytical: bool, default True
+
+        :param engine: * 'cvxpy' to solve the problem with CVXPY and the solver of solver_config
+                       * 'first_order' to solve the problem without solver with an ADMM on the eigendecomposition of
+                         the covariance and the exact projection onto the weight bounds and budget
+                         (see FirstOrderMeanVariance). It avoids the CVXPY canonicalization, which dominates the
+                         solve time of small and medium universes.
+        :type engine: str, default 'cvxpy'
+
+        :param frontier_tolerance: with population_size, the frontier is solved from its exact minimum variance
+                                   and maximum return portfolios and the targets are placed where the frontier
+                                   curves until its piecewise linear approximation is within frontier_tolerance
+                                   (relative to the variance and return ranges) or population_size solves are
+                                   reached (see adaptive_frontier). The weights are returned by increasing variance.
+                                   None for population_size targets evenly spaced in log scale.
+        :type frontier_tolerance: float, default None
+
         :return the portfolio weights that are in the efficient frontier.
         :rtype: list of numpy.ndarray or numpy.ndarray
         """
         self._validate_args(**{k: v for k, v in locals().items() if k != 'self'})
+        self._validate_engine(engine=engine, engines=['cvxpy', 'first_order'])
+
+        def values() -> dict[str, Union[float, np.ndarray]]:
+            problem_values = self._problem_values(l1_coef=l1_coef, l2_coef=l2_coef)
+            problem_values.update(self._covariance_values())
+            return problem_values
+
+        def risk(weights: np.ndarray) -> float:
+            return float(weights @ self._model_expected_cov() @ weights)
+
+        if frontier_tolerance is not None:
+            return self._adaptive_frontier_weights(method='mean_variance',
+                                                   values=values(),
+                                                   solve=self._mean_variance_solve(l1_coef=l1_coef,
+                                                                                   l2_coef=l2_coef,
+                                                                                   analytical=analytical,
+                                                                                   engine=engine),
+                                                   risk=risk,
+                                                   population_size=population_size,
+                                                   frontier_tolerance=frontier_tolerance,
+                                                   ignore_none=ignore_none)
+
+        target = self._mean_variance_target(target_volatility=target_volatility, population_size=population_size)
+
+        target_variances = np.atleast_1d(target)
+        if analytical:
+            results, records = self._analytical_mean_variance(target_variances=target_variances,
+                                                              l1_coef=l1_coef,
+                                                              l2_coef=l2_coef)
+        else:
+            results, records = [None] * len(target_variances), [None] * len(target_variances)
+
+        to_solve = [i for i, record in enumerate(records) if record is None]
+        infeasible_records = self._infeasible_records(method='mean_variance',
+                                                      values=values(),
+                                                      risk=risk,
+                                                      target=target_variances[to_solve]) if len(to_solve) > 1 else None
+        if infeasible_records is not None:
+            for i, record in zip(to_solve, infeasible_records):
+                records[i] = record
+            to_solve = [i for i, record in enumerate(records) if record is None]
+
+        if len(to_solve) != 0 and engine == 'first_order':
+            solved = self._first_order_mean_variance(target_variances=target_variances[to_solve],
+                                                     l1_coef=l1_coef,
+                                                     l2_coef=l2_coef)
+            for i, weight, record in zip(to_solve, *solved):
+                results[i] = weight
+                records[i] = record
+            to_solve = []
+
+        if len(to_solve) == 0:
+            return self._gather_weights(method='mean_variance',
+                                        target=target,
+                                        results=results,
+                                        records=records,
+                                        ignore_none=ignore_none)
+
+        problem, w, target_variance_param, key = self._mean_variance_problem(l1_coef=l1_coef, l2_coef=l2_coef)
+
+        solved_weights = self._get_optimization_weights(method='mean_variance',
+                                                        problem=problem,
+                                                        w=w,
+                                                        parameter=target_variance_param,
+                                                        target=target_variances[to_solve],
+                                                        ignore_none=False,
+                                                        key=key)
+        for i, weight, record in zip(to_solve, solved_weights, self._result.records):
+            results[i] = weight
+            records[i] = record
+
+        return self._gather_weights(method='mean_variance',
+                                    target=target,
+                                    results=results,
+                                    records=records,
+                                    ignore_none=ignore_none)
+
+    def _mean_variance_problem(self,
+                               l1_coef: Optional[float] = None,
+                               l2_coef: Optional[float] = None
+                               ) -> tuple[cp.Problem, cp.Variable, cp.Parameter, Optional[tuple]]:
+        """
+        Mean-variance problem with the target variance parameter (see _get_problem)
 
-        min_volatility = np.sqrt(1 / np.sum(np.linalg.pinv(self.assets.expected_cov)))
+        :return: the problem, the weights variable, the target variance parameter and the cache key
+        """
+        values = self._problem_values(l1_coef=l1_coef, l2_coef=l2_coef)
+        values.update(self._covariance_values())
+        investment_target = self._get_investment_target()
 
-        if np.isscalar(target_volatility) and target_volatility < min_volatility:
-            raise ValueError(f'The minimum volatility is {min_volatility:.3f}. '
-                             f'Please use a higher target_volatility')
+        def build(data: dict) -> tuple[cp.Problem, cp.Variable, cp.Parameter]:
+            # Variables
+            w = cp.Variable(self.assets.asset_nb)
 
-        # Variables
-        w = cp.Variable(self.assets.asset_nb)
+            # Parameters
+            target_variance_param = cp.Parameter(nonneg=True)
 
-        # Parameters
-        target_variance_param = cp.Parameter(nonneg=True)
+            # Objectives
+            objective = cp.Maximize(self._portfolio_returns(w=w, data=data))
 
-        # Objectives
-        objective = cp.Maximize(self._portfolio_returns(w=w, l1_coef=l1_coef, l2_coef=l2_coef))
+            # Constraints
+            portfolio_variance = self._portfolio_variance(w=w, data=data)
+            constraints = [portfolio_variance <= target_variance_param,
+                           w >= data['lower_bounds'],
+                           w <= data['upper_bounds']]
+            if investment_target is not None:
+                constraints.append(cp.sum(w) == investment_target)
 
-        # Constraints
-        portfolio_variance = cp.quad_form(w, self.assets.expected_cov)
-        lower_bounds, upper_bounds = self._get_lower_and_upper_bounds()
-        constraints = [portfolio_variance <= target_variance_param,
-                       w >= lower_bounds,
-                       w <= upper_bounds]
-        investment_target = self._get_investment_target()
-        if investment_target is not None:
-            constraints.append(cp.sum(w) == investment_target)
+            # Problem
+            problem = cp.Problem(objective, constraints)
+            return problem, w, target_variance_param
 
-        # Problem
-        problem = cp.Problem(objective, constraints)
+        return self._get_problem(method='mean_variance', values=values, builder=build)
+
+    def _mean_variance_solve(self,
+                             l1_coef: Optional[float] = None,
+                             l2_coef: Optional[float] = None,
+                             analytical: bool = True,
+                             engine: str = 'cvxpy') -> Callable[[float], tuple[Optional[np.ndarray], SolveRecord]]:
+        """
+        Function solving the mean-variance problem for one target variance, from the closed-form frontier when it
+        satisfies the bounds (with analytical) or with the engine. The problem of the engine is built on the first
+        target that needs it and reused for the next targets.
+        """
+        engines = {}
+
+        def solve(target_variance: float) -> tuple[Optional[np.ndarray], SolveRecord]:
+            if analytical:
+                results, records = self._analytical_mean_variance(target_variances=np.array([target_variance]),
+                                                                  l1_coef=l1_coef,
+                                                                  l2_coef=l2_coef)
+                if records[0] is not None:
+                    return results[0], records[0]
+            if engine == 'first_order':
+                if engine not in engines:
+                    engines[engine] = self._first_order_model(l1_coef=l1_coef, l2_coef=l2_coef)
+                return engines[engine].solve(target=target_variance)
+            if engine not in engines:
+                engines[engine] = self._mean_variance_problem(l1_coef=l1_coef, l2_coef=l2_coef)
+            problem, w, target_variance_param, key = engines[engine]
+            return self._solve_target(problem=problem,
+                                      w=w,
+                                      parameter=target_variance_param,
+                                      target=target_variance,
+                                      key=key)
+
+        return solve
+
+    def _mean_variance_target(self,
+                              target_volatility: Optional[Union[float, list, np.ndarray]] = None,
+                              population_size: Optional[int] = None) -> Union[float, np.ndarray]:
+        """
+        Targeted variances of the mean-variance frontier from the targeted volatilities or the population size
+        """
+        min_volatility = np.sqrt(1 / np.sum(self.assets.expected_cov_pinv))
+
+        if np.isscalar(target_volatility) and target_volatility < min_volatility:
+            raise ValueError(f'The minimum volatility is {min_volatility:.3f}. '
+                             f'Please use a higher target_volatility')
 
         if target_volatility is not None:
             if np.isscalar(target_volatility):
-                target = target_volatility ** 2
-            else:
-                target = np.array(target_volatility) ** 2
+                return target_volatility ** 2
+            return np.array(target_volatility) ** 2
 
-        else:
-            start = np.log10(min_volatility * 1.3)  # We start at min * 130% to increase proba of convergence
-            end = np.log10(0.3 / np.sqrt(255))  # We stop at 30% annualized volatility
-            volatilities = np.logspace(start, end, num=population_size)
-            target = volatilities ** 2
+        start = np.log10(min_volatility * 1.3)  # We start at min * 130% to increase proba of convergence
+        end = np.log10(0.3 / np.sqrt(255))  # We stop at 30% annualized volatility
+        volatilities = np.logspace(start, end, num=population_size)
+        return volatilities ** 2
 
-        weights = self._get_optimization_weights(problem=problem,
-                                                 w=w,
-                                                 parameter=target_variance_param,
-                                                 target=target,
-                                                 ignore_none=ignore_none)
+    @_cached_result
+    def mean_variance_cla(self,
+                          target_volatility: Optional[Union[float, list, np.ndarray]] = None,
+                          population_size: Optional[int] = None,
+                          ignore_none: bool = True) -> Union[list[np.ndarray], np.ndarray]:
+        """
+        Mean-variance frontier (Markowitz optimization) from the Critical Line Algorithm (see CriticalLineAlgorithm).
+        All the corner portfolios of the exact frontier with weight bounds are computed in one pass and the targeted
+        volatilities are interpolated between them, without solving one problem per target.
+        Only available for investment_type=InvestmentType.FULLY_INVESTED without costs.
 
-        return weights
+        :param target_volatility: maximize return for the targeted daily volatility of the portfolio.
+        :type target_volatility: float or list or numpy.ndarray optional
+
+        :param population_size: number of pareto optimal portfolio weights to compute along the efficient frontier
+        :type population_size: int, optional
+
+        :param ignore_none: if True, None are removed from the list of weights results when the target volatility is
+                            below the minimum volatility
+        :type ignore_none: bool, default True
+
+        :return the portfolio weights that are in the efficient frontier. The corner portfolios, by decreasing
+                returns, when both target_volatility and population_size are None.
+        :rtype: list of numpy.ndarray or numpy.ndarray
+        """
+        if self.investment_type != InvestmentType.FULLY_INVESTED:
+            raise ValueError('mean_variance_cla() can be solved only for '
+                             'investment_type=InvestmentType.FULLY_INVESTED  --> use mean_variance()')
 
-    def maximum_sharpe(self) -> np.ndarray:
+        if not (self.costs is None or (np.isscalar(self.costs) and self.costs == 0)):
+            raise ValueError('mean_variance_cla() cannot be solved with costs  --> use mean_variance()')
+
+        lower_bounds, upper_bounds = self._get_lower_and_upper_bounds()
+        start = time.perf_counter()
+        cla = CriticalLineAlgorithm(expected_returns=self.assets.expected_returns,
+                                    expected_cov=self.assets.expected_cov,
+                                    lower_bounds=lower_bounds,
+                                    upper_bounds=upper_bounds)
+
+        if target_volatility is None and population_size is None:
+            weights = list(cla.corner_weights)
+            target = cla.corner_variances
+        else:
+            self._validate_args(target_volatility=target_volatility, population_size=population_size)
+            target = self._mean_variance_target(target_volatility=target_volatility, population_size=population_size)
+            weights = cla.weights(target_variance=target)
+
+        wall_time = (time.perf_counter() - start) / len(weights)
+        records = [SolveRecord(target=variance,
+                               solver=CLA_SOLVER,
+                               status='infeasible' if weight is None else 'optimal',
+                               objective=None if weight is None else float(self.assets.expected_returns @ weight),
+                               wall_time=wall_time)
+                   for variance, weight in zip(np.atleast_1d(target), weights)]
+
+        return self._gather_weights(method='mean_variance_cla',
+                                    target=target,
+                                    results=weights,
+                                    records=records,
+                                    ignore_none=ignore_none)
+
+    @_cached_result
+    def maximum_sharpe(self,
+                       engine: str = 'cvxpy',
+                       l1_coef: Optional[float] = None,
+                       l2_coef: Optional[float] = None) -> np.ndarray:
         """
         Maximize the sharpe ratio.
 
+        :param engine: * 'cvxpy' to solve the homogenized problem (Charnes-Cooper transformation) in one solve. Only
+                         for investment_type=InvestmentType.FULLY_INVESTED without costs nor regularization.
+                       * 'dinkelbach' to maximize the ratio of the expected returns net of costs and regularization
+                         to the volatility with Dinkelbach iterations (see _dinkelbach_maximum_sharpe). It supports
+                         the costs, prev_w, l1_coef, l2_coef and all the investment types and usually converges in a
+                         handful of solves.
+        :type engine: str, default 'cvxpy'
+
+        :param l1_coef: L1 regularisation coefficient. Increasing this coef will reduce the number of non-zero weights.
+                        Only with engine='dinkelbach'.
+        :type l1_coef: float, default to None
+
+        :param l2_coef: L2 regularisation coefficient. Increasing this coef will reduce the number of non-zero weights.
+                        Only with engine='dinkelbach'.
+        :type l2_coef: float, default to None
+
         :return the portfolio weights that maximize the sharpe ratio of the portfolio.
         :rtype: numpy.ndarray
         """
+        self._validate_engine(engine=engine, engines=['cvxpy', 'dinkelbach'])
+
+        if engine == 'dinkelbach':
+            return self._dinkelbach_maximum_sharpe(l1_coef=l1_coef, l2_coef=l2_coef)
 
         if self.investment_type != InvestmentType.FULLY_INVESTED:
             raise ValueError('maximum_sharpe() can be solved only for investment_type=InvestmentType.FULLY_INVESTED'
-                             '  --> you can find an approximation by computing the efficient frontier with '
-                             ' mean_variance(population=30) and finding the portfolio with the highest sharpe ratio.')
+                             '  --> use engine=\'dinkelbach\' for the other investment types.')
 
         if self.costs is not None:
             raise ValueError('maximum_sharpe() cannot be solved with costs '
-                             '  --> you can find an approximation by computing the efficient frontier with '
-                             ' mean_variance(population=30) and finding the portfolio with the highest sharpe ratio.')
+                             '  --> use engine=\'dinkelbach\' with costs.')
+
+        if l1_coef is not None or l2_coef is not None:
+            raise ValueError('maximum_sharpe() cannot be solved with regularization '
+                             '  --> use engine=\'dinkelbach\' with l1_coef or l2_coef.')
 
         # Variables
         w = cp.Variable(self.assets.asset_nb)
         k = cp.Variable()
 
         # Objectives
-        objective = cp.Minimize(cp.quad_form(w, self.assets.expected_cov))
+        objective = cp.Minimize(self._portfolio_variance(w=w, data=self._covariance_values()))
 
         # Constraints
         lower_bounds, upper_bounds = self._get_lower_and_upper_bounds()
-        constraints = [self._portfolio_returns(w=w) == 1,
+        constraints = [self._portfolio_returns(w=w, data=self._problem_values()) == 1,
                        w >= lower_bounds * k,
                        w <= upper_bounds * k,
                        cp.sum(w) == k,
@@ -378,24 +1446,136 @@ class Optimization:
         # Problem
         problem = cp.Problem(objective, constraints)
 
+        start = time.perf_counter()
         try:
-            problem.solve(solver='ECOS')
+            record = self._solve(problem=problem)
+            self._result = OptimizationResult(method='maximum_sharpe', weights=None, records=[record])
             if w.value is None or k.value is None:
                 logger.warning(f'None return')
                 raise OptimizationError
-            return np.array(w.value / k.value, dtype=float)
+            weights = np.array(w.value / k.value, dtype=float)
+            self._result.weights = weights
+            return weights
         except SolverError as e:
             logger.warning(f'SolverError for: {e}')
+            self._result = OptimizationResult(method='maximum_sharpe',
+                                              weights=None,
+                                              records=[SolveRecord(status='solver_error',
+                                                                   wall_time=time.perf_counter() - start,
+                                                                   error=str(e))])
             raise OptimizationError
         except ArpackNoConvergence as e:
             logger.warning(f'ArpackNoConvergence for: {e}')
             raise OptimizationError
 
+    def _dinkelbach_maximum_sharpe(self,
+                                   l1_coef: Optional[float] = None,
+                                   l2_coef: Optional[float] = None) -> np.ndarray:
+        """
+        Maximum sharpe ratio R(w) / σ(w) with R the expected returns net of costs and regularization (concave) and σ
+        the volatility (convex), by Dinkelbach iterations: for the sharpe ratio λ of the current weights, the
+        concave problem max R(w) - λ σ(w) is solved and λ is updated to the sharpe ratio of its solution, until λ
+        increases by less than DINKELBACH_TOLERANCE. λ increases at each iteration and converges superlinearly to
+        the maximum sharpe ratio.
+        The problem is built once with λ as parameter (and kept in the problem cache), so each iteration only
+        re-solves it (warm-started with warm_start). The iterations start from the sharpe ratio of prev_w when it is
+        positive, which is close to the solution of a rebalancing, or else from the maximum return portfolio (λ=0).
+
+        :return the portfolio weights that maximize the sharpe ratio of the portfolio.
+        :rtype: numpy.ndarray
+        """
+        values = self._problem_values(l1_coef=l1_coef, l2_coef=l2_coef)
+        covariance_values = self._covariance_values()
+        if 'covariance' in covariance_values:
+            covariance_values = {'covariance_factor': self.assets.expected_cov_cholesky}
+        values.update(covariance_values)
+        expected_cov = self._model_expected_cov()
+        investment_target = self._get_investment_target()
+
+        def build(data: dict) -> tuple[cp.Problem, cp.Variable, cp.Parameter]:
+            # Variables
+            w = cp.Variable(self.assets.asset_nb)
+
+            # Parameters
+            sharpe_ratio_param = cp.Parameter(nonneg=True)
+
+            # Objectives
+            objective = cp.Maximize(self._portfolio_returns(w=w, data=data)
+                                    - sharpe_ratio_param * self._portfolio_volatility(w=w, data=data))
+
+            # Constraints
+            constraints = [w >= data['lower_bounds'],
+                           w <= data['upper_bounds']]
+
+            if investment_target is not None:
+                constraints.append(cp.sum(w) == investment_target)
+
+            # Problem
+            problem = cp.Problem(objective, constraints)
+            return problem, w, sharpe_ratio_param
+
+        problem, w, sharpe_ratio_param, key = self._get_problem(method='maximum_sharpe_dinkelbach',
+                                                                values=values,
+                                                                builder=build)
+
+        def sharpe_ratio(weights: np.ndarray) -> float:
+            volatility = np.sqrt(max(weights @ expected_cov @ weights, 0))
+            if volatility == 0:
+                return np.nan
+            return self._objective_value(weights=weights, values=values) / volatility
+
+        self._result = OptimizationResult(method='maximum_sharpe', weights=None, records=[])
+        sharpe = sharpe_ratio(self.prev_w) if self.prev_w is not None else np.nan
+        if not sharpe > 0:
+            sharpe = 0.0
+        weights, best_sharpe = None, -np.inf
+        for _ in range(DINKELBACH_MAX_ITERATIONS):
+            sharpe_ratio_param.value = sharpe
+            start = time.perf_counter()
+            try:
+                record = self._solve(problem=problem, key=key, target=sharpe, warm_start=self.warm_start)
+            except SolverError as e:
+                logger.warning(f'SolverError for: {e}')
+                self._result.records.append(SolveRecord(target=sharpe,
+                                                        status='solver_error',
+                                                        wall_time=time.perf_counter() - start,
+                                                        error=str(e)))
+                raise OptimizationError
+            self._result.records.append(record)
+            if w.value is None:
+                logger.warning(f'None return')
+                raise OptimizationError
+            new_sharpe = sharpe_ratio(np.array(w.value, dtype=float))
+            if not new_sharpe > best_sharpe:
+                # Zero volatility or no improvement within the solver accuracy
+                break
+            weights, best_sharpe = np.array(w.value, dtype=float), new_sharpe
+            if best_sharpe <= 0:
+                if sharpe == 0:
+                    logger.warning(f'No portfolio with positive expected returns net of costs and regularization')
+                    raise OptimizationError
+                # The sharpe ratio of prev_w is not reachable (prev_w outside the bounds): restart from λ=0
+                sharpe = 0.0
+                continue
+            if abs(best_sharpe - sharpe) <= DINKELBACH_TOLERANCE * best_sharpe:
+                break
+            sharpe = best_sharpe
+        else:
+            logger.warning(f'Dinkelbach iterations of maximum_sharpe not converged after '
+                           f'{DINKELBACH_MAX_ITERATIONS} solves')
+
+        if weights is None:
+            raise OptimizationError
+        self._result.weights = weights
+        return weights
+
+    @_cached_result
     def mean_semivariance(self,
                           returns_target: Optional[Union[float, np.ndarray]] = None,
                           target_semideviation: Optional[Union[float, list, np.ndarray]] = None,
                           population_size: Optional[int] = None,
-                          ignore_none: bool = True) -> Union[list[np.ndarray], np.ndarray]:
+                          ignore_none: bool = True,
+                          frontier_tolerance: Optional[float] = None) -> Union[list[np.ndarray], np.ndarray]:
         """
         Optimization along the mean-semivariance frontier.
 
@@ -411,11 +1591,20 @@ class Optimization:
         :param ignore_none: if True, None are removed from the list of weights results when the optimization failed
         :type ignore_none: bool, default True
 
+        :param frontier_tolerance: with population_size, the frontier is solved from its exact minimum semivariance
+                                   and maximum return portfolios and the targets are placed where the frontier
+                                   curves until its piecewise linear approximation is within frontier_tolerance
+                                   (relative to the semivariance and return ranges) or population_size solves are
+                                   reached (see adaptive_frontier). The weights are returned by increasing semivariance.
+                                   None for population_size targets evenly spaced in log scale.
+        :type frontier_tolerance: float, default None
+
         :return the portfolio weights that are in the efficient frontier
         :rtype: list of numpy.ndarray or numpy.ndarray
         """
         self._validate_args(population_size=population_size,
-                            target_semideviation=target_semideviation)
+                            target_semideviation=target_semideviation,
+                            frontier_tolerance=frontier_tolerance)
 
         if returns_target is None:
             returns_target = self.assets.expected_returns
@@ -425,32 +1614,55 @@ class Optimization:
             returns_target = returns_target[:, np.newaxis]
         b = (self.assets.returns - returns_target) / np.sqrt(self.assets.date_nb)
 
-        # Variables
-        w = cp.Variable(self.assets.asset_nb)
-        p = cp.Variable(self.assets.date_nb, nonneg=True)
-        n = cp.Variable(self.assets.date_nb, nonneg=True)
+        values = self._problem_values()
+        values['semivariance_returns'] = b.T
+        investment_target = self._get_investment_target()
 
-        # Parameters
-        target_semivariance_param = cp.Parameter(nonneg=True)
+        def build(data: dict) -> tuple[cp.Problem, cp.Variable, cp.Parameter]:
+            # Variables
+            w = cp.Variable(self.assets.asset_nb)
 
-        # Objectives
-        objective = cp.Maximize(self._portfolio_returns(w=w))
+            # Parameters
+            target_semivariance_param = cp.Parameter(nonneg=True)
 
-        # Constraints
-        portfolio_semivariance = cp.sum(cp.square(n))
-        lower_bounds, upper_bounds = self._get_lower_and_upper_bounds()
+            # Objectives
+            objective = cp.Maximize(self._portfolio_returns(w=w, data=data))
 
-        constraints = [portfolio_semivariance <= target_semivariance_param,
-                       b.T @ w - p + n == 0,
-                       w >= lower_bounds,
-                       w <= upper_bounds]
+            # Constraints
+            portfolio_semivariance, risk_constraints = self._portfolio_risk(method='mean_semivariance', w=w, data=data)
 
-        investment_target = self._get_investment_target()
-        if investment_target is not None:
-            constraints.append(cp.sum(w) == investment_target)
+            constraints = [portfolio_semivariance <= target_semivariance_param,
+                           *risk_constraints,
+                           w >= data['lower_bounds'],
+                           w <= data['upper_bounds']]
 
-        # Problem
-        problem = cp.Problem(objective, constraints)
+            if investment_target is not None:
+                constraints.append(cp.sum(w) == investment_target)
+
+            # Problem
+            problem = cp.Problem(objective, constraints)
+            return problem, w, target_semivariance_param
+
+        problem, w, target_semivariance_param, key = self._get_problem(method='mean_semivariance',
+                                                                       values=values,
+                                                                       builder=build)
+
+        def risk(weights: np.ndarray) -> float:
+            return float(np.sum(np.minimum(values['semivariance_returns'] @ weights, 0) ** 2))
+
+        if frontier_tolerance is not None:
+            return self._adaptive_frontier_weights(method='mean_semivariance',
+                                                   values=values,
+                                                   solve=lambda value: self._solve_target(
+                                                       problem=problem,
+                                                       w=w,
+                                                       parameter=target_semivariance_param,
+                                                       target=value,
+                                                       key=key),
+                                                   risk=risk,
+                                                   population_size=population_size,
+                                                   frontier_tolerance=frontier_tolerance,
+                                                   ignore_none=ignore_none)
 
         if target_semideviation is not None:
             if np.isscalar(target_semideviation):
@@ -459,25 +1671,35 @@ class Optimization:
                 target = np.array(target_semideviation) ** 2
         else:
             # Solve for multiple semideviations
-            min_volatility = np.sqrt(1 / np.sum(np.linalg.pinv(self.assets.expected_cov)))
+            min_volatility = np.sqrt(1 / np.sum(self.assets.expected_cov_pinv))
             start = np.log10(min_volatility * 1.3)  # We start at min_volatility * 130% to increase proba of convergence
             end = np.log10(0.3 / np.sqrt(255))  # We stop at 30% annualized semideviation
             semideviations = np.logspace(start, end, num=population_size)
             target = semideviations ** 2
 
-        weights = self._get_optimization_weights(problem=problem,
+        weights = self._get_optimization_weights(method='mean_semivariance',
+                                                 problem=problem,
                                                  w=w,
                                                  parameter=target_semivariance_param,
                                                  target=target,
-                                                 ignore_none=ignore_none)
+                                                 ignore_none=ignore_none,
+                                                 key=key,
+                                                 infeasible_records=self._infeasible_records(
+                                                     method='mean_semivariance',
+                                                     values=values,
+                                                     risk=risk,
+                                                     target=target))
 
         return weights
 
+    @_cached_result
     def mean_cvar(self,
                   beta: float = 0.95,
                   target_cvar: Optional[Union[float, list, np.ndarray]] = None,
                   population_size: Optional[int] = None,
-                  ignore_none: bool = True) -> Union[list[np.ndarray], np.ndarray]:
+                  ignore_none: bool = True,
+                  engine: str = 'cvxpy',
+                  frontier_tolerance: Optional[float] = None) -> Union[list[np.ndarray], np.ndarray]:
         """
         Optimization along the mean-CVaR frontier (Conditional Value-at-Risk or Expected Shortfall).
         CVaR is the average of the “extreme” losses beyond the VaR threshold.
@@ -494,40 +1716,31 @@ class Optimization:
         :param ignore_none: if True, None are removed from the list of weights results when the optimization failed
         :type ignore_none: bool, default True
 
+        :param engine: * 'cvxpy' to solve the problem with CVXPY and the solver of solver_config
+                       * 'highs' to build the linear program directly with sparse matrices and solve it with the
+                         HiGHS solver of scipy.optimize.linprog (see cvar_linear_program)
+                       * 'cutting_plane' to solve a master linear program with HiGHS holding only the scenarios
+                         that reach the tail of its solutions, the others being aggregated in cuts (see
+                         CvarCuttingPlane). It is a fraction of the size of the 'highs' linear program, which suits
+                         long histories and large simulated scenario sets.
+        :type engine: str, default 'cvxpy'
+
+        :param frontier_tolerance: with population_size, the frontier is solved from its exact minimum CVaR
+                                   and maximum return portfolios and the targets are placed where the frontier
+                                   curves until its piecewise linear approximation is within frontier_tolerance
+                                   (relative to the CVaR and return ranges) or population_size solves are
+                                   reached (see adaptive_frontier). The weights are returned by increasing CVaR.
+                                   None for population_size targets evenly spaced in log scale.
+        :type frontier_tolerance: float, default None
+
         :return the portfolio weights that are in the efficient frontier
         :rtype: list of numpy.ndarray or numpy.ndarray
         """
 
         self._validate_args(population_size=population_size,
-                            target_cvar=target_cvar)
-
-        # Variables
-        w = cp.Variable(self.assets.asset_nb)
-        alpha = cp.Variable()
-        u = cp.Variable(self.assets.date_nb)
-
-        # Parameters
-        target_cvar_param = cp.Parameter(nonneg=True)
-
-        # Objectives
-        objective = cp.Maximize(self._portfolio_returns(w=w))
-
-        # Constraints
-        portfolio_cvar = alpha + 1.0 / (self.assets.date_nb * (1 - beta)) * cp.sum(u)
-        lower_bounds, upper_bounds = self._get_lower_and_upper_bounds()
-
-        constraints = [portfolio_cvar <= target_cvar_param,
-                       self.assets.returns.T @ w + alpha + u >= 0,
-                       u >= 0,
-                       w >= lower_bounds,
-                       w <= upper_bounds]
-
-        investment_target = self._get_investment_target()
-        if investment_target is not None:
-            constraints.append(cp.sum(w) == investment_target)
-
-        # Problem
-        problem = cp.Problem(objective, constraints)
+                            target_cvar=target_cvar,
+                            frontier_tolerance=frontier_tolerance)
+        self._validate_engine(engine=engine, engines=['cvxpy', 'highs', 'cutting_plane'])
 
         if target_cvar is not None:
             if np.isscalar(target_cvar):
@@ -537,19 +1750,109 @@ class Optimization:
         else:
             target = np.logspace(-2, -0.5, num=population_size)
 
-        weights = self._get_optimization_weights(problem=problem,
+        values = self._problem_values()
+        values['returns'] = self.assets.returns.T
+        values['cvar_coef'] = 1.0 / (self.assets.date_nb * (1 - beta))
+
+        def risk(weights: np.ndarray) -> float:
+            return empirical_cvar(losses=-self.assets.returns.T @ weights, beta=beta)
+
+        def adaptive_frontier_weights(solve: Callable[[float], tuple[Optional[np.ndarray], SolveRecord]],
+                                      linear_program: Optional[Union[LinearProgram, CvarCuttingPlane]] = None
+                                      ) -> list[Optional[np.ndarray]]:
+            return self._adaptive_frontier_weights(method='mean_cvar',
+                                                   values=values,
+                                                   solve=solve,
+                                                   risk=risk,
+                                                   population_size=population_size,
+                                                   frontier_tolerance=frontier_tolerance,
+                                                   ignore_none=ignore_none,
+                                                   linear_program=linear_program)
+
+        if engine in ['highs', 'cutting_plane']:
+            if engine == 'highs':
+                linear_program = cvar_linear_program(values=self._problem_values(),
+                                                     returns=self.assets.returns,
+                                                     beta=beta,
+                                                     investment_target=self._get_investment_target())
+            else:
+                linear_program = CvarCuttingPlane(values=self._problem_values(),
+                                                  returns=self.assets.returns,
+                                                  beta=beta,
+                                                  investment_target=self._get_investment_target())
+            if frontier_tolerance is not None:
+                return adaptive_frontier_weights(solve=linear_program.solve, linear_program=linear_program)
+            infeasible_records = self._infeasible_records(method='mean_cvar',
+                                                          values=values,
+                                                          risk=risk,
+                                                          target=target,
+                                                          linear_program=linear_program)
+            return self._linear_program_weights(method='mean_cvar',
+                                                linear_program=linear_program,
+                                                target=target,
+                                                ignore_none=ignore_none,
+                                                infeasible_records=infeasible_records)
+
+        investment_target = self._get_investment_target()
+
+        def build(data: dict) -> tuple[cp.Problem, cp.Variable, cp.Parameter]:
+            # Variables
+            w = cp.Variable(self.assets.asset_nb)
+
+            # Parameters
+            target_cvar_param = cp.Parameter(nonneg=True)
+
+            # Objectives
+            objective = cp.Maximize(self._portfolio_returns(w=w, data=data))
+
+            # Constraints
+            portfolio_cvar, risk_constraints = self._portfolio_risk(method='mean_cvar', w=w, data=data)
+
+            constraints = [portfolio_cvar <= target_cvar_param,
+                           *risk_constraints,
+                           w >= data['lower_bounds'],
+                           w <= data['upper_bounds']]
+
+            if investment_target is not None:
+                constraints.append(cp.sum(w) == investment_target)
+
+            # Problem
+            problem = cp.Problem(objective, constraints)
+            return problem, w, target_cvar_param
+
+        problem, w, target_cvar_param, key = self._get_problem(method='mean_cvar',
+                                                               values=values,
+                                                               builder=build)
+
+        if frontier_tolerance is not None:
+            return adaptive_frontier_weights(solve=lambda value: self._solve_target(problem=problem,
+                                                                                    w=w,
+                                                                                    parameter=target_cvar_param,
+                                                                                    target=value,
+                                                                                    key=key))
+
+        weights = self._get_optimization_weights(method='mean_cvar',
+                                                 problem=problem,
                                                  w=w,
                                                  parameter=target_cvar_param,
                                                  target=target,
-                                                 ignore_none=ignore_none)
+                                                 ignore_none=ignore_none,
+                                                 key=key,
+                                                 infeasible_records=self._infeasible_records(method='mean_cvar',
+                                                                                             values=values,
+                                                                                             risk=risk,
+                                                                                             target=target))
 
         return weights
 
+    @_cached_result
     def mean_cdar(self,
                   beta: float = 0.95,
                   target_cdar: Optional[Union[float, list, np.ndarray]] = None,
                   population_size: Optional[int] = None,
-                  ignore_none: bool = True) -> Union[list[np.ndarray], np.ndarray]:
+                  ignore_none: bool = True,
+                  engine: str = 'cvxpy',
+                  frontier_tolerance: Optional[float] = None) -> Union[list[np.ndarray], np.ndarray]:
         """
         Optimization along the mean-CDaR frontier (Conditional Drawdown-at-Risk).
         The Conditional Drawdown-at-Risk is the average drawdown for all the days that drawdown exceeds a threshold.
@@ -566,45 +1869,28 @@ class Optimization:
         :param ignore_none: if True, None are removed from the list of weights results when the optimization failed
         :type ignore_none: bool, default True
 
+        :param engine: 'cvxpy' to solve the problem with CVXPY and the solver of solver_config or 'highs' to build
+                       the linear program directly with sparse matrices (the drawdown recursion being a difference
+                       matrix) and solve it with the HiGHS solver of scipy.optimize.linprog (see cdar_linear_program)
+        :type engine: str, default 'cvxpy'
+
+        :param frontier_tolerance: with population_size, the frontier is solved from its exact minimum CDaR
+                                   and maximum return portfolios and the targets are placed where the frontier
+                                   curves until its piecewise linear approximation is within frontier_tolerance
+                                   (relative to the CDaR and return ranges) or population_size solves are
+                                   reached (see adaptive_frontier). The weights are returned by increasing CDaR.
+                                   None for population_size targets evenly spaced in log scale.
+        :type frontier_tolerance: float, default None
+
         :return the portfolio weights that are in the efficient frontier
         :rtype: list of numpy.ndarray or numpy.ndarray
 
         """
 
         self._validate_args(population_size=population_size,
-                            target_cdar=target_cdar)
-
-        # Variables
-        w = cp.Variable(self.assets.asset_nb)
-        alpha = cp.Variable()
-        u = cp.Variable(self.assets.date_nb + 1)
-        z = cp.Variable(self.assets.date_nb)
-
-        # Parameters
-        target_cdar_param = cp.Parameter(nonneg=True)
-
-        # Objectives
-        objective = cp.Maximize(self._portfolio_returns(w=w))
-
-        # Constraints
-        portfolio_cdar = alpha + 1.0 / (self.assets.date_nb * (1 - beta)) * cp.sum(z)
-        lower_bounds, upper_bounds = self._get_lower_and_upper_bounds()
-
-        constraints = [portfolio_cdar <= target_cdar_param,
-                       z >= u[1:] - alpha,
-                       z >= 0,
-                       u[1:] >= u[:-1] - self.assets.returns.T @ w,
-                       u[0] == 0,
-                       u[1:] >= 0,
-                       w >= lower_bounds,
-                       w <= upper_bounds]
-
-        investment_target = self._get_investment_target()
-        if investment_target is not None:
-            constraints.append(cp.sum(w) == investment_target)
-
-        # Problem
-        problem = cp.Problem(objective, constraints)
+                            target_cdar=target_cdar,
+                            frontier_tolerance=frontier_tolerance)
+        self._validate_engine(engine=engine, engines=['cvxpy', 'highs'])
 
         if target_cdar is not None:
             if np.isscalar(target_cdar):
@@ -615,12 +1901,148 @@ class Optimization:
             # Solve for multiple cdar
             target = np.logspace(-2, -0.5, num=population_size)
 
-        weights = self._get_optimization_weights(problem=problem,
+        values = self._problem_values()
+        values['returns'] = self.assets.returns.T
+        values['cdar_coef'] = 1.0 / (self.assets.date_nb * (1 - beta))
+
+        def risk(weights: np.ndarray) -> float:
+            return empirical_cvar(losses=uncompounded_drawdowns(self.assets.returns.T @ weights), beta=beta)
+
+        def adaptive_frontier_weights(solve: Callable[[float], tuple[Optional[np.ndarray], SolveRecord]],
+                                      linear_program: Optional[Union[LinearProgram, CvarCuttingPlane]] = None
+                                      ) -> list[Optional[np.ndarray]]:
+            return self._adaptive_frontier_weights(method='mean_cdar',
+                                                   values=values,
+                                                   solve=solve,
+                                                   risk=risk,
+                                                   population_size=population_size,
+                                                   frontier_tolerance=frontier_tolerance,
+                                                   ignore_none=ignore_none,
+                                                   linear_program=linear_program)
+
+        if engine == 'highs':
+            linear_program = cdar_linear_program(values=self._problem_values(),
+                                                 returns=self.assets.returns,
+                                                 beta=beta,
+                                                 investment_target=self._get_investment_target())
+            if frontier_tolerance is not None:
+                return adaptive_frontier_weights(solve=linear_program.solve, linear_program=linear_program)
+            infeasible_records = self._infeasible_records(method='mean_cdar',
+                                                          values=values,
+                                                          risk=risk,
+                                                          target=target,
+                                                          linear_program=linear_program)
+            return self._linear_program_weights(method='mean_cdar',
+                                                linear_program=linear_program,
+                                                target=target,
+                                                ignore_none=ignore_none,
+                                                infeasible_records=infeasible_records)
+
+        investment_target = self._get_investment_target()
+
+        def build(data: dict) -> tuple[cp.Problem, cp.Variable, cp.Parameter]:
+            # Variables
+            w = cp.Variable(self.assets.asset_nb)
+
+            # Parameters
+            target_cdar_param = cp.Parameter(nonneg=True)
+
+            # Objectives
+            objective = cp.Maximize(self._portfolio_returns(w=w, data=data))
+
+            # Constraints
+            portfolio_cdar, risk_constraints = self._portfolio_risk(method='mean_cdar', w=w, data=data)
+
+            constraints = [portfolio_cdar <= target_cdar_param,
+                           *risk_constraints,
+                           w >= data['lower_bounds'],
+                           w <= data['upper_bounds']]
+
+            if investment_target is not None:
+                constraints.append(cp.sum(w) == investment_target)
+
+            # Problem
+            problem = cp.Problem(objective, constraints)
+            return problem, w, target_cdar_param
+
+        problem, w, target_cdar_param, key = self._get_problem(method='mean_cdar',
+                                                               values=values,
+                                                               builder=build)
+
+        if frontier_tolerance is not None:
+            return adaptive_frontier_weights(solve=lambda value: self._solve_target(problem=problem,
+                                                                                    w=w,
+                                                                                    parameter=target_cdar_param,
+                                                                                    target=value,
+                                                                                    key=key))
+
+        weights = self._get_optimization_weights(method='mean_cdar',
+                                                 problem=problem,
                                                  w=w,
                                                  parameter=target_cdar_param,
                                                  target=target,
-                                                 ignore_none=ignore_none)
+                                                 ignore_none=ignore_none,
+                                                 key=key,
+                                                 infeasible_records=self._infeasible_records(method='mean_cdar',
+                                                                                             values=values,
+                                                                                             risk=risk,
+                                                                                             target=target))
+
+        return weights
+
+    def nsga2(self,
+              population_size: int = 100,
+              generations: int = 100,
+              fitness_type: FitnessType = FitnessType.MEAN_STD,
+              cardinality: Optional[int] = None,
+              seed: Optional[int] = None) -> list[np.ndarray]:
+        """
+        Pareto front of the fitness objectives from the multi-objective genetic algorithm NSGA-II (see NSGA2).
+        The objectives need not be convex, like the maximum drawdown, and the cardinality limits the number of
+        assets of each portfolio, which the convex problems cannot express. The fitness is evaluated on n_jobs
+        worker processes for large populations.
 
+        :param population_size: number of portfolios of the population (even)
+        :type population_size: int, default 100
+
+        :param generations: number of generations
+        :type generations: int, default 100
+
+        :param fitness_type: objectives of the fitness (see Portfolio.fitness)
+        :type fitness_type: FitnessType, default FitnessType.MEAN_STD
+
+        :param cardinality: maximum number of non-zero weights of each portfolio. The weight bounds should contain
+                            zero.
+        :type cardinality: int, default None (no limit)
+
+        :param seed: seed of the random generator
+        :type seed: int, default None
+
+        :return the portfolio weights of the first front of the last generation, by increasing first objective.
+        :rtype: list of numpy.ndarray
+        """
+        if not (self.costs is None or (np.isscalar(self.costs) and self.costs == 0)):
+            raise ValueError('nsga2() cannot be solved with costs: the fitness is the fitness of Portfolio')
+
+        lower_bounds, upper_bounds = self._get_lower_and_upper_bounds()
+        start = time.perf_counter()
+        nsga2 = NSGA2(returns=self.assets.returns,
+                      lower_bounds=lower_bounds,
+                      upper_bounds=upper_bounds,
+                      budget=self._get_investment_target(),
+                      fitness_type=fitness_type,
+                      population_size=population_size,
+                      cardinality=cardinality,
+                      n_jobs=self.n_jobs,
+                      seed=seed)
+        front_weights, _ = nsga2.run(generations=generations)
+        weights = list(front_weights)
+        self._result = OptimizationResult(method='nsga2',
+                                          weights=weights,
+                                          records=[SolveRecord(solver=NSGA2_SOLVER,
+                                                               status='optimal',
+                                                               iterations=nsga2.generation,
+                                                               wall_time=time.perf_counter() - start)])
         return weights
 
     def inverse_volatility(self) -> np.ndarray:
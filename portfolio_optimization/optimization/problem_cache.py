@@ -0,0 +1,191 @@
+import logging
+from typing import Optional, Union
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import cvxpy as cp
+
+__all__ = ['MAX_PARAMETER_SIZE',
+           'CachedProblem',
+           'ProblemCache']
+
+logger = logging.getLogger('portfolio_optimization.problem_cache')
+
+# Default maximum number of parameter entries of a cached problem. The DPP compilation of CVXPY stores a tensor
+# mapping each parameter entry to the problem data, so its time and memory grow with the number of entries: the
+# 400 x 400 covariance factor of mean_variance takes 14s and 1.5GB to compile (0.4s to canonicalize as constants)
+# and the 99 x 1565 returns of mean_cvar 10s and 1.3GB.
+MAX_PARAMETER_SIZE = 2 ** 15
+
+# Problem data that has to be nonnegative to keep the problems DPP-compliant (parameter times convex expression)
+NONNEG_PARAMETERS = ['l1_coef', 'l2_coef', 'cvar_coef', 'cdar_coef']
+
+
+class CachedProblem:
+    def __init__(self,
+                 problem: cp.Problem,
+                 w: cp.Variable,
+                 target_parameter: cp.Parameter,
+                 parameters: dict[str, cp.Parameter]):
+        """
+        CVXPY problem built with cp.Parameter for all its data so that it can be solved again on new data without
+        being canonicalized again.
+
+        :param problem: the DPP-compliant problem
+        :param w: the weights variable
+        :param target_parameter: the parameter of the risk target (variance, semivariance, cvar or cdar)
+        :param parameters: the parameters of the problem data by name
+        """
+        self.problem = problem
+        self.w = w
+        self.target_parameter = target_parameter
+        self.parameters = parameters
+        self.solve_nb = 0
+
+    def set_values(self, values: dict[str, Union[float, np.ndarray]]):
+        for name, value in values.items():
+            self.parameters[name].value = value
+
+
+class ProblemCache:
+    def __init__(self,
+                 max_size: Optional[int] = 32,
+                 max_parameter_size: Optional[Union[int, dict[str, Optional[int]]]] = MAX_PARAMETER_SIZE):
+        """
+        Cache of compiled CVXPY problems shared by Optimization instances.
+        The problems are keyed by (method, investment type, names and shapes of the problem data), which
+        encodes the number of assets and dates, and the bounds, costs and regularization structure.
+        The data (expected returns, covariance factor, returns, bounds, costs, prev_w...) are cp.Parameter,
+        so when the same structure is solved again (for example in a walk forward with a constant universe size),
+        only the parameter values are updated and CVXPY skips the canonicalization.
+
+        The canonicalization and solve times of each solve are recorded in timings.
+
+        Problems whose data have more than max_parameter_size entries are not cached: the DPP compilation of large
+        parameters (the returns matrix of mean_semivariance, mean_cvar and mean_cdar over a real history, or the
+        covariance factor of more than 181 assets) is slower and uses much more memory than the canonicalization it
+        saves (see MAX_PARAMETER_SIZE). They are built with constants, counted in skipped and skipped_methods, and
+        a warning is logged the first time each method is not cached. Caching them is opt-in per method, when the
+        same structure is solved enough times to pay the compilation.
+
+        :param max_size: maximum number of problems kept in the cache. The least recently used problems are evicted.
+                         None for no limit.
+        :param max_parameter_size: maximum total number of entries of the problem data of a cached problem. None for
+                                   no limit. A dict gives the limit by method name (for example
+                                   {'mean_cvar': None} to cache mean_cvar whatever its size, which also applies to
+                                   its minimum risk and maximum return problems), the other methods keeping
+                                   MAX_PARAMETER_SIZE.
+        """
+        self.max_size = max_size
+        self.max_parameter_size = max_parameter_size
+        self.problems = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.skipped_methods = {}
+        self._timings = []
+
+    @staticmethod
+    def parameters(values: dict[str, Union[float, np.ndarray]]) -> dict[str, cp.Parameter]:
+        """Create one cp.Parameter per problem data with the same shape"""
+        return {name: cp.Parameter(shape=np.shape(value), name=name, nonneg=name in NONNEG_PARAMETERS)
+                for name, value in values.items()}
+
+    def parameter_size_limit(self, method: str) -> Optional[int]:
+        """Maximum number of parameter entries of the problems of the method (see max_parameter_size)"""
+        if not isinstance(self.max_parameter_size, dict):
+            return self.max_parameter_size
+        for name, limit in self.max_parameter_size.items():
+            if method == name or method.startswith(f'{name}_'):
+                return limit
+        return MAX_PARAMETER_SIZE
+
+    def is_cacheable(self, method: str, values: dict[str, Union[float, np.ndarray]]) -> bool:
+        """True if the problem data are small enough to be given as cp.Parameter"""
+        limit = self.parameter_size_limit(method)
+        if limit is None:
+            return True
+        return sum(np.size(value) for value in values.values()) <= limit
+
+    def skip(self, method: str, values: dict[str, Union[float, np.ndarray]]):
+        """Count a problem not cached because of the size of its data, with a warning the first time for the method"""
+        self.skipped += 1
+        if method not in self.skipped_methods:
+            self.skipped_methods[method] = 0
+            size = sum(np.size(value) for value in values.values())
+            logger.warning(f'{method} not cached: its data have {size} entries, more than the '
+                           f'max_parameter_size {self.parameter_size_limit(method)}. Give a larger '
+                           f'max_parameter_size for {method} to cache it.')
+        self.skipped_methods[method] += 1
+
+    @staticmethod
+    def key(method: str, values: dict[str, Union[float, np.ndarray]], **kwargs) -> tuple:
+        return (method,
+                tuple((name, np.shape(value)) for name, value in sorted(values.items())),
+                tuple(sorted(kwargs.items())))
+
+    def get(self, key: tuple) -> Optional[CachedProblem]:
+        cached_problem = self.problems.get(key)
+        if cached_problem is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.problems.move_to_end(key)
+        return cached_problem
+
+    def add(self, key: tuple, cached_problem: CachedProblem):
+        self.problems[key] = cached_problem
+        self.problems.move_to_end(key)
+        if self.max_size is not None:
+            while len(self.problems) > self.max_size:
+                self.problems.popitem(last=False)
+
+    def record(self, key: tuple, duration: float, problem: cp.Problem, first_solve: bool):
+        """
+        Record the timing of one solve.
+
+        :param key: the problem key
+        :param duration: the wall time of problem.solve()
+        :param problem: the solved problem
+        :param first_solve: True if it was the first solve of the problem (full canonicalization)
+        """
+        solver_time = 0
+        stats = problem.solver_stats
+        if stats is not None:
+            solver_time = (stats.solve_time or 0) + (stats.setup_time or 0)
+        self._timings.append({'method': key[0],
+                              'first_solve': first_solve,
+                              'canonicalization_time': max(duration - solver_time, 0),
+                              'solve_time': solver_time,
+                              'total_time': duration})
+
+    @property
+    def timings(self) -> pd.DataFrame:
+        """Canonicalization time versus solver time of each solve"""
+        return pd.DataFrame(self._timings, columns=['method',
+                                                    'first_solve',
+                                                    'canonicalization_time',
+                                                    'solve_time',
+                                                    'total_time'])
+
+    def summary(self) -> pd.DataFrame:
+        """Mean canonicalization and solve times per method, for the first solves and the cached solves"""
+        return self.timings.groupby(['method', 'first_solve']).agg(['count', 'mean'])
+
+    def clear(self):
+        self.problems.clear()
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.skipped_methods = {}
+        self._timings = []
+
+    def __len__(self):
+        return len(self.problems)
+
+    def __str__(self):
+        return (f'ProblemCache <{len(self.problems)} problems - {self.hits} hits - {self.misses} misses '
+                f'- {self.skipped} skipped>')
+
+    def __repr__(self):
+        return str(self)
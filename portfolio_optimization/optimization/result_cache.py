@@ -0,0 +1,158 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from enum import Enum
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+
+from portfolio_optimization.optimization.solver import *
+
+__all__ = ['RESULT_CACHE_MAX_BYTES',
+           'ResultCache',
+           'fingerprint']
+
+logger = logging.getLogger('portfolio_optimization.result_cache')
+
+# Default maximum total size in bytes of the result files of a ResultCache
+RESULT_CACHE_MAX_BYTES = 2 ** 30
+# Extension of the result files
+RESULT_CACHE_SUFFIX = '.pkl'
+
+
+def _update(h, value):
+    """Feed a canonical serialization of the value to the hash: the arrays by dtype, shape and content"""
+    if isinstance(value, np.ndarray):
+        h.update(f'array{value.dtype.str}{value.shape}'.encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(f'dict{len(value)}'.encode())
+        for k in sorted(value, key=str):
+            _update(h, str(k))
+            _update(h, value[k])
+    elif isinstance(value, (list, tuple)):
+        h.update(f'{type(value).__name__}{len(value)}'.encode())
+        for v in value:
+            _update(h, v)
+    elif isinstance(value, Enum):
+        h.update(f'enum{type(value).__name__}.{value.name}'.encode())
+    elif isinstance(value, np.generic):
+        _update(h, value.item())
+    else:
+        h.update(f'{type(value).__name__}{value!r}'.encode())
+
+
+def fingerprint(*values) -> str:
+    """
+    Content hash (SHA-256) of the values: numpy arrays, scalars, strings, enums, None and nested dicts, lists and
+    tuples of them. Equal contents give equal fingerprints whatever the memory layout of the arrays.
+    """
+    h = hashlib.sha256()
+    for value in values:
+        _update(h, value)
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self,
+                 folder: Union[str, Path],
+                 max_bytes: Optional[int] = RESULT_CACHE_MAX_BYTES):
+        """
+        On-disk cache of the results of the optimizations (see Optimization result_cache).
+        Each OptimizationResult (weights and SolveRecord of each solve) is stored in one file named by the
+        fingerprint of the optimization inputs: the content of the returns, expected returns and expected
+        covariance, the method and its arguments (targets, population_size...) and the settings of Optimization
+        (investment type, bounds, costs, prev_w, solver configuration...). An identical optimization, in the same
+        or in another process, returns the stored result without solving.
+
+        The least recently used results (by modification time of their file, updated at each hit) are evicted
+        when the total size of the files exceeds max_bytes.
+
+        :param folder: folder of the result files, created when missing. It can be shared by several processes.
+        :param max_bytes: maximum total size in bytes of the result files. None for no limit.
+        """
+        self.folder = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return Path(self.folder, f'{key}{RESULT_CACHE_SUFFIX}')
+
+    def _files(self) -> list[Path]:
+        return list(self.folder.glob(f'*{RESULT_CACHE_SUFFIX}'))
+
+    def get(self, key: str) -> Optional[OptimizationResult]:
+        """The stored result of the key. None when missing or unreadable."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            result = None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logger.warning(f'Unreadable cached result {path}: {e}')
+            result = None
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def add(self, key: str, result: OptimizationResult):
+        """Store the result with an atomic write, then evict the least recently used results beyond max_bytes"""
+        descriptor, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def _evict(self):
+        if self.max_bytes is None:
+            return
+        files = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in sorted(files, key=lambda file: file[0]):
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+            self.evictions += 1
+            logger.debug(f'Evicted cached result {path.name}')
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes of the result files"""
+        return sum(path.stat().st_size for path in self._files())
+
+    def clear(self):
+        for path in self._files():
+            path.unlink(missing_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._files())
+
+    def __str__(self):
+        return (f'ResultCache <{len(self)} results - {self.hits} hits - {self.misses} misses '
+                f'- {self.evictions} evictions>')
+
+    def __repr__(self):
+        return str(self)
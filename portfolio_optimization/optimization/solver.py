@@ -0,0 +1,441 @@
+import logging
+import multiprocessing
+import time
+from typing import Optional, Union
+import numpy as np
+import pandas as pd
+import cvxpy as cp
+from cvxpy import SolverError
+
+__all__ = ['FEASIBILITY_CHECK_SOLVER',
+           'TIME_LIMIT_STATUS',
+           'SOLVER_ERROR_STATUS',
+           'RETRY_STATUSES',
+           'SolverConfig',
+           'SolveRecord',
+           'OptimizationResult',
+           'solve_problem']
+
+logger = logging.getLogger('portfolio_optimization.solver')
+
+# Solver name of the SolveRecord of the targets skipped by the feasibility check of Optimization
+FEASIBILITY_CHECK_SOLVER = 'FEASIBILITY_CHECK'
+# Status of the solves stopped by the time budget of their target (see SolverConfig target_time_limit)
+TIME_LIMIT_STATUS = 'time_limit'
+# Status of the attempts of the fallback chain that raised a SolverError
+SOLVER_ERROR_STATUS = 'solver_error'
+# Statuses of the solves retried with the next solver of the fallback chain
+RETRY_STATUSES = [cp.OPTIMAL_INACCURATE, cp.INFEASIBLE_INACCURATE, cp.UNBOUNDED_INACCURATE, cp.USER_LIMIT,
+                  TIME_LIMIT_STATUS]
+
+# Names of the tolerance, maximum iterations and time limit options of each solver
+SOLVER_OPTIONS = {'ECOS': {'tolerance': ['abstol', 'reltol', 'feastol'],
+                           'max_iters': 'max_iters',
+                           'time_limit': None},
+                  'SCS': {'tolerance': ['eps_abs', 'eps_rel'],
+                          'max_iters': 'max_iters',
+                          'time_limit': 'time_limit_secs'},
+                  'CLARABEL': {'tolerance': ['tol_gap_abs', 'tol_gap_rel', 'tol_feas'],
+                               'max_iters': 'max_iter',
+                               'time_limit': 'time_limit'},
+                  'OSQP': {'tolerance': ['eps_abs', 'eps_rel'],
+                           'max_iters': 'max_iter',
+                           'time_limit': 'time_limit'}}
+
+
+class SolverConfig:
+    def __init__(self,
+                 solver: str = 'ECOS',
+                 tolerance: Optional[float] = None,
+                 max_iters: Optional[int] = None,
+                 time_limit: Optional[float] = None,
+                 fallback: Optional[list[str]] = None,
+                 solver_params: Optional[dict] = None,
+                 target_time_limit: Optional[float] = None,
+                 retry_statuses: Optional[list[str]] = None):
+        """
+        Solver configuration of Optimization.
+        The tolerance, max_iters and time_limit are translated to the option names of each solver.
+        When a solver raises a SolverError or returns one of the retry_statuses (inaccurate solution, iteration or
+        time limit reached), the problem is solved again with the next solver of the fallback chain.
+        Each attempt is kept in SolveRecord.attempts.
+
+        :param solver: name of the CVXPY solver
+        :param tolerance: absolute and relative tolerance (gap and feasibility). None for the solver default.
+        :param max_iters: maximum number of iterations. None for the solver default.
+        :param time_limit: time limit of each solve in seconds. None for no limit. Ignored by solvers without time
+                           limit (ECOS).
+        :param fallback: solvers tried in order when the previous solver fails
+        :param solver_params: additional keyword arguments given to the solver
+        :param target_time_limit: wall-clock budget in seconds of each target over the whole fallback chain. Each
+                                  solver runs with the remaining budget as time limit and the next solvers are not
+                                  tried once it is spent: the target ends with status TIME_LIMIT_STATUS and no
+                                  solution, so the tail latency of a frontier is bounded. The problems of the
+                                  solvers without time limit option (ECOS) are canonicalized in the current process
+                                  and their solver call runs in a worker process killed at the end of the budget,
+                                  without warm start. The canonicalization is not interrupted. None for no budget.
+        :param retry_statuses: statuses of the solves retried with the next solver. Default is RETRY_STATUSES.
+                               When no solver of the chain succeeds, the first inaccurate solution is kept.
+        """
+        self.solver = solver.upper()
+        self.tolerance = tolerance
+        self.max_iters = max_iters
+        self.time_limit = time_limit
+        self.fallback = [] if fallback is None else [s.upper() for s in fallback]
+        self.solver_params = {} if solver_params is None else solver_params
+        self.target_time_limit = target_time_limit
+        self.retry_statuses = RETRY_STATUSES if retry_statuses is None else retry_statuses
+        self._validation()
+
+    def _validation(self):
+        for solver in self.solvers:
+            if solver not in cp.installed_solvers():
+                raise ValueError(f'Solver {solver} is not installed. Installed solvers are {cp.installed_solvers()}')
+        if self.tolerance is not None and self.tolerance <= 0:
+            raise ValueError(f'tolerance should be strictly positive')
+        if self.max_iters is not None and self.max_iters < 1:
+            raise ValueError(f'max_iters should be strictly positive')
+        if self.time_limit is not None and self.time_limit <= 0:
+            raise ValueError(f'time_limit should be strictly positive')
+        if self.target_time_limit is not None and self.target_time_limit <= 0:
+            raise ValueError(f'target_time_limit should be strictly positive')
+
+    @property
+    def solvers(self) -> list[str]:
+        """The solver followed by the fallback chain"""
+        return [self.solver] + [s for s in self.fallback if s != self.solver]
+
+    def has_time_limit(self, solver: str) -> bool:
+        """True if the solver has a time limit option"""
+        options = SOLVER_OPTIONS.get(solver)
+        return options is not None and options['time_limit'] is not None
+
+    def solver_kwargs(self, solver: str, time_limit: Optional[float] = None) -> dict:
+        """
+        Keyword arguments of problem.solve() for the solver
+
+        :param time_limit: time limit in seconds replacing the time limit of the configuration when it is shorter
+                           (remaining budget of the target)
+        """
+        kwargs = {'solver': solver}
+        if self.time_limit is not None:
+            time_limit = self.time_limit if time_limit is None else min(self.time_limit, time_limit)
+        options = SOLVER_OPTIONS.get(solver)
+        if options is not None:
+            if self.tolerance is not None:
+                for name in options['tolerance']:
+                    kwargs[name] = self.tolerance
+            if self.max_iters is not None:
+                kwargs[options['max_iters']] = self.max_iters
+            if time_limit is not None and options['time_limit'] is not None:
+                kwargs[options['time_limit']] = time_limit
+        if solver == self.solver:
+            kwargs.update(self.solver_params)
+        return kwargs
+
+    def __str__(self):
+        return f'SolverConfig <{" -> ".join(self.solvers)}>'
+
+    def __repr__(self):
+        return str(self)
+
+
+class SolveRecord:
+    def __init__(self,
+                 target: Optional[float] = None,
+                 solver: Optional[str] = None,
+                 status: Optional[str] = None,
+                 setup_time: Optional[float] = None,
+                 solve_time: Optional[float] = None,
+                 iterations: Optional[int] = None,
+                 objective: Optional[float] = None,
+                 wall_time: Optional[float] = None,
+                 error: Optional[str] = None,
+                 attempts: Optional[list['SolveRecord']] = None):
+        """
+        Outcome of one solve.
+
+        :param target: value of the target parameter (variance, semivariance, cvar, cdar). None for maximum_sharpe.
+        :param solver: name of the solver that returned the solution (the last solver tried when all failed)
+        :param status: CVXPY status of the problem
+        :param setup_time: setup time reported by the solver in seconds
+        :param solve_time: solve time reported by the solver in seconds
+        :param iterations: number of iterations reported by the solver
+        :param objective: optimal value of the objective
+        :param wall_time: wall time of the solve including the canonicalization and the fallback solvers
+        :param error: error message of the last failure
+        :param attempts: SolveRecord of each solver of the fallback chain tried for the target
+        """
+        self.target = target
+        self.solver = solver
+        self.status = status
+        self.setup_time = setup_time
+        self.solve_time = solve_time
+        self.iterations = iterations
+        self.objective = objective
+        self.wall_time = wall_time
+        self.error = error
+        self.attempts = [] if attempts is None else attempts
+
+    @classmethod
+    def from_problem(cls,
+                     problem: cp.Problem,
+                     target: Optional[float] = None,
+                     wall_time: Optional[float] = None,
+                     error: Optional[str] = None) -> 'SolveRecord':
+        record = cls(target=target, wall_time=wall_time, error=error)
+        stats = problem.solver_stats
+        if stats is not None:
+            record.solver = stats.solver_name
+            record.setup_time = stats.setup_time
+            record.solve_time = stats.solve_time
+            record.iterations = stats.num_iters
+        record.status = problem.status
+        if problem.value is not None and np.isfinite(problem.value):
+            record.objective = float(problem.value)
+        return record
+
+    def to_dict(self) -> dict:
+        return {'target': self.target,
+                'solver': self.solver,
+                'status': self.status,
+                'setup_time': self.setup_time,
+                'solve_time': self.solve_time,
+                'iterations': self.iterations,
+                'objective': self.objective,
+                'wall_time': self.wall_time,
+                'error': self.error}
+
+    def __str__(self):
+        return f'SolveRecord <{self.solver} - {self.status} - {self.wall_time}s>'
+
+    def __repr__(self):
+        return str(self)
+
+
+class OptimizationResult:
+    def __init__(self,
+                 method: str,
+                 weights: Optional[Union[np.ndarray, list[Optional[np.ndarray]]]],
+                 records: list[SolveRecord]):
+        """
+        Weights of an optimization with the SolveRecord of each solve.
+
+        :param method: name of the optimization method
+        :param weights: the weights returned by the method
+        :param records: the SolveRecord of each target, in the order of the targets
+        """
+        self.method = method
+        self.weights = weights
+        self.records = records
+
+    @property
+    def telemetry(self) -> pd.DataFrame:
+        """SolveRecord of each solve as a DataFrame"""
+        return pd.DataFrame([record.to_dict() for record in self.records],
+                            columns=['target', 'solver', 'status', 'setup_time', 'solve_time', 'iterations',
+                                     'objective', 'wall_time', 'error'])
+
+    @property
+    def wall_time(self) -> float:
+        return sum(record.wall_time for record in self.records if record.wall_time is not None)
+
+    @property
+    def attempts(self) -> pd.DataFrame:
+        """SolveRecord of each solver tried for each target (see SolverConfig fallback) as a DataFrame"""
+        rows = []
+        for i, record in enumerate(self.records):
+            for attempt in record.attempts:
+                rows.append({'solve': i, **attempt.to_dict()})
+        return pd.DataFrame(rows, columns=['solve', 'target', 'solver', 'status', 'setup_time', 'solve_time',
+                                           'iterations', 'objective', 'wall_time', 'error'])
+
+    @property
+    def skipped(self) -> int:
+        """Number of targets skipped by the feasibility check (not solved)"""
+        return sum(record.solver == FEASIBILITY_CHECK_SOLVER for record in self.records)
+
+    def __str__(self):
+        return f'OptimizationResult <{self.method} - {len(self.records)} solves - {self.wall_time:.3f}s>'
+
+    def __repr__(self):
+        return str(self)
+
+
+# Worker process and connection running the solver calls of the solvers without time limit option
+_solver_process = None
+
+
+def _solver_worker(connection):
+    """Loop of the solver process: run the solver on the problem data received until the connection is closed"""
+    # Imported before the ready message so that the first solve does not pay the import of the solvers
+    import cvxpy
+    connection.send('ready')
+    while True:
+        try:
+            solver, data, solver_opts = connection.recv()
+        except EOFError:
+            break
+        try:
+            connection.send((True, solver.solve_via_data(data, False, False, solver_opts)))
+        except Exception as e:
+            connection.send((False, f'{type(e).__name__}: {e}'))
+
+
+def _get_solver_process() -> tuple:
+    """The solver process, started (with forkserver or spawn, not by forking this process) when not running"""
+    global _solver_process
+    if _solver_process is None or not _solver_process[0].is_alive():
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        connection, child_connection = context.Pipe()
+        process = context.Process(target=_solver_worker, args=(child_connection,), daemon=True)
+        process.start()
+        child_connection.close()
+        connection.recv()
+        _solver_process = (process, connection)
+    return _solver_process
+
+
+def _kill_solver_process():
+    global _solver_process
+    if _solver_process is not None:
+        process, connection = _solver_process
+        process.kill()
+        process.join()
+        connection.close()
+        _solver_process = None
+
+
+def _solve_with_timeout(problem: cp.Problem, kwargs: dict, target: Optional[float], timeout: float) -> SolveRecord:
+    """
+    Solve the problem with a solver without time limit option, stopped after timeout seconds.
+    The problem is canonicalized in the current process (reusing its compiled state like problem.solve()) and only
+    the solver call runs in the solver process, which is killed when the timeout is reached and started again at
+    the next solve. The problem data are sent to the solver process, so warm_start has no effect.
+    The one-time start of the solver process is not counted in the timeout.
+
+    :return: the SolveRecord of the solve, of status TIME_LIMIT_STATUS when the solver was stopped (the variables
+             are reset)
+    :raise SolverError: when the solver failed
+    """
+    solver = kwargs['solver']
+    solver_opts = {k: v for k, v in kwargs.items() if k not in ['solver', 'warm_start']}
+    process, connection = _get_solver_process()
+    start = time.perf_counter()
+    data, chain, inverse_data = problem.get_problem_data(solver=solver, solver_opts=solver_opts)
+    remaining = timeout - (time.perf_counter() - start)
+    if remaining > 0:
+        connection.send((chain.solver, data, solver_opts))
+        solve_start = time.perf_counter()
+        if connection.poll(remaining):
+            try:
+                success, solution = connection.recv()
+            except EOFError:
+                _kill_solver_process()
+                raise SolverError(f'The process of {solver} exited without solution')
+            if not success:
+                raise SolverError(solution)
+            solve_time = time.perf_counter() - solve_start
+            problem.unpack_results(solution, chain, inverse_data)
+            record = SolveRecord.from_problem(problem=problem, target=target, wall_time=time.perf_counter() - start)
+            if record.solve_time is None:
+                # Solve time in the solver process, including the transfer of the problem data and solution
+                record.solve_time = solve_time
+            return record
+        _kill_solver_process()
+    for variable in problem.variables():
+        variable.save_value(None)
+    return SolveRecord(target=target,
+                       solver=solver,
+                       status=TIME_LIMIT_STATUS,
+                       wall_time=time.perf_counter() - start,
+                       error=f'{solver} stopped after {timeout:.3f}s')
+
+
+def solve_problem(problem: cp.Problem,
+                  solver_config: SolverConfig,
+                  target: Optional[float] = None,
+                  warm_start: bool = False) -> SolveRecord:
+    """
+    Solve the problem with the solvers of the configuration until one of them neither raises a SolverError nor
+    returns one of the retry_statuses, within the target_time_limit budget (see SolverConfig).
+
+    :param problem: the problem
+    :param solver_config: the solver configuration
+    :param target: value of the target parameter, saved in the SolveRecord
+    :param warm_start: True to start the solver from the previous solution of the problem
+    :return: the SolveRecord of the solve with the SolveRecord of each attempt. When no solver succeeded, the
+             first inaccurate solution, or else the last attempt without solution (the variables are reset).
+    :raise SolverError: when all the solvers raised a SolverError
+    """
+    start = time.perf_counter()
+    error = None
+    attempts = []
+    record = None
+    # First attempt with an inaccurate solution and the values of its variables
+    fallback_record, fallback_values = None, None
+    for solver in solver_config.solvers:
+        remaining = None
+        if solver_config.target_time_limit is not None:
+            remaining = solver_config.target_time_limit - (time.perf_counter() - start)
+            if remaining <= 0:
+                logger.debug(f'Time budget of {solver_config.target_time_limit}s spent before {solver}')
+                break
+        kwargs = solver_config.solver_kwargs(solver=solver, time_limit=remaining)
+        if warm_start:
+            kwargs['warm_start'] = True
+        attempt_start = time.perf_counter()
+        try:
+            if remaining is not None and not solver_config.has_time_limit(solver):
+                attempt = _solve_with_timeout(problem=problem, kwargs=kwargs, target=target, timeout=remaining)
+            else:
+                problem.solve(**kwargs)
+                attempt = SolveRecord.from_problem(problem=problem,
+                                                   target=target,
+                                                   wall_time=time.perf_counter() - attempt_start)
+        except SolverError as e:
+            error = f'{solver}: {e}'
+            logger.debug(f'SolverError with {solver}: {e}')
+            attempts.append(SolveRecord(target=target,
+                                        solver=solver,
+                                        status=SOLVER_ERROR_STATUS,
+                                        wall_time=time.perf_counter() - attempt_start,
+                                        error=str(e)))
+            continue
+        attempts.append(attempt)
+        if attempt.status not in solver_config.retry_statuses:
+            record = attempt
+            break
+        error = f'{solver}: {attempt.status}'
+        logger.debug(f'Status {attempt.status} with {solver}')
+        variables = problem.variables()
+        # The variables of a solve stopped by the time budget still hold the solution of the previous solve
+        if (fallback_record is None
+                and attempt.status != TIME_LIMIT_STATUS
+                and all(variable.value is not None for variable in variables)):
+            fallback_record = attempt
+            fallback_values = [(variable, variable.value) for variable in variables]
+
+    if record is None:
+        if len(attempts) != 0 and all(attempt.status == SOLVER_ERROR_STATUS for attempt in attempts):
+            raise SolverError(error)
+        if fallback_record is not None:
+            record = fallback_record
+            for variable, value in fallback_values:
+                variable.save_value(value)
+        else:
+            # Every attempt failed or the time budget was spent: no solution
+            record = attempts[-1] if len(attempts) != 0 else SolveRecord(status=TIME_LIMIT_STATUS)
+            for variable in problem.variables():
+                variable.save_value(None)
+    return SolveRecord(target=target,
+                       solver=record.solver,
+                       status=record.status,
+                       setup_time=record.setup_time,
+                       solve_time=record.solve_time,
+                       iterations=record.iterations,
+                       objective=record.objective,
+                       wall_time=time.perf_counter() - start,
+                       error=error,
+                       attempts=attempts)
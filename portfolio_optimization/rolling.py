@@ -0,0 +1,168 @@
+import logging
+from typing import Optional
+import datetime as dt
+import numpy as np
+
+from portfolio_optimization.assets import *
+
+__all__ = ['ROLLING_TOLERANCE',
+           'RollingStatistics']
+
+logger = logging.getLogger('portfolio_optimization.rolling')
+
+# Maximum deviation of the incremental statistics from a full recompute, relative to the largest absolute value
+ROLLING_TOLERANCE = 1e-10
+
+
+class RollingStatistics:
+    def __init__(self,
+                 assets: Assets,
+                 start: int = 0,
+                 end: Optional[int] = None,
+                 refresh_frequency: Optional[int] = 100):
+        """
+        Mean, covariance and correlation of the assets returns over a rolling window of dates.
+        When the window moves, the dates leaving the window are removed and the dates entering the window are added
+        with rank-k downdates and updates of the cross-product matrix. A move of k dates costs O(k·n²) instead of
+        O(T·n²) for a full recompute over the T dates of the window.
+
+        The sums are accumulated on the returns shifted by the mean of the first window to limit the loss of
+        precision. The statistics match a full recompute (numpy.mean, numpy.cov, numpy.corrcoef) within
+        ROLLING_TOLERANCE relative to their largest absolute value. The sums are recomputed from scratch every
+        refresh_frequency moves to avoid the accumulation of rounding errors.
+
+        The statistics can be given to an Assets of the same window and universe with
+        Assets.custom_expected_returns() and Assets.custom_expected_cov().
+
+        :param assets: Assets containing the full history. The window is defined on assets.returns.
+        :param start: index of the first date of the window in assets.returns
+        :param end: index after the last date of the window in assets.returns. Default is assets.date_nb
+        :param refresh_frequency: number of moves after which the sums are recomputed from scratch.
+                                  None to never recompute.
+        """
+        self.assets = assets
+        self.refresh_frequency = refresh_frequency
+        self._shift = None
+        self._sum = None
+        self._cross = None
+        self._moves = 0
+        self.start = None
+        self.end = None
+        if end is None:
+            end = assets.date_nb
+        self._recompute(start=start, end=end)
+
+    def _validate_window(self, start: int, end: int):
+        if not 0 <= start < end <= self.assets.date_nb:
+            raise ValueError(f'The window should verify 0 <= start < end <= {self.assets.date_nb}, '
+                             f'but received start={start} and end={end}')
+        if end - start < 2:
+            raise ValueError(f'The window should contain at least two dates')
+
+    def _recompute(self, start: int, end: int):
+        self._validate_window(start=start, end=end)
+        returns = self.assets.returns[:, start:end]
+        self._shift = returns.mean(axis=1)
+        x = returns - self._shift[:, np.newaxis]
+        self._sum = x.sum(axis=1)
+        self._cross = x @ x.T
+        self._moves = 0
+        self.start = start
+        self.end = end
+
+    def _update(self, start: int, end: int, sign: int):
+        """Rank-k update (sign=1) or downdate (sign=-1) with the dates from start to end"""
+        if start >= end:
+            return
+        x = self.assets.returns[:, start:end] - self._shift[:, np.newaxis]
+        if sign > 0:
+            self._sum += x.sum(axis=1)
+            self._cross += x @ x.T
+        else:
+            self._sum -= x.sum(axis=1)
+            self._cross -= x @ x.T
+
+    def move(self, start: int, end: int):
+        """
+        Move the window to the dates [start, end) of assets.returns.
+        The statistics are updated incrementally when the new window overlaps the current one and the update is
+        cheaper than a full recompute.
+
+        :param start: index of the first date of the window in assets.returns
+        :param end: index after the last date of the window in assets.returns
+        """
+        self._validate_window(start=start, end=end)
+        overlap = min(end, self.end) - max(start, self.start)
+        changes = (end - start) + (self.end - self.start) - 2 * max(0, overlap)
+        if (overlap <= 0
+                or changes >= end - start
+                or (self.refresh_frequency is not None and self._moves + 1 >= self.refresh_frequency)):
+            self._recompute(start=start, end=end)
+            return
+
+        # Downdate with the dates leaving the window
+        self._update(start=self.start, end=start, sign=-1)
+        self._update(start=end, end=self.end, sign=-1)
+        # Update with the dates entering the window
+        self._update(start=start, end=self.start, sign=1)
+        self._update(start=self.end, end=end, sign=1)
+        self._moves += 1
+        self.start = start
+        self.end = end
+
+    def move_to_dates(self, start_date: dt.date, end_date: dt.date):
+        """
+        Move the window to the returns of the prices from start_date to end_date.
+        It's the same window as the returns of Assets(prices, start_date=start_date, end_date=end_date): the return
+        of the first price date is excluded.
+
+        :param start_date: starting date
+        :param end_date: ending date
+        """
+        dates = self.assets.dates
+        start = np.searchsorted(dates, start_date, side='left')
+        end = np.searchsorted(dates, end_date, side='right') - 1
+        self.move(start=int(start), end=int(end))
+
+    @property
+    def date_nb(self) -> int:
+        return self.end - self.start
+
+    @property
+    def asset_nb(self) -> int:
+        return self.assets.asset_nb
+
+    @property
+    def mu(self) -> np.ndarray:
+        return self._shift + self._sum / self.date_nb
+
+    @property
+    def cov(self) -> np.ndarray:
+        """Sample covariance (same as numpy.cov)"""
+        mean = self._sum / self.date_nb
+        return (self._cross - self.date_nb * np.outer(mean, mean)) / (self.date_nb - 1)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Population standard deviation (same as numpy.std)"""
+        mean = self._sum / self.date_nb
+        return np.sqrt(np.maximum(np.diag(self._cross) / self.date_nb - mean ** 2, 0))
+
+    @property
+    def corr(self) -> np.ndarray:
+        cov = self.cov
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        return np.clip(corr, -1, 1)
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Dates of the returns of the window"""
+        return self.assets.dates[self.start + 1:self.end + 1]
+
+    def __str__(self):
+        return f'RollingStatistics <{self.assets.name} - {self.asset_nb} assets - dates {self.start} to {self.end}>'
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,248 @@
+import logging
+from typing import Optional, Union
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+from portfolio_optimization.assets import *
+
+__all__ = ['PriceStore',
+           'AssetsView']
+
+logger = logging.getLogger('portfolio_optimization.store')
+
+
+class PriceStore(Assets):
+    def __init__(self,
+                 prices: pd.DataFrame,
+                 name: Optional[str] = 'store',
+                 start_date: Optional[dt.date] = None,
+                 end_date: Optional[dt.date] = None,
+                 asset_missing_threshold: Optional[float] = None,
+                 dates_missing_threshold: Optional[float] = None,
+                 names_to_keep: Optional[list[str]] = None,
+                 verbose: bool = True):
+        """
+        Master store of the full price history.
+        The prices are cleaned once and the returns are stored in one contiguous array of shape
+        (Number of Assets, Number of Dates). Assets of sub-periods and sub-universes are built as views on that
+        array with view() without copying the prices.
+
+        :param prices: DataFrame of asset prices. Index has to be DateTime and columns names are the assets names
+        :param start_date: starting date
+        :param end_date: ending date
+        :param asset_missing_threshold: remove Dates with more than asset_missing_threshold percent assets missing
+        :param dates_missing_threshold: remove Assets with more than dates_missing_threshold percent dates missing
+        :param names_to_keep: asset names to keep in the prices DataFrame
+        :param name: name of the PriceStore class
+        :param verbose: True to print logging info
+        """
+        self._dates = None
+        self._names = None
+        super().__init__(prices=prices,
+                         name=name,
+                         start_date=start_date,
+                         end_date=end_date,
+                         asset_missing_threshold=asset_missing_threshold,
+                         dates_missing_threshold=dates_missing_threshold,
+                         names_to_keep=names_to_keep,
+                         verbose=verbose)
+
+    @property
+    def returns(self) -> np.ndarray:
+        """
+        Simple returns of shape (assets, dates) stored in a C-contiguous array so that the returns of one asset
+        over a period are contiguous in memory
+        """
+        if self._returns is None:
+            self._returns = np.ascontiguousarray(self.prices.pct_change()[1:].to_numpy().T)
+        return self._returns
+
+    @property
+    def dates(self) -> np.array:
+        if self._dates is None:
+            self._dates = np.array([date.date() for date in self.prices.index])
+        return self._dates
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = np.array(self.prices.columns)
+        return self._names
+
+    def date_slice(self,
+                   start_date: Optional[dt.date] = None,
+                   end_date: Optional[dt.date] = None) -> slice:
+        """
+        Slice of the returns of the prices from start_date to end_date.
+        Like in Assets, the return of the first price date is excluded.
+        """
+        if start_date is None:
+            start = 0
+        else:
+            start = int(np.searchsorted(self.dates, start_date, side='left'))
+        if end_date is None:
+            end = self.date_nb
+        else:
+            end = int(np.searchsorted(self.dates, end_date, side='right')) - 1
+        if end - start < 1:
+            raise ValueError(f'prices cannot be empty')
+        return slice(start, end)
+
+    def names_index(self, names: Union[list[str], np.ndarray]) -> np.ndarray:
+        """
+        Indices of the asset names in the store
+        """
+        index = self.prices.columns.get_indexer(names)
+        if np.any(index < 0):
+            raise KeyError(f'{list(np.asarray(names)[index < 0])} not in the PriceStore')
+        return index
+
+    def view(self,
+             name: Optional[str] = 'assets',
+             start_date: Optional[dt.date] = None,
+             end_date: Optional[dt.date] = None,
+             correlation_threshold: Optional[float] = None,
+             names_to_keep: Optional[list[str]] = None,
+             random_selection: Optional[int] = None,
+             verbose: bool = True) -> 'AssetsView':
+        """
+        Assets from start_date to end_date as a view on the store returns.
+
+        :param name: name of the Assets class
+        :param start_date: starting date
+        :param end_date: ending date
+        :param correlation_threshold: when two assets have a correlation above this threshold,
+                                      we keep the asset with higher returns.
+        :param names_to_keep: asset names to keep
+        :param random_selection: number of assets to randomly keep
+        :param verbose: True to print logging info
+        """
+        if names_to_keep is None:
+            assets_index = np.arange(self.asset_nb)
+        else:
+            assets_index = self.names_index(names=names_to_keep)
+
+        if random_selection is not None:
+            assets_index = assets_index[np.random.choice(len(assets_index), random_selection, replace=False)]
+
+        return AssetsView(store=self,
+                          date_slice=self.date_slice(start_date=start_date, end_date=end_date),
+                          assets_index=assets_index,
+                          name=name,
+                          start_date=start_date,
+                          end_date=end_date,
+                          correlation_threshold=correlation_threshold,
+                          verbose=verbose)
+
+    def __str__(self):
+        return f'PriceStore <{self.name}  - {self.asset_nb} assets - {self.date_nb} dates>'
+
+
+class AssetsView(Assets):
+    def __init__(self,
+                 store: PriceStore,
+                 date_slice: slice,
+                 assets_index: np.ndarray,
+                 name: Optional[str] = 'assets',
+                 start_date: Optional[dt.date] = None,
+                 end_date: Optional[dt.date] = None,
+                 correlation_threshold: Optional[float] = None,
+                 verbose: bool = True):
+        """
+        Assets built as a view on the returns of a PriceStore: a slice of dates and an index of assets.
+        The prices are not copied. The returns are a view on the store array when the assets index is a contiguous
+        range, otherwise only the selected block is gathered. The statistics (mu, cov, corr...) are computed on
+        demand from the view and cached like in Assets.
+
+        :param store: the PriceStore containing the full history
+        :param date_slice: slice of the store returns
+        :param assets_index: indices of the assets in the store
+        :param name: name of the Assets class
+        :param start_date: starting date
+        :param end_date: ending date
+        :param correlation_threshold: when two assets have a correlation above this threshold,
+                                      we keep the asset with higher returns.
+        :param verbose: True to print logging info
+        """
+        self._returns = None
+        self._cumulative_returns = None
+        self._mu = None
+        self._std = None
+        self._cov = None
+        self._corr = None
+        self._custom_expected_returns = None
+        self._custom_expected_cov = None
+        self._expected_cov_cholesky = None
+        self._expected_cov_eigen = None
+        self._expected_cov_pinv = None
+
+        self.store = store
+        self.date_slice = date_slice
+        self.assets_index = np.asarray(assets_index, dtype=int)
+        self.verbose = verbose
+        self.name = name
+        self.start_date = start_date
+        self.end_date = end_date
+
+        if len(self.assets_index) == 0:
+            raise ValueError(f'prices cannot be empty')
+
+        self._info(f'Loading Assets view from {start_date} to {end_date}')
+        self._remove_highly_correlated_assets(correlation_threshold=correlation_threshold)
+
+    @property
+    def prices(self) -> pd.DataFrame:
+        """
+        Prices of the view. This is a copy of the store prices and should only be used for display.
+        """
+        return self.store.prices.iloc[self.date_slice.start:self.date_slice.stop + 1, self.assets_index]
+
+    def _assets_range(self) -> Optional[slice]:
+        """Slice equivalent to the assets index when it is a contiguous range"""
+        start = self.assets_index[0]
+        if np.array_equal(self.assets_index, np.arange(start, start + len(self.assets_index))):
+            return slice(start, start + len(self.assets_index))
+        return None
+
+    @property
+    def returns(self) -> np.ndarray:
+        if self._returns is None:
+            assets_range = self._assets_range()
+            if assets_range is not None:
+                self._returns = self.store.returns[assets_range, self.date_slice]
+            else:
+                self._returns = self.store.returns[self.assets_index, self.date_slice]
+        return self._returns
+
+    @property
+    def cumulative_returns(self) -> pd.DataFrame:
+        if self._cumulative_returns is None:
+            index = self.store.prices.index[self.date_slice.start + 1:self.date_slice.stop + 1]
+            self._cumulative_returns = pd.DataFrame((self.returns.T + 1).cumprod(axis=0),
+                                                    index=index,
+                                                    columns=self.names)
+        return self._cumulative_returns
+
+    @property
+    def dates(self) -> np.array:
+        return self.store.dates[self.date_slice.start:self.date_slice.stop + 1]
+
+    @property
+    def asset_nb(self):
+        return len(self.assets_index)
+
+    @property
+    def date_nb(self):
+        return self.date_slice.stop - self.date_slice.start
+
+    @property
+    def names(self):
+        return self.store.names[self.assets_index]
+
+    def remove_assets(self, assets_to_remove: list[str]):
+        self.assets_index = self.assets_index[~np.isin(self.names, assets_to_remove)]
+        self.reset()
+
+    def __str__(self):
+        return f'AssetsView <{self.name}  - {self.asset_nb} assets - {self.date_nb} dates>'
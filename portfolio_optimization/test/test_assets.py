@@ -89,3 +89,101 @@ def test_load_train_test_assets():
     assert set(train_assets.names) == set(test_assets.names)
     assert (train_assets.start_date, train_assets.end_date) == train_period
     assert (test_assets.start_date, test_assets.end_date) == test_period
+
+
+def test_remove_highly_correlated_assets():
+    prices = load_prices(file=TEST_PRICES_PATH)
+
+    correlation_threshold = 0.5
+    assets = Assets(prices=prices,
+                    start_date=dt.date(2017, 1, 1),
+                    verbose=False)
+
+    # Reference: greedy double loop over all asset pairs
+    to_remove = set()
+    for i in range(assets.asset_nb - 1):
+        for j in range(i + 1, assets.asset_nb):
+            if assets.corr[i, j] > correlation_threshold:
+                if i not in to_remove and j not in to_remove:
+                    if assets.mu[i] < assets.mu[j]:
+                        to_remove.add(i)
+                    else:
+                        to_remove.add(j)
+    names = [name for i, name in enumerate(assets.names) if i not in to_remove]
+
+    for block_size in [None, 1, 7]:
+        pruned_assets = Assets(prices=prices,
+                               start_date=dt.date(2017, 1, 1),
+                               verbose=False)
+        pruned_assets._remove_highly_correlated_assets(correlation_threshold=correlation_threshold,
+                                                       block_size=block_size)
+        assert np.array_equal(pruned_assets.names, names)
+
+
+def test_load_train_test_assets_single_pass():
+    prices = load_prices(file=TEST_PRICES_PATH)
+
+    train_period = (dt.date(2018, 1, 1), dt.date(2019, 1, 1))
+    test_period = (dt.date(2019, 1, 1), dt.date(2020, 1, 1))
+
+    train_assets, test_assets = load_train_test_assets(prices=prices,
+                                                       train_period=train_period,
+                                                       test_period=test_period,
+                                                       removal_correlation=0.99,
+                                                       pre_selection_number=10,
+                                                       pre_selection_correlation=0,
+                                                       single_pass=True,
+                                                       verbose=False)
+
+    assert np.array_equal(train_assets.names, test_assets.names)
+    assert (train_assets.start_date, train_assets.end_date) == train_period
+    assert (test_assets.start_date, test_assets.end_date) == test_period
+    assert train_assets.dates[-1] <= test_assets.dates[0]
+
+    ref_train_assets, ref_test_assets = load_train_test_assets(prices=prices,
+                                                               train_period=train_period,
+                                                               test_period=test_period,
+                                                               removal_correlation=0.99,
+                                                               pre_selection_number=10,
+                                                               pre_selection_correlation=0,
+                                                               verbose=False)
+    for assets, ref_assets in [(train_assets, ref_train_assets), (test_assets, ref_test_assets)]:
+        assert assets.date_nb == ref_assets.date_nb
+        assert np.array_equal(assets.names, ref_assets.names)
+        assert np.allclose(assets.expected_returns, ref_assets.expected_returns)
+        assert np.allclose(assets.expected_cov, ref_assets.expected_cov)
+
+
+def test_expected_cov_factorizations():
+    prices = load_prices(file=TEST_PRICES_PATH).iloc[:, :30]
+    assets = Assets(prices=prices,
+                    start_date=dt.date(2017, 1, 1),
+                    asset_missing_threshold=0.1,
+                    dates_missing_threshold=0.1,
+                    verbose=False)
+
+    cholesky = assets.expected_cov_cholesky
+    assert np.allclose(cholesky @ cholesky.T, assets.cov)
+    assert np.allclose(cholesky, np.tril(cholesky))
+    eigenvalues, eigenvectors = assets.expected_cov_eigen
+    assert np.allclose((eigenvectors * eigenvalues) @ eigenvectors.T, assets.cov)
+    assert np.allclose(assets.expected_cov_pinv, np.linalg.pinv(assets.cov))
+    # The factorizations are cached
+    assert assets.expected_cov_cholesky is cholesky
+    assert assets.expected_cov_eigen[0] is eigenvalues
+
+    # Custom expected covariance that is not positive definite: the Cholesky factor is repaired
+    expected_cov = assets.cov.copy()
+    expected_cov[0, 1] = expected_cov[1, 0] = 2 * np.sqrt(expected_cov[0, 0] * expected_cov[1, 1])
+    assets.custom_expected_cov(expected_cov=expected_cov)
+    assert assets.expected_cov_eigen[0] is not eigenvalues
+    assert assets.expected_cov_eigen[0][0] < 0
+    cholesky = assets.expected_cov_cholesky
+    assert np.allclose(cholesky, np.tril(cholesky))
+    assert np.all(np.linalg.eigvalsh(cholesky @ cholesky.T) > 0)
+    assert np.allclose(assets.expected_cov_pinv, np.linalg.pinv(expected_cov))
+
+    # Removing assets invalidates the factorizations
+    assets.remove_assets(assets_to_remove=list(assets.names[:5]))
+    assert assets.expected_cov_cholesky.shape == (assets.asset_nb, assets.asset_nb)
+    assert np.allclose(assets.expected_cov_pinv, np.linalg.pinv(assets.cov))
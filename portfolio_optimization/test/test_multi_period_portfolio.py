@@ -8,6 +8,8 @@ from portfolio_optimization.assets import *
 from portfolio_optimization.portfolio import *
 from portfolio_optimization.paths import *
 from portfolio_optimization.bloomberg import *
+from portfolio_optimization.optimization import *
+from portfolio_optimization.backtest import *
 
 
 def test_multi_period_portfolio():
@@ -65,3 +67,25 @@ def test_multi_period_portfolio():
     assert mpp.composition
     assert mpp.plot_composition(show=False)
 
+
+def inverse_volatility_optimizer(assets: Assets) -> np.ndarray:
+    return Optimization(assets=assets).inverse_volatility()
+
+
+def test_walk_forward_backtest():
+    prices = load_prices(file=TEST_PRICES_PATH)
+    kwargs = dict(prices=prices,
+                  optimizer=inverse_volatility_optimizer,
+                  start_date=dt.date(2018, 1, 1),
+                  end_date=dt.date(2019, 6, 1),
+                  train_duration=200,
+                  test_duration=60)
+
+    mpp, report = walk_forward_backtest(n_jobs=1, **kwargs)
+    parallel_mpp, parallel_report = walk_forward_backtest(n_jobs=2, **kwargs)
+
+    assert len(report) == len(mpp.portfolios) > 1
+    assert np.all(report['status'] == 'ok')
+    assert np.all(report['test_start'].to_numpy()[1:] == report['test_end'].to_numpy()[:-1])
+    assert np.array_equal(mpp.returns, parallel_mpp.returns)
+    assert np.array_equal(mpp.dates, parallel_mpp.dates)
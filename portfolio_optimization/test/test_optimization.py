@@ -1,13 +1,22 @@
+import time
 import numpy as np
+import cvxpy as cp
+import pytest
 
 from portfolio_optimization.meta import *
 from portfolio_optimization.paths import *
 from portfolio_optimization.portfolio import *
 from portfolio_optimization.population import *
 from portfolio_optimization.optimization import *
+from portfolio_optimization.optimization.frontier import *
+from portfolio_optimization.optimization.problem_cache import *
+from portfolio_optimization.optimization.result_cache import *
+from portfolio_optimization.optimization.solver import *
 from portfolio_optimization.loader import *
 from portfolio_optimization.bloomberg import *
 from portfolio_optimization.assets import *
+from portfolio_optimization.utils.linalg import *
+from portfolio_optimization.utils.tools import *
 
 PARAMS = [{'method_name': 'mean_variance',
            'target_name': 'target_volatility',
@@ -653,3 +662,791 @@ def test_optimization_args():
             raise
         except ValueError:
             pass
+
+
+def test_problem_cache():
+    assets = get_assets()
+    problem_cache = ProblemCache()
+    for param in PARAMS:
+        method_name = param['method_name']
+        target_name = param['target_name']
+        target = param['target']
+        for costs, prev_w in [(None, None), (0.1, np.ones(assets.asset_nb) / assets.asset_nb)]:
+            model = Optimization(assets=assets,
+                                 investment_type=InvestmentType.FULLY_INVESTED,
+                                 weight_bounds=(0, None),
+                                 costs=costs,
+                                 investment_duration_in_days=255,
+                                 prev_w=prev_w)
+            cached_model = Optimization(assets=assets,
+                                        investment_type=InvestmentType.FULLY_INVESTED,
+                                        weight_bounds=(0, None),
+                                        costs=costs,
+                                        investment_duration_in_days=255,
+                                        prev_w=prev_w,
+                                        problem_cache=problem_cache)
+            weights = getattr(model, method_name)(**{target_name: target})
+            cached_weights = getattr(cached_model, method_name)(**{target_name: target})
+            assert abs(weights - cached_weights).sum() < 1e-2
+            # The second call reuses the compiled problem
+            misses = problem_cache.misses
+            cached_weights = getattr(cached_model, method_name)(**{target_name: target})
+            assert abs(weights - cached_weights).sum() < 1e-2
+            assert problem_cache.misses == misses
+
+    # The returns matrix of the scenario based problems is too large to be cached
+    assert problem_cache.skipped == 2 * 2 * 3
+    assert problem_cache.skipped_methods == {'mean_semivariance': 4, 'mean_cvar': 4, 'mean_cdar': 4}
+    assert len(problem_cache) == 2
+
+    # New data with the same structure reuses the compiled problem
+    hits = problem_cache.hits
+    assets.custom_expected_returns(expected_returns=assets.mu * 1.1)
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         problem_cache=problem_cache)
+    model.mean_variance(target_volatility=0.02 / np.sqrt(255))
+    assert problem_cache.hits == hits + 1
+
+    timings = problem_cache.timings
+    assert len(timings) > 0
+    assert np.all(timings['canonicalization_time'] >= 0)
+    assert timings[~timings['first_solve']]['canonicalization_time'].mean() < \
+           timings[timings['first_solve']]['canonicalization_time'].mean()
+
+    # Caching the large problems is opt-in per method
+    prices = load_prices(file=EXAMPLE_PRICES_PATH)
+    assets = load_assets(prices=prices.iloc[:, :30].copy(), verbose=False)
+    problem_cache = ProblemCache(max_parameter_size={'mean_cvar': None})
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         problem_cache=problem_cache)
+    assert problem_cache.parameter_size_limit('mean_cvar_min_risk') is None
+    assert problem_cache.parameter_size_limit('mean_cdar') == MAX_PARAMETER_SIZE
+    weights = model.mean_cvar(target_cvar=0.02)
+    assert abs(model.mean_cvar(target_cvar=0.02) - weights).sum() < 1e-6
+    assert problem_cache.skipped == 0
+    assert problem_cache.hits == 1 and len(problem_cache) == 1
+    model.mean_cdar(target_cdar=0.1)
+    assert problem_cache.skipped_methods == {'mean_cdar': 1}
+
+
+def test_warm_start():
+    assets = get_assets()
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None))
+    warm_model = Optimization(assets=assets,
+                              investment_type=InvestmentType.FULLY_INVESTED,
+                              weight_bounds=(0, None),
+                              warm_start=True)
+    # Unordered targets: the weights are returned in the order of the targets
+    target_volatility = np.array([0.2, 0.05, 0.1, 0.15]) / np.sqrt(255)
+    weights = model.mean_variance(target_volatility=target_volatility)
+    warm_weights = warm_model.mean_variance(target_volatility=target_volatility)
+    assert len(warm_weights) == len(target_volatility)
+    for w, warm_w, target in zip(weights, warm_weights, target_volatility):
+        assert abs(np.sqrt(warm_w @ assets.expected_cov @ warm_w) - target) < 1e-3 * target
+        assert abs(assets.expected_returns @ (w - warm_w)) < 1e-2 * abs(assets.expected_returns @ w)
+
+
+def test_parallel_frontier():
+    assets = get_assets()
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None))
+    parallel_model = Optimization(assets=assets,
+                                  investment_type=InvestmentType.FULLY_INVESTED,
+                                  weight_bounds=(0, None),
+                                  n_jobs=2)
+    # The first target is below the minimum volatility and fails
+    target_volatility = np.array([0.2, 0.001, 0.05, 0.1, 0.15]) / np.sqrt(255)
+    for ignore_none in [True, False]:
+        weights = model.mean_variance(target_volatility=target_volatility, ignore_none=ignore_none)
+        parallel_weights = parallel_model.mean_variance(target_volatility=target_volatility, ignore_none=ignore_none)
+        assert len(parallel_weights) == len(weights)
+        for w, parallel_w in zip(weights, parallel_weights):
+            if w is None:
+                assert parallel_w is None
+            else:
+                assert abs(w - parallel_w).sum() < 1e-6
+
+
+def test_solver_config():
+    assets = get_assets()
+    target_volatility = np.array([0.05, 0.1]) / np.sqrt(255)
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None))
+    weights = model.mean_variance(target_volatility=target_volatility)
+    result = model.result
+    assert result.method == 'mean_variance'
+    assert len(result.records) == len(target_volatility)
+    telemetry = result.telemetry
+    assert np.all(telemetry['solver'] == 'ECOS')
+    assert np.all(telemetry['status'] == 'optimal')
+    assert np.all(telemetry['iterations'] > 0)
+    assert np.allclose(telemetry['target'], target_volatility ** 2)
+    for w, objective in zip(weights, telemetry['objective']):
+        assert abs(assets.expected_returns @ w - objective) < 1e-8
+
+    # OSQP cannot solve the second-order cone of the variance constraint: the fallback solver is used
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         solver_config=SolverConfig(solver='OSQP', fallback=['CLARABEL'], tolerance=1e-9))
+    fallback_weights = model.mean_variance(target_volatility=target_volatility)
+    telemetry = model.result.telemetry
+    assert np.all(telemetry['solver'] == 'CLARABEL')
+    assert telemetry['error'].str.startswith('OSQP').all()
+    for w, fallback_w in zip(weights, fallback_weights):
+        assert abs(w - fallback_w).sum() < 1e-3
+
+    # maximum_sharpe is a quadratic program solved by OSQP
+    weights = model.maximum_sharpe()
+    assert model.result.method == 'maximum_sharpe'
+    assert model.result.records[0].solver == 'OSQP'
+    assert abs(weights.sum() - 1) < 1e-6
+
+    try:
+        SolverConfig(solver='UNKNOWN')
+        raise
+    except ValueError:
+        pass
+
+
+def test_solver_time_limit():
+    assets = get_assets()
+    target_volatility = np.array([0.05, 0.1]) / np.sqrt(255)
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         problem_cache=ProblemCache())
+    weights = model.mean_variance(target_volatility=target_volatility)
+
+    # A generous budget does not change the solution
+    problem_cache = ProblemCache()
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         problem_cache=problem_cache,
+                         solver_config=SolverConfig(fallback=['SCS', 'CLARABEL'], target_time_limit=60))
+    budget_weights = model.mean_variance(target_volatility=target_volatility)
+    assert np.all(model.result.telemetry['solver'] == 'ECOS')
+    assert model.result.telemetry['solve_time'].notna().all()
+    assert len(model.result.attempts) == len(target_volatility)
+    for w, budget_w in zip(weights, budget_weights):
+        assert abs(w - budget_w).sum() < 1e-8
+    # ECOS runs in the solver process but the problem is compiled once in the current process
+    timings = problem_cache.timings
+    canonicalization_times = timings[timings['method'] == 'mean_variance']['canonicalization_time'].to_numpy()
+    assert canonicalization_times[1] < canonicalization_times[0] / 2
+    misses = problem_cache.misses
+    assert model.mean_variance(target_volatility=target_volatility, ignore_none=False)[0] is not None
+    assert problem_cache.misses == misses
+
+    # The budget is spent before ECOS (run in a killed process) ends: the targets are abandoned
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         solver_config=SolverConfig(fallback=['CLARABEL'], target_time_limit=1e-3))
+    start = time.perf_counter()
+    weights = model.mean_variance(target_volatility=target_volatility, ignore_none=False)
+    assert time.perf_counter() - start < 10
+    assert all(w is None for w in weights)
+    assert np.all(model.result.telemetry['status'] == TIME_LIMIT_STATUS)
+    attempts = model.result.attempts
+    assert len(attempts) >= len(target_volatility)
+    assert np.all(attempts['status'] == TIME_LIMIT_STATUS)
+
+    # A target stopped by the budget does not return the solution of the previous target
+    w = cp.Variable(assets.asset_nb)
+    target = cp.Parameter(nonneg=True)
+    problem = cp.Problem(cp.Maximize(assets.expected_returns @ w),
+                         [cp.quad_form(w, assets.expected_cov) <= target, cp.sum(w) == 1, w >= 0])
+    target.value = target_volatility[0] ** 2
+    record = solve_problem(problem=problem, solver_config=SolverConfig(), target=target.value)
+    assert record.status == 'optimal'
+    assert w.value is not None
+    target.value = target_volatility[1] ** 2
+    record = solve_problem(problem=problem,
+                           solver_config=SolverConfig(target_time_limit=1e-4),
+                           target=target.value)
+    assert record.status == TIME_LIMIT_STATUS
+    assert [attempt.status for attempt in record.attempts] == [TIME_LIMIT_STATUS]
+    assert w.value is None
+
+    # SCS stops at its iteration limit: the target is solved again by CLARABEL
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         solver_config=SolverConfig(solver='SCS',
+                                                    fallback=['CLARABEL'],
+                                                    solver_params={'max_iters': 5}))
+    retry_weights = model.mean_variance(target_volatility=target_volatility)
+    assert np.all(model.result.telemetry['solver'] == 'CLARABEL')
+    assert np.all(model.result.telemetry['status'] == 'optimal')
+    attempts = model.result.attempts
+    assert list(attempts['solver']) == ['SCS', 'CLARABEL'] * len(target_volatility)
+    assert np.all(attempts[attempts['solver'] == 'SCS']['status'].isin(RETRY_STATUSES))
+    for w, retry_w in zip(budget_weights, retry_weights):
+        assert abs(w - retry_w).sum() < 1e-3
+
+    try:
+        SolverConfig(target_time_limit=0)
+        raise
+    except ValueError:
+        pass
+
+
+def test_analytical_frontier():
+    assets = get_assets()
+    target_volatility = np.array([0.05, 0.1, 0.2]) / np.sqrt(255)
+    for investment_type in [InvestmentType.FULLY_INVESTED, InvestmentType.MARKET_NEUTRAL]:
+        # Bounds that are not binding: the whole frontier is computed in closed form
+        model = Optimization(assets=assets,
+                             investment_type=investment_type,
+                             weight_bounds=(-100, 100))
+        weights = model.mean_variance(target_volatility=target_volatility)
+        assert np.all(model.result.telemetry['solver'] == 'ANALYTICAL')
+        solver_weights = model.mean_variance(target_volatility=target_volatility, analytical=False)
+        assert np.all(model.result.telemetry['solver'] == 'ECOS')
+        for w, solver_w, target in zip(weights, solver_weights, target_volatility):
+            assert abs(np.sqrt(w @ assets.expected_cov @ w) - target) < 1e-8
+            assert abs(assets.expected_returns @ (w - solver_w)) < 1e-4 * abs(assets.expected_returns @ w)
+
+    # Binding bounds: the targets are solved by the solver
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None))
+    model.mean_variance(target_volatility=target_volatility)
+    assert np.all(model.result.telemetry['solver'] == 'ECOS')
+
+    # Costs: the closed-form frontier does not apply
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(-100, 100),
+                         costs=0.01,
+                         investment_duration_in_days=255)
+    model.mean_variance(target_volatility=target_volatility)
+    assert np.all(model.result.telemetry['solver'] == 'ECOS')
+
+
+def test_mean_variance_cla():
+    assets = get_assets()
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None))
+    target_volatility = np.array([0.05, 0.1, 0.2]) / np.sqrt(255)
+    weights = model.mean_variance(target_volatility=target_volatility)
+    cla_weights = model.mean_variance_cla(target_volatility=target_volatility)
+    assert np.all(model.result.telemetry['solver'] == 'CLA')
+    for w, cla_w, target in zip(weights, cla_weights, target_volatility):
+        assert abs(cla_w.sum() - 1) < 1e-8
+        assert np.all(cla_w >= -1e-8)
+        assert abs(np.sqrt(cla_w @ assets.expected_cov @ cla_w) - target) < 1e-8
+        assert assets.expected_returns @ cla_w > assets.expected_returns @ w - 1e-4 * abs(assets.expected_returns @ w)
+
+    # Corner portfolios by decreasing returns down to the minimum variance portfolio
+    corner_weights = model.mean_variance_cla()
+    assert len(corner_weights) > 2
+    returns = np.array([assets.expected_returns @ w for w in corner_weights])
+    assert np.all(np.diff(returns) <= 1e-12)
+    min_volatility = np.sqrt(corner_weights[-1] @ assets.expected_cov @ corner_weights[-1])
+    assert len(model.mean_variance_cla(target_volatility=[min_volatility * 0.9], ignore_none=False)) == 1
+
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.MARKET_NEUTRAL,
+                         weight_bounds=(-1, 1))
+    try:
+        model.mean_variance_cla(population_size=10)
+        raise
+    except ValueError:
+        pass
+
+
+def test_covariance_model():
+    assets = get_assets()
+    target_volatility = np.array([0.05, 0.1]) / np.sqrt(255)
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None))
+    weights = model.mean_variance(target_volatility=target_volatility)
+    sharpe_weights = model.maximum_sharpe()
+
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         covariance_model='cholesky')
+    cholesky_weights = model.mean_variance(target_volatility=target_volatility)
+    for w, cholesky_w in zip(weights, cholesky_weights):
+        assert abs(w - cholesky_w).sum() < 1e-3
+    assert abs(sharpe_weights - model.maximum_sharpe()).sum() < 1e-3
+
+    # The variance of the factor model tends to the variance of the covariance with the number of factors
+    rank = assets.asset_nb // 2
+    loadings, specific_std = factor_model(assets.expected_cov, rank=rank)
+    assert loadings.shape == (assets.asset_nb, rank)
+    assert np.allclose(np.sum(loadings ** 2, axis=1) + specific_std ** 2, np.diag(assets.expected_cov))
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         covariance_model=rank)
+    factor_weights = model.mean_variance(target_volatility=target_volatility)
+    for w, factor_w, target in zip(weights, factor_weights, target_volatility):
+        factor_variance = np.sum((loadings.T @ factor_w) ** 2) + np.sum((specific_std * factor_w) ** 2)
+        assert abs(np.sqrt(factor_variance) - target) < 1e-4 * target
+        assert abs(np.sqrt(factor_w @ assets.expected_cov @ factor_w) - target) < 0.1 * target
+    model.maximum_sharpe()
+
+    for covariance_model in ['eigen', 0, assets.asset_nb + 1]:
+        try:
+            Optimization(assets=assets, covariance_model=covariance_model)
+            raise
+        except ValueError:
+            pass
+
+
+def test_linear_program_engine():
+    assets = get_assets()
+    for method_name, target_name, target in [('mean_cvar', 'target_cvar', [0.01, 0.02]),
+                                             ('mean_cdar', 'target_cdar', [0.05, 0.1])]:
+        for costs in [None, 0.1]:
+            model = Optimization(assets=assets,
+                                 investment_type=InvestmentType.FULLY_INVESTED,
+                                 weight_bounds=(0, None),
+                                 costs=costs,
+                                 investment_duration_in_days=255,
+                                 prev_w=np.ones(assets.asset_nb) / assets.asset_nb)
+            func = getattr(model, method_name)
+            weights = func(**{target_name: target})
+            highs_weights = func(**{target_name: target}, engine='highs')
+            assert np.all(model.result.telemetry['solver'] == 'HIGHS')
+            assert np.all(model.result.telemetry['status'] == 'optimal')
+            for w, highs_w in zip(weights, highs_weights):
+                assert abs(w - highs_w).sum() < 1e-4
+            # Infeasible target
+            assert func(**{target_name: [1e-6]}, engine='highs') == []
+
+    try:
+        model.mean_cvar(target_cvar=0.01, engine='unknown')
+        raise
+    except ValueError:
+        pass
+
+
+def test_cutting_plane_cvar():
+    assets = get_assets()
+    target_cvar = [0.01, 0.02, 0.03]
+    for investment_type, weight_bounds in [(InvestmentType.FULLY_INVESTED, (0, None)),
+                                           (InvestmentType.FULLY_INVESTED, (-0.2, 0.2)),
+                                           (InvestmentType.MARKET_NEUTRAL, (-0.2, 0.2)),
+                                           (InvestmentType.FULLY_INVESTED, (None, None))]:
+        for costs in [None, 0.1]:
+            model = Optimization(assets=assets,
+                                 investment_type=investment_type,
+                                 weight_bounds=weight_bounds,
+                                 costs=costs,
+                                 investment_duration_in_days=255,
+                                 prev_w=np.ones(assets.asset_nb) / assets.asset_nb)
+            weights = model.mean_cvar(target_cvar=target_cvar, engine='highs')
+            cutting_plane_weights = model.mean_cvar(target_cvar=target_cvar, engine='cutting_plane')
+            telemetry = model.result.telemetry
+            assert np.all(telemetry['solver'] == 'CUTTING_PLANE')
+            assert np.all(telemetry['status'] == 'optimal')
+            assert np.all(telemetry['iterations'] < 20)
+            for w, cutting_plane_w in zip(weights, cutting_plane_weights):
+                assert abs(assets.expected_returns @ (w - cutting_plane_w)) < 1e-8
+    assert len(model.mean_cvar(population_size=3, engine='cutting_plane')) == 3
+
+    # The master LP only holds the scenarios that reached the tail of its solutions
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(-0.2, 0.2))
+    cutting_plane = CvarCuttingPlane(values=model._problem_values(),
+                                     returns=assets.returns,
+                                     beta=0.95,
+                                     investment_target=1)
+    min_risk_weights, record = cutting_plane.min_risk()
+    _, min_risk_record = cvar_linear_program(values=model._problem_values(),
+                                             returns=assets.returns,
+                                             beta=0.95,
+                                             investment_target=1).min_risk()
+    assert record.status == 'optimal'
+    assert abs(record.objective - min_risk_record.objective) < 1e-10
+    assert cutting_plane.active_nb < assets.date_nb / 2
+    assert cutting_plane.linear_program.shape[0] < assets.date_nb / 2
+
+
+def test_first_order_mean_variance():
+    assets = get_assets()
+    target_volatility = np.array([0.15, 0.2, 0.25]) / np.sqrt(AVG_TRADING_DAYS_PER_YEAR)
+    for investment_type, weight_bounds in [(InvestmentType.FULLY_INVESTED, (0, None)),
+                                           (InvestmentType.MARKET_NEUTRAL, (-0.2, 0.2)),
+                                           (InvestmentType.UNCONSTRAINED, (-0.2, 0.2))]:
+        for costs, l1_coef, l2_coef in [(None, None, None), (0.1, None, None), (None, 0.001, 0.001)]:
+            model = Optimization(assets=assets,
+                                 investment_type=investment_type,
+                                 weight_bounds=weight_bounds,
+                                 costs=costs,
+                                 investment_duration_in_days=255,
+                                 prev_w=np.ones(assets.asset_nb) / assets.asset_nb,
+                                 solver_config=SolverConfig(solver='CLARABEL', tolerance=1e-10))
+            weights = model.mean_variance(target_volatility=target_volatility, l1_coef=l1_coef, l2_coef=l2_coef,
+                                          analytical=False)
+            objectives = model.result.telemetry['objective']
+            first_order_weights = model.mean_variance(target_volatility=target_volatility, l1_coef=l1_coef,
+                                                      l2_coef=l2_coef, analytical=False, engine='first_order')
+            telemetry = model.result.telemetry
+            assert np.all(telemetry['solver'] == 'ADMM')
+            assert np.all(telemetry['status'] == 'optimal')
+            lower_bounds, upper_bounds = model._get_lower_and_upper_bounds()
+            for w, first_order_w, volatility in zip(weights, first_order_weights, target_volatility):
+                assert np.all(first_order_w >= lower_bounds) and np.all(first_order_w <= upper_bounds)
+                assert first_order_w @ assets.expected_cov @ first_order_w / volatility ** 2 - 1 < 1e-6
+                assert abs(w - first_order_w).max() < 1e-3
+            assert np.all(np.abs(telemetry['objective'] - objectives) < 1e-8)
+            if investment_type == InvestmentType.FULLY_INVESTED:
+                assert all(abs(w.sum() - 1) < 1e-10 for w in first_order_weights)
+
+    # Infeasible target
+    model = Optimization(assets=assets, investment_type=InvestmentType.FULLY_INVESTED, weight_bounds=(0, 0.1))
+    assert model.mean_variance(target_volatility=[0.01 / np.sqrt(AVG_TRADING_DAYS_PER_YEAR)],
+                               analytical=False, engine='first_order') == []
+    assert model.result.records[0].status == 'infeasible'
+
+
+def test_proximal_box_budget():
+    rng = np.random.default_rng(0)
+    v = rng.normal(size=(4, 20))
+    lower_bounds, upper_bounds = np.full(20, -0.3), np.full(20, 0.4)
+    z, _ = proximal_box_budget(v=v, lower_bounds=lower_bounds, upper_bounds=upper_bounds, budget=np.ones(4))
+    assert np.allclose(z.sum(axis=1), 1) and np.all(z >= lower_bounds) and np.all(z <= upper_bounds)
+    for i in range(4):
+        x = cp.Variable(20)
+        costs = 0.05
+        l1 = 0.1
+        problem = cp.Problem(cp.Minimize(cp.sum_squares(x - v[i]) / 2 + l1 * cp.norm(x, 1)
+                                         + costs * cp.norm(x - 0.05, 1)),
+                             [x >= lower_bounds, x <= upper_bounds, cp.sum(x) == 1])
+        problem.solve(solver='CLARABEL', tol_gap_abs=1e-12, tol_gap_rel=1e-12, tol_feas=1e-12)
+        z, _ = proximal_box_budget(v=v[i], lower_bounds=lower_bounds, upper_bounds=upper_bounds, budget=1,
+                                   l1=l1, costs=costs, prev_w=0.05)
+        assert abs(z.sum() - 1) < 1e-12
+        assert abs(z - x.value).max() < 1e-6
+
+
+def test_batch_mean_variance():
+    assets = get_assets()
+    rng = np.random.default_rng(0)
+    batch_size = 6
+    # Bootstrapped expected returns and covariances of the assets
+    samples = [rng.integers(assets.date_nb, size=assets.date_nb) for _ in range(batch_size)]
+    expected_returns = np.array([assets.returns[:, s].mean(axis=1) for s in samples])
+    expected_covs = np.array([np.cov(assets.returns[:, s]) for s in samples])
+    target_variances = (np.linspace(0.1, 0.3, batch_size) / np.sqrt(AVG_TRADING_DAYS_PER_YEAR)) ** 2
+    l2_coef = np.linspace(0, 0.001, batch_size)
+    weights, status = batch_mean_variance(expected_returns=expected_returns,
+                                          expected_covs=expected_covs,
+                                          target_variances=target_variances,
+                                          lower_bounds=0,
+                                          upper_bounds=0.3,
+                                          l2_coef=l2_coef)
+    assert weights.shape == (batch_size, assets.asset_nb)
+    assert np.all(status == 'optimal')
+    assert np.allclose(weights.sum(axis=1), 1)
+    assert np.all(weights >= 0) and np.all(weights <= 0.3)
+    for i in range(batch_size):
+        values = {'expected_returns': expected_returns[i],
+                  'lower_bounds': np.zeros(assets.asset_nb),
+                  'upper_bounds': np.full(assets.asset_nb, 0.3),
+                  'l2_coef': l2_coef[i]}
+        model = FirstOrderMeanVariance(values=values, expected_cov=expected_covs[i], investment_target=1)
+        w, record = model.solve(target=target_variances[i])
+        assert record.status == 'optimal'
+        assert abs(w - weights[i]).max() < 1e-4
+        assert weights[i] @ expected_covs[i] @ weights[i] / target_variances[i] - 1 < 1e-6
+
+    # Infeasible problems are flagged without stopping the others
+    target_variances[0] = 1e-12
+    weights, status = batch_mean_variance(expected_returns=expected_returns,
+                                          expected_covs=expected_covs,
+                                          target_variances=target_variances,
+                                          lower_bounds=0,
+                                          upper_bounds=0.3)
+    assert status[0] == 'infeasible' and np.all(np.isnan(weights[0]))
+    assert np.all(status[1:] == 'optimal')
+
+
+def test_adaptive_frontier():
+    assets = get_assets()
+    model = Optimization(assets=assets, investment_type=InvestmentType.FULLY_INVESTED, weight_bounds=(0, None))
+    tolerance = 1e-2
+    for method, kwargs, risk in [('mean_variance', {}, lambda w: w @ assets.expected_cov @ w),
+                                 ('mean_variance', {'engine': 'first_order', 'analytical': False},
+                                  lambda w: w @ assets.expected_cov @ w),
+                                 ('mean_cvar', {'engine': 'highs'},
+                                  lambda w: empirical_cvar(losses=-assets.returns.T @ w, beta=0.95))]:
+        weights = getattr(model, method)(population_size=50, frontier_tolerance=tolerance, **kwargs)
+        targets = model.result.telemetry['target'].to_numpy()
+        assert np.all(model.result.telemetry['status'] == 'optimal')
+        # The tolerance is reached with fewer solves than population_size
+        assert 2 < len(weights) < 50
+        assert np.all(np.diff(targets) > 0)
+        returns = np.array([assets.expected_returns @ w for w in weights])
+        assert np.all(np.diff(returns) > 0)
+        # Endpoints
+        assert abs(risk(weights[-1]) - targets[-1]) < 1e-12
+        assert abs(returns[-1] - assets.expected_returns.max()) < 1e-8
+        min_risk = getattr(model, method)(**{'target_volatility' if method == 'mean_variance' else 'target_cvar':
+                                             [np.sqrt(targets[0] * 1.01) if method == 'mean_variance'
+                                              else targets[0] * 1.01]}, **kwargs)
+        assert len(min_risk) == 1 and assets.expected_returns @ min_risk[0] >= returns[0]
+        # The frontier between two targets is within tolerance of the chord
+        middle_targets = (targets[1:] + targets[:-1]) / 2
+        middle_weights = getattr(model, method)(
+            **{'target_volatility' if method == 'mean_variance' else 'target_cvar':
+               np.sqrt(middle_targets) if method == 'mean_variance' else middle_targets}, **kwargs)
+        middle_returns = np.array([assets.expected_returns @ w for w in middle_weights])
+        x = (targets - targets[0]) / (targets[-1] - targets[0])
+        y = (returns - returns[0]) / (returns[-1] - returns[0])
+        middle_x = (middle_targets - targets[0]) / (targets[-1] - targets[0])
+        middle_y = (middle_returns - returns[0]) / (returns[-1] - returns[0])
+        distances = (((x[1:] - x[:-1]) * (middle_y - y[:-1]) - (y[1:] - y[:-1]) * (middle_x - x[:-1]))
+                     / np.hypot(x[1:] - x[:-1], y[1:] - y[:-1]))
+        assert np.all(distances < tolerance)
+
+    with pytest.raises(ValueError):
+        model.mean_variance(target_volatility=0.01, frontier_tolerance=tolerance)
+
+
+def test_linear_program_endpoints(monkeypatch):
+    prices = load_prices(file=EXAMPLE_PRICES_PATH)
+    assets = load_assets(prices=prices.iloc[:, :20].copy(), verbose=False)
+    model = Optimization(assets=assets, investment_type=InvestmentType.FULLY_INVESTED, weight_bounds=(0, None))
+    cvxpy_weights = model.mean_cvar(population_size=10, frontier_tolerance=1e-2)
+    # The endpoints of the HiGHS and cutting-plane engines are solved by their linear program
+    problems = []
+    problem_init = cp.Problem.__init__
+
+    def init(self, *args, **kwargs):
+        problems.append(self)
+        problem_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(cp.Problem, '__init__', init)
+    for method, engine in [('mean_cvar', 'highs'), ('mean_cvar', 'cutting_plane'), ('mean_cdar', 'highs')]:
+        weights = getattr(model, method)(population_size=10, frontier_tolerance=1e-2, engine=engine)
+        assert np.all(model.result.telemetry['status'] == 'optimal')
+        assert len(weights) > 2
+        if method == 'mean_cvar':
+            for w, cvxpy_w in [(weights[0], cvxpy_weights[0]), (weights[-1], cvxpy_weights[-1])]:
+                assert abs(assets.expected_returns @ (w - cvxpy_w)) < 1e-6
+    assert len(problems) == 0
+
+
+def test_empirical_cvar():
+    rng = np.random.default_rng(0)
+    losses = rng.normal(size=1000)
+    assert abs(empirical_cvar(losses=losses, beta=0.95) - np.sort(losses)[-50:].mean()) < 1e-12
+    alphas = np.linspace(-3, 3, 10001)
+    brute_force = np.min(alphas + np.maximum(losses[:, np.newaxis] - alphas, 0).sum(axis=0) / (1000 * 0.05))
+    assert 0 <= brute_force - empirical_cvar(losses=losses, beta=0.95) < 1e-3
+    returns = np.array([0.1, -0.05, -0.1, 0.2, -0.3])
+    assert np.allclose(uncompounded_drawdowns(returns), [0, 0.05, 0.15, 0, 0.3])
+
+
+def test_feasibility_check():
+    assets = get_assets()
+    model = Optimization(assets=assets, investment_type=InvestmentType.FULLY_INVESTED, weight_bounds=(0, 0.2))
+    min_variance_weights = model.mean_variance(population_size=2, analytical=False, frontier_tolerance=1)[0]
+    min_std = np.sqrt(min_variance_weights @ assets.expected_cov @ min_variance_weights)
+    for method, kwargs, targets in [('mean_variance', {'analytical': False},
+                                     {'target_volatility': min_std * np.array([0.5, 0.9, 1.1, 1.5])}),
+                                    ('mean_variance', {'analytical': False, 'engine': 'first_order'},
+                                     {'target_volatility': min_std * np.array([0.5, 0.9, 1.1, 1.5])}),
+                                    ('mean_semivariance', {}, {'target_semideviation': np.array([1e-4, 0.01])}),
+                                    ('mean_cvar', {}, {'target_cvar': np.array([1e-4, 0.02, 0.03])}),
+                                    ('mean_cvar', {'engine': 'highs'}, {'target_cvar': np.array([1e-4, 0.02, 0.03])}),
+                                    ('mean_cdar', {'engine': 'highs'}, {'target_cdar': np.array([1e-4, 0.1, 0.2])})]:
+        model.update(feasibility_check=True)
+        weights = getattr(model, method)(ignore_none=False, **kwargs, **targets)
+        telemetry = model.result.telemetry
+        skipped = telemetry['solver'] == FEASIBILITY_CHECK_SOLVER
+        assert model.result.skipped == skipped.sum() > 0
+        assert np.all(telemetry['status'][skipped] == 'infeasible')
+        assert np.all(telemetry['status'][~skipped] == 'optimal')
+        assert all(weights[i] is None for i in np.flatnonzero(skipped))
+        # Same weights as without the check
+        model.update(feasibility_check=False)
+        unchecked_weights = getattr(model, method)(ignore_none=False, **kwargs, **targets)
+        assert model.result.skipped == 0
+        for i in np.flatnonzero(~skipped):
+            assert np.max(np.abs(weights[i] - unchecked_weights[i])) < 1e-4
+
+
+def test_linear_program_feasibility_check(monkeypatch):
+    prices = load_prices(file=EXAMPLE_PRICES_PATH)
+    assets = load_assets(prices=prices.iloc[:, :20].copy(), verbose=False)
+    model = Optimization(assets=assets, investment_type=InvestmentType.FULLY_INVESTED, weight_bounds=(0, None))
+    # The minimum risk of the HiGHS and cutting-plane engines is solved by their linear program
+    problems = []
+    problem_init = cp.Problem.__init__
+
+    def init(self, *args, **kwargs):
+        problems.append(self)
+        problem_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(cp.Problem, '__init__', init)
+    for method, engine, targets in [('mean_cvar', 'highs', {'target_cvar': [1e-4, 0.02, 0.03]}),
+                                    ('mean_cvar', 'cutting_plane', {'target_cvar': [1e-4, 0.02, 0.03]}),
+                                    ('mean_cdar', 'highs', {'target_cdar': [1e-4, 0.1, 0.2]})]:
+        weights = getattr(model, method)(ignore_none=False, engine=engine, **targets)
+        assert model.result.skipped == 1
+        assert weights[0] is None and weights[1] is not None
+    model.mean_cvar(population_size=5, engine='cutting_plane')
+    assert len(problems) == 0
+
+
+def test_maximum_sharpe_dinkelbach():
+    assets = get_assets()
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, 0.1))
+    weights = model.maximum_sharpe(engine='dinkelbach')
+    assert len(model.result.records) < 10
+    assert np.all(model.result.telemetry['status'] == 'optimal')
+    assert np.abs(weights - model.maximum_sharpe()).sum() < 1e-4
+
+    prev_w = np.ones(assets.asset_nb) / assets.asset_nb
+    for investment_type, weight_bounds, costs, l1_coef in [(InvestmentType.FULLY_INVESTED, (0, 0.1), 0.01, None),
+                                                           (InvestmentType.FULLY_INVESTED, (0, 0.1), None, 1e-5),
+                                                           (InvestmentType.MARKET_NEUTRAL, (-0.1, 0.1), None, None),
+                                                           (InvestmentType.UNCONSTRAINED, (-0.1, 0.1), 0.01, None)]:
+        model = Optimization(assets=assets,
+                             investment_type=investment_type,
+                             weight_bounds=weight_bounds,
+                             costs=costs,
+                             investment_duration_in_days=255,
+                             prev_w=prev_w)
+        values = model._problem_values(l1_coef=l1_coef)
+
+        def sharpe_ratio(w: np.ndarray) -> float:
+            return model._objective_value(weights=w, values=values) / np.sqrt(w @ assets.expected_cov @ w)
+
+        weights = model.maximum_sharpe(engine='dinkelbach', l1_coef=l1_coef)
+        assert len(model.result.records) < 10
+        assert np.all(weights >= weight_bounds[0] - 1e-6) and np.all(weights <= weight_bounds[1] + 1e-6)
+        if investment_type == InvestmentType.FULLY_INVESTED:
+            assert abs(weights.sum() - 1) < 1e-6
+        elif investment_type == InvestmentType.MARKET_NEUTRAL:
+            assert abs(weights.sum()) < 1e-6
+        # Better than the best portfolio of the frontier
+        frontier_weights = model.mean_variance(population_size=30, analytical=False, l1_coef=l1_coef)
+        assert sharpe_ratio(weights) >= max(sharpe_ratio(w) for w in frontier_weights) - 1e-6
+
+    with pytest.raises(ValueError):
+        model.maximum_sharpe()
+
+
+def test_nsga2():
+    assets = get_assets()
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, 0.2))
+    weights = model.nsga2(population_size=10, generations=2, seed=0,
+                          fitness_type=FitnessType.MEAN_DOWNSIDE_STD_MAX_DRAWDOWN)
+    fitnesses = population_fitness(weights=np.array(weights),
+                                   returns=assets.returns,
+                                   fitness_type=FitnessType.MEAN_DOWNSIDE_STD_MAX_DRAWDOWN)
+    for w, fitness in zip(weights, fitnesses):
+        portfolio = Portfolio(weights=w, assets=assets, fitness_type=FitnessType.MEAN_DOWNSIDE_STD_MAX_DRAWDOWN)
+        assert np.allclose(portfolio.fitness, fitness, rtol=1e-10, atol=0)
+
+    frontier_weights = model.mean_variance(population_size=30, analytical=False)
+    frontier_std = np.array([np.sqrt(w @ assets.expected_cov @ w) for w in frontier_weights])
+    frontier_mean = np.array([assets.expected_returns @ w for w in frontier_weights])
+    for cardinality in [None, 10]:
+        weights = np.array(model.nsga2(population_size=100, generations=100, cardinality=cardinality, seed=0))
+        assert model.result.records[0].iterations == 100
+        assert np.all(weights >= -1e-8) and np.all(weights <= 0.2 + 1e-8)
+        assert np.allclose(weights.sum(axis=1), 1)
+        if cardinality is not None:
+            assert np.all(np.sum(weights != 0, axis=1) <= cardinality)
+        # Non-dominated front by increasing mean
+        fitnesses = population_fitness(weights=weights, returns=assets.returns, fitness_type=FitnessType.MEAN_STD)
+        assert len(non_dominated_sorting(fitnesses)) == 1
+        assert np.all(np.diff(fitnesses[:, 0]) >= 0)
+        # Below but close to the convex frontier
+        std = np.sqrt(np.einsum('ij,jk,ik->i', weights, assets.expected_cov, weights))
+        gap = np.interp(std, frontier_std, frontier_mean) - weights @ assets.expected_returns
+        assert np.all(gap > -1e-8) and np.median(gap) < 0.25 * np.median(frontier_mean)
+
+    # The fitness on the process pool is the same
+    lower_bounds, upper_bounds = np.zeros(assets.asset_nb), np.full(assets.asset_nb, 0.2)
+    fronts = [NSGA2(returns=assets.returns, lower_bounds=lower_bounds, upper_bounds=upper_bounds,
+                    population_size=2000, n_jobs=n_jobs, seed=0).run(generations=1)[1]
+              for n_jobs in [1, 2]]
+    assert np.array_equal(fronts[0], fronts[1])
+
+    assert np.all(crowding_distance(np.array([[0, 3], [1, 2], [2, 0], [3, -5]]))
+                  == [np.inf, 2 / 3 + 3 / 8, 2 / 3 + 7 / 8, np.inf])
+    with pytest.raises(ValueError):
+        NSGA2(returns=assets.returns, lower_bounds=lower_bounds, upper_bounds=upper_bounds, cardinality=4)
+
+
+def test_result_cache(tmp_path):
+    assets = get_assets()
+    result_cache = ResultCache(folder=tmp_path)
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         result_cache=result_cache)
+    weights = model.mean_cdar(population_size=5, engine='highs')
+    telemetry = model.result.telemetry
+    assert result_cache.hits == 0 and result_cache.misses == 1 and len(result_cache) == 1
+
+    # Identical optimization from another Optimization and ResultCache on the same folder
+    result_cache = ResultCache(folder=tmp_path)
+    model = Optimization(assets=assets,
+                         investment_type=InvestmentType.FULLY_INVESTED,
+                         weight_bounds=(0, None),
+                         result_cache=result_cache)
+    cached_weights = model.mean_cdar(population_size=5, engine='highs')
+    assert result_cache.hits == 1 and result_cache.misses == 0
+    assert len(cached_weights) == len(weights)
+    for w, cached_w in zip(weights, cached_weights):
+        assert np.array_equal(w, cached_w)
+    assert telemetry.equals(model.result.telemetry)
+
+    # Any change of the inputs is a new optimization
+    model.mean_cdar(population_size=6, engine='highs')
+    model.mean_cdar(population_size=5)
+    model.update(weight_bounds=(0, 0.5))
+    model.mean_cdar(population_size=5, engine='highs')
+    model.update(solver_config=SolverConfig(tolerance=1e-9))
+    model.maximum_sharpe()
+    model.maximum_sharpe()
+    assert result_cache.hits == 2 and result_cache.misses == 4 and len(result_cache) == 5
+    assert str(result_cache) == 'ResultCache <5 results - 2 hits - 4 misses - 0 evictions>'
+
+    # The least recently used results are evicted
+    size = result_cache.size
+    result_cache.max_bytes = size
+    model.mean_variance(population_size=5)
+    assert result_cache.evictions >= 1 and result_cache.size <= size
+    model.maximum_sharpe()
+    assert result_cache.hits == 3
+
+    # The results of the solves stopped by the time budget are not stored
+    model.update(solver_config=SolverConfig(fallback=['CLARABEL'], target_time_limit=1e-3))
+    length, misses = len(result_cache), result_cache.misses
+    for _ in range(2):
+        model.mean_variance(target_volatility=np.array([0.05, 0.1]) / np.sqrt(255), ignore_none=False)
+        assert np.all(model.result.telemetry['status'] == TIME_LIMIT_STATUS)
+    assert len(result_cache) == length and result_cache.misses == misses + 2
+
+    a = np.arange(12, dtype=float).reshape(3, 4)
+    assert fingerprint(a, {'b': 1, 'a': [None, 'x']}) == fingerprint(np.asfortranarray(a), {'a': [None, 'x'], 'b': 1})
+    assert fingerprint(a) != fingerprint(a.T) and fingerprint(1) != fingerprint(1.0)
@@ -1,7 +1,11 @@
 import datetime as dt
 import numpy as np
 
+from portfolio_optimization.meta import *
 from portfolio_optimization.assets import *
+from portfolio_optimization.portfolio import *
+from portfolio_optimization.population import *
+from portfolio_optimization.utils.tools import *
 from portfolio_optimization.loader import *
 from portfolio_optimization.paths import *
 from portfolio_optimization.bloomberg import *
@@ -23,3 +27,54 @@ def test_assets():
     new_assets_names = pre_selection(assets=assets, k=k)
     assert len(new_assets_names) >= k
     assert len(new_assets_names) < assets.asset_nb
+
+
+def test_pre_selection_against_population():
+    prices = load_prices(file=TEST_PRICES_PATH)
+    assets = Assets(prices=prices,
+                    start_date=dt.date(2017, 1, 1),
+                    verbose=False)
+    correlation_threshold = 0
+    k = 10
+
+    # Reference: population of single asset and negatively correlated pairs portfolios
+    population = Population()
+    for i in range(assets.asset_nb):
+        weights = np.zeros(assets.asset_nb)
+        weights[i] = 1
+        population.add(Portfolio(weights=weights, fitness_type=FitnessType.MEAN_STD, assets=assets))
+    for i in range(assets.asset_nb - 1):
+        for j in range(i + 1, assets.asset_nb):
+            if assets.corr[i, j] < correlation_threshold:
+                cov = assets.cov[i, j]
+                var1 = assets.cov[i, i]
+                var2 = assets.cov[j, j]
+                weights = np.zeros(assets.asset_nb)
+                weights[i] = (var2 - cov) / (var1 + var2 - 2 * cov)
+                weights[j] = 1 - weights[i]
+                population.add(Portfolio(weights=weights, fitness_type=FitnessType.MEAN_STD, assets=assets))
+    new_assets_idx = set()
+    i = 0
+    while i < len(population.fronts) and len(new_assets_idx) < k:
+        for idx in population.fronts[i]:
+            new_assets_idx.update(population.portfolios[idx].assets_index)
+        i += 1
+
+    new_assets_names = pre_selection(assets=assets, k=k, correlation_threshold=correlation_threshold)
+    assert set(new_assets_names) == set(assets.names[list(new_assets_idx)])
+
+
+def test_non_dominated_sorting():
+    for objective_nb in [2, 3]:
+        fitnesses = np.random.randint(0, 10, size=(200, objective_nb)).astype(float)
+        fronts = non_dominated_sorting(fitnesses=fitnesses)
+        assert sorted(np.concatenate(fronts)) == list(range(len(fitnesses)))
+        for i, front in enumerate(fronts):
+            for idx_1 in front:
+                # not dominated by the same or the next fronts
+                for j in range(i, len(fronts)):
+                    for idx_2 in fronts[j]:
+                        assert not dominate(fitnesses[idx_2], fitnesses[idx_1])
+                # dominated by at least one fitness of the previous front
+                if i > 0:
+                    assert any(dominate(fitnesses[idx_2], fitnesses[idx_1]) for idx_2 in fronts[i - 1])
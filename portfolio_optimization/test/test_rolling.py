@@ -0,0 +1,45 @@
+import datetime as dt
+import numpy as np
+
+from portfolio_optimization.assets import *
+from portfolio_optimization.rolling import *
+from portfolio_optimization.paths import *
+from portfolio_optimization.bloomberg import *
+from portfolio_optimization.utils.tools import *
+
+
+def assert_close(a: np.ndarray, b: np.ndarray):
+    assert np.max(np.abs(a - b)) <= ROLLING_TOLERANCE * np.max(np.abs(b))
+
+
+def test_rolling_statistics():
+    prices = load_prices(file=TEST_PRICES_PATH)
+    assets = Assets(prices=prices,
+                    start_date=dt.date(2017, 1, 1),
+                    verbose=False)
+
+    rolling = RollingStatistics(assets=assets, start=0, end=200, refresh_frequency=None)
+    for start, end in [(10, 210), (30, 230), (25, 240), (40, 200), (300, 500), (310, 520)]:
+        rolling.move(start=start, end=end)
+        returns = assets.returns[:, start:end]
+        assert rolling.date_nb == end - start
+        assert_close(rolling.mu, np.mean(returns, axis=1))
+        assert_close(rolling.cov, np.cov(returns))
+        assert_close(rolling.std, np.std(returns, axis=1))
+        assert_close(rolling.corr, np.corrcoef(returns))
+
+    # Same window as the Assets loaded on each walk forward train period
+    start_date = assets.dates[0]
+    end_date = assets.dates[-1]
+    for train_period, _ in walk_forward(start_date=start_date,
+                                        end_date=end_date,
+                                        train_duration=300,
+                                        test_duration=30):
+        rolling.move_to_dates(*train_period)
+        train_assets = Assets(prices=assets.prices,
+                              start_date=train_period[0],
+                              end_date=train_period[1],
+                              verbose=False)
+        assert np.array_equal(rolling.dates, train_assets.dates[1:])
+        assert_close(rolling.mu, train_assets.mu)
+        assert_close(rolling.cov, train_assets.cov)
@@ -0,0 +1,72 @@
+import datetime as dt
+import numpy as np
+
+from portfolio_optimization.assets import *
+from portfolio_optimization.store import *
+from portfolio_optimization.portfolio import *
+from portfolio_optimization.paths import *
+from portfolio_optimization.bloomberg import *
+
+
+def test_price_store():
+    prices = load_prices(file=TEST_PRICES_PATH)
+    store = PriceStore(prices=prices,
+                       asset_missing_threshold=0.1,
+                       dates_missing_threshold=0.1,
+                       verbose=False)
+    assert store.returns.flags['C_CONTIGUOUS']
+
+    start_date = dt.date(2018, 1, 1)
+    end_date = dt.date(2019, 1, 1)
+    view = store.view(start_date=start_date,
+                      end_date=end_date,
+                      verbose=False)
+    assets = Assets(prices=store.prices,
+                    start_date=start_date,
+                    end_date=end_date,
+                    verbose=False)
+
+    # The view shares the store memory and matches an Assets loaded on the same period
+    assert np.shares_memory(view.returns, store.returns)
+    assert np.array_equal(view.names, assets.names)
+    assert np.array_equal(view.dates, assets.dates)
+    assert view.asset_nb == assets.asset_nb
+    assert view.date_nb == assets.date_nb
+    assert np.allclose(view.returns, assets.returns)
+    assert np.allclose(view.mu, assets.mu)
+    assert np.allclose(view.cov, assets.cov)
+    assert np.allclose(view.cumulative_returns.to_numpy(), assets.cumulative_returns.to_numpy())
+
+    # Sub-universe
+    names = [store.names[i] for i in [5, 2, 11, 3]]
+    view = store.view(start_date=start_date,
+                      end_date=end_date,
+                      names_to_keep=names,
+                      verbose=False)
+    assets = Assets(prices=store.prices,
+                    start_date=start_date,
+                    end_date=end_date,
+                    names_to_keep=names,
+                    verbose=False)
+    assert np.array_equal(view.names, names)
+    assert np.allclose(view.cov, assets.cov)
+
+    view.keep_assets(assets_to_keep=names[:2])
+    assert np.array_equal(view.names, names[:2])
+    assert view.returns.shape == (2, assets.date_nb)
+    assert np.allclose(view.mu, assets.mu[:2])
+
+    portfolio = Portfolio(weights=np.array([0.5, 0.5]), assets=view)
+    assert len(portfolio.returns) == view.date_nb
+
+    # Correlation pruning on the view
+    view = store.view(start_date=start_date,
+                      end_date=end_date,
+                      correlation_threshold=0.2,
+                      verbose=False)
+    assets = Assets(prices=store.prices,
+                    start_date=start_date,
+                    end_date=end_date,
+                    correlation_threshold=0.2,
+                    verbose=False)
+    assert np.array_equal(view.names, assets.names)
@@ -1,6 +1,11 @@
 import datetime as dt
+import shutil
+from pathlib import Path
+import pandas as pd
 
 from portfolio_optimization.utils.tools import *
+from portfolio_optimization.paths import *
+from portfolio_optimization.bloomberg import *
 
 
 def test_walk_forward():
@@ -19,3 +24,27 @@ def test_walk_forward():
         assert test_start == train_end
         assert test_start == prev_test_end
         prev_test_end = test_end
+
+
+def test_prices_cache(tmp_path):
+    file = Path(tmp_path, 'prices.csv')
+    shutil.copy(TEST_PRICES_PATH, file)
+    prices = load_prices(file=file)
+
+    cache = PricesCache(file=file)
+    assert not cache.is_valid()
+    cached_prices = load_prices(file=file, cache=True)
+    assert cache.is_valid()
+    pd.testing.assert_frame_equal(prices, cached_prices, check_freq=False)
+
+    start_date = dt.date(2018, 1, 1)
+    end_date = dt.date(2019, 1, 1)
+    tickers = list(prices.columns[[5, 2, 9]])
+    cached_prices = load_prices(file=file, start_date=start_date, end_date=end_date, tickers=tickers, cache=True)
+    pd.testing.assert_frame_equal(prices.loc[start_date:end_date, tickers], cached_prices, check_freq=False)
+
+    # The cache is rebuilt when the csv file changes
+    prices.iloc[:10].to_csv(file, sep=',')
+    assert not cache.is_valid()
+    cached_prices = load_prices(file=file, cache=True)
+    assert len(cached_prices) == 10
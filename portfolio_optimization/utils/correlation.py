@@ -0,0 +1,95 @@
+from typing import Optional, Iterator
+import numpy as np
+
+__all__ = ['CORRELATION_BLOCK_MEMORY',
+           'correlation_block_size',
+           'correlation_blocks',
+           'highly_correlated_to_remove']
+
+# Maximum memory in bytes used by one block of the correlation matrix (64 MB)
+CORRELATION_BLOCK_MEMORY = 2 ** 26
+
+
+def correlation_block_size(asset_nb: int, block_memory: int = CORRELATION_BLOCK_MEMORY) -> int:
+    """
+    Number of rows of the correlation matrix that can be computed at once without exceeding block_memory bytes.
+    """
+    return int(max(1, min(asset_nb, block_memory // (8 * max(1, asset_nb)))))
+
+
+def _standardized_returns(returns: np.ndarray) -> np.ndarray:
+    """
+    Center and scale the returns so that Z @ Z.T is the correlation matrix.
+    Assets with zero variance are set to nan, like numpy.corrcoef.
+    """
+    z = returns - returns.mean(axis=1, keepdims=True)
+    norm = np.sqrt(np.einsum('ij,ij->i', z, z))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z /= norm[:, np.newaxis]
+    z[norm == 0] = np.nan
+    return z
+
+
+def correlation_blocks(returns: np.ndarray,
+                       block_size: Optional[int] = None,
+                       upper: bool = True) -> Iterator[tuple[int, np.ndarray]]:
+    """
+    Yield the correlation matrix of the returns by blocks of rows, without building the full matrix.
+
+    :param returns: asset returns of shape (Number of Assets, Number of Dates)
+    :param block_size: number of rows per block. Default is computed from CORRELATION_BLOCK_MEMORY.
+    :param upper: if True, only the upper-triangle part is computed: the block starting at row `start` has the
+                  columns `start` to `Number of Assets`. Otherwise, all the columns are computed.
+    :return: generator of (start, block) where block[k, l] is the correlation between the assets `start + k` and
+             `start + l` (or `l` when upper is False)
+    """
+    asset_nb = returns.shape[0]
+    if block_size is None:
+        block_size = correlation_block_size(asset_nb=asset_nb)
+    z = _standardized_returns(returns)
+    for start in range(0, asset_nb, block_size):
+        end = min(start + block_size, asset_nb)
+        columns = z[start:] if upper else z
+        block = z[start:end] @ columns.T
+        np.clip(block, -1, 1, out=block)
+        yield start, block
+
+
+def highly_correlated_to_remove(returns: np.ndarray,
+                                mu: np.ndarray,
+                                correlation_threshold: float,
+                                block_size: Optional[int] = None) -> tuple[np.ndarray, int]:
+    """
+    Greedy pruning of highly correlated assets: the pairs (i, j) with i < j are visited in lexicographic order and
+    when both assets are still kept and their correlation is above correlation_threshold, the asset with the lower
+    mu is removed.
+    The correlation matrix is computed by blocks of upper-triangle rows and each row is resolved at once:
+    the candidates j of row i are removed until the first one with a higher mu than i, which removes i.
+
+    :param returns: asset returns of shape (Number of Assets, Number of Dates)
+    :param mu: asset mean returns of shape (Number of Assets)
+    :param correlation_threshold: correlation threshold
+    :param block_size: number of correlation rows computed at once
+    :return: a tuple of the sorted indices of the assets to remove and the peak memory in bytes of the blocks
+    """
+    asset_nb = returns.shape[0]
+    removed = np.zeros(asset_nb, dtype=bool)
+    peak_memory = returns.nbytes
+    for start, block in correlation_blocks(returns=returns, block_size=block_size, upper=True):
+        peak_memory = max(peak_memory, returns.nbytes + block.nbytes)
+        for k in range(block.shape[0]):
+            i = start + k
+            if removed[i]:
+                continue
+            row = block[k, k + 1:]
+            candidates = np.flatnonzero((row > correlation_threshold) & ~removed[i + 1:]) + i + 1
+            if len(candidates) == 0:
+                continue
+            higher = mu[candidates] > mu[i]
+            if np.any(higher):
+                first = np.argmax(higher)
+                removed[candidates[:first]] = True
+                removed[i] = True
+            else:
+                removed[candidates] = True
+    return np.flatnonzero(removed), peak_memory
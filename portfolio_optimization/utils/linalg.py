@@ -0,0 +1,71 @@
+from typing import Optional
+import numpy as np
+
+__all__ = ['EIGENVALUE_FLOOR',
+           'cholesky_factor',
+           'pseudo_inverse',
+           'factor_model']
+
+# Relative floor (to the largest eigenvalue) of the eigenvalues of a covariance repaired to be positive definite
+EIGENVALUE_FLOOR = 1e-12
+
+
+def cholesky_factor(cov: np.ndarray,
+                    eigen: Optional[tuple[np.ndarray, np.ndarray]] = None) -> np.ndarray:
+    """
+    Lower Cholesky factor L of a covariance matrix such that cov = L @ L.T.
+    When the matrix is not positive definite, it is repaired by flooring its eigenvalues to EIGENVALUE_FLOOR times the
+    largest eigenvalue, and the Cholesky factor of the repaired matrix is returned.
+
+    :param cov: covariance matrix of shape (Number of Assets, Number of Assets)
+    :param eigen: eigenvalues and eigenvectors of the covariance (see np.linalg.eigh), computed when missing
+    :return: the lower triangular factor of shape (Number of Assets, Number of Assets)
+    """
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        if eigen is None:
+            eigen = np.linalg.eigh(cov)
+        eigenvalues, eigenvectors = eigen
+        eigenvalues = np.maximum(eigenvalues, EIGENVALUE_FLOOR * max(eigenvalues.max(), np.finfo(float).tiny))
+        repaired_cov = (eigenvectors * eigenvalues) @ eigenvectors.T
+        return np.linalg.cholesky((repaired_cov + repaired_cov.T) / 2)
+
+
+def pseudo_inverse(eigen: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+    """
+    Pseudo-inverse of a symmetric matrix from its eigendecomposition. Like np.linalg.pinv, the eigenvalues below
+    1e-15 times the largest absolute eigenvalue are treated as zero.
+
+    :param eigen: eigenvalues and eigenvectors of the matrix (see np.linalg.eigh)
+    :return: the pseudo-inverse
+    """
+    eigenvalues, eigenvectors = eigen
+    cutoff = 1e-15 * np.abs(eigenvalues).max()
+    inv_eigenvalues = np.zeros(len(eigenvalues))
+    nonzero = np.abs(eigenvalues) > cutoff
+    inv_eigenvalues[nonzero] = 1 / eigenvalues[nonzero]
+    return (eigenvectors * inv_eigenvalues) @ eigenvectors.T
+
+
+def factor_model(cov: np.ndarray,
+                 rank: int,
+                 eigen: Optional[tuple[np.ndarray, np.ndarray]] = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Low-rank plus diagonal approximation of a covariance matrix: cov ≈ B @ B.T + diag(d ** 2).
+    The loadings B are the principal components of the largest eigenvalues and the specific variances d ** 2 are
+    the residual variances, so that the variance of each asset is kept.
+
+    :param cov: covariance matrix of shape (Number of Assets, Number of Assets)
+    :param rank: number of factors
+    :param eigen: eigenvalues and eigenvectors of the covariance (see np.linalg.eigh), computed when missing
+    :return: the loadings B of shape (Number of Assets, rank) and the specific volatilities d of shape
+             (Number of Assets)
+    """
+    if eigen is None:
+        eigen = np.linalg.eigh(cov)
+    eigenvalues, eigenvectors = eigen
+    eigenvalues, eigenvectors = eigenvalues[::-1][:rank], eigenvectors[:, ::-1][:, :rank]
+    loadings = eigenvectors * np.sqrt(np.maximum(eigenvalues, 0))
+    specific_variances = np.maximum(np.diag(cov) - np.sum(loadings ** 2, axis=1), 0)
+    return loadings, np.sqrt(specific_variances)
@@ -1,8 +1,11 @@
 import datetime as dt
+from typing import Iterator, Optional
 import numpy as np
 
 __all__ = ['dominate',
            'dominate_slow',
+           'non_dominated_fronts',
+           'non_dominated_sorting',
            'prices_rebased',
            'portfolio_returns',
            'rand_weights',
@@ -29,6 +32,86 @@ def dominate_slow(fitness_1: np.array, fitness_2: np.array) -> bool:
     return np.all(fitness_1 >= fitness_2) and np.any(fitness_1 > fitness_2)
 
 
+def _domination_matrix(fitnesses: np.ndarray, block_size: Optional[int] = None) -> np.ndarray:
+    """
+    Boolean matrix D where D[i, j] is True if fitness i dominates fitness j.
+    Computed by blocks of rows to limit the size of the intermediate arrays.
+    """
+    n, m = fitnesses.shape
+    if block_size is None:
+        block_size = max(1, 2 ** 24 // max(1, n * m))
+    domination = np.empty((n, n), dtype=bool)
+    for start in range(0, n, block_size):
+        block = fitnesses[start:start + block_size, np.newaxis, :]
+        domination[start:start + block_size] = (np.all(block >= fitnesses[np.newaxis, :, :], axis=2)
+                                                & np.any(block > fitnesses[np.newaxis, :, :], axis=2))
+    return domination
+
+
+def _non_dominated_fronts_2d(fitnesses: np.ndarray) -> Iterator[np.ndarray]:
+    """
+    Fronts of two objectives: the unique fitnesses are sorted by decreasing first then second objective, so a
+    fitness is dominated by a remaining fitness if and only if one of the previous remaining fitnesses has a
+    greater or equal second objective. Each front is peeled in O(N) with a cumulative maximum.
+    """
+    unique, inverse = np.unique(fitnesses, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.lexsort((-unique[:, 1], -unique[:, 0]))
+    remaining = order
+    while len(remaining) > 0:
+        second = unique[remaining, 1]
+        previous_max = np.maximum.accumulate(np.concatenate(([-np.inf], second[:-1])))
+        in_front = second > previous_max
+        front = remaining[in_front]
+        remaining = remaining[~in_front]
+        yield np.flatnonzero(np.isin(inverse, front))
+
+
+def non_dominated_fronts(fitnesses: np.ndarray) -> Iterator[np.ndarray]:
+    """
+    Vectorized non-dominated sorting yielding the Pareto fronts one by one, so the sorting can be stopped as
+    soon as enough fronts are found. All objectives are maximized, the domination is the same as dominate().
+
+    :param fitnesses: array of shape (Number of Portfolios, Number of Objectives)
+    :return: generator of arrays of the fitness indices of each front, the first front being the non-dominated
+             fitnesses.
+    """
+    fitnesses = np.asarray(fitnesses, dtype=float)
+    n, m = fitnesses.shape
+    if n == 0:
+        return
+    if m == 2:
+        yield from _non_dominated_fronts_2d(fitnesses)
+        return
+
+    domination = _domination_matrix(fitnesses)
+    # number of fitnesses that dominate each fitness
+    dominated_count = domination.sum(axis=0)
+    remaining = np.ones(n, dtype=bool)
+    while np.any(remaining):
+        front = np.flatnonzero(remaining & (dominated_count == 0))
+        remaining[front] = False
+        dominated_count -= domination[front].sum(axis=0)
+        yield front
+
+
+def non_dominated_sorting(fitnesses: np.ndarray, first_front_only: bool = False) -> list[np.ndarray]:
+    """
+    Vectorized non-dominated sorting.
+    Sort the fitnesses into different non-domination levels.
+
+    :param fitnesses: array of shape (Number of Portfolios, Number of Objectives)
+    :param first_front_only: If :obj:`True` sort only the first front and exit.
+    :returns: A list of Pareto fronts (arrays of indices), the first array includes non-dominated fitnesses.
+    """
+    fronts = []
+    for front in non_dominated_fronts(fitnesses=fitnesses):
+        fronts.append(front)
+        if first_front_only:
+            break
+    return fronts
+
+
 def prices_rebased(returns: np.array) -> np.array:
     p = [1 + returns[0]]
     for i in range(1, len(returns)):